@@ -5,6 +5,7 @@ from starlette import status
 from app.schemas.comment import CommentCreate, CommentUpdate
 from app.core.dependencies import get_current_user, validation_course_id
 from app.core.dependencies import get_comment_service
+from app.core.sql_instrumentation import QueryBudget
 from app.services.comment import CommentService
 from app.models.user import UserORM
 from app.schemas.comment import CommentFullResponse, CommentShortResponse
@@ -12,7 +13,7 @@ from app.models.course import CourseORM
 
 comment_router = APIRouter(tags=["Comments"])
 
-@comment_router.get("/steps/{step_id}/comments", response_model=list[CommentFullResponse])
+@comment_router.get("/steps/{step_id}/comments", response_model=list[CommentFullResponse], dependencies=[Depends(QueryBudget(5), scope="function")])
 async def get_step_comments(
         step_id: int,
         user: UserORM = Depends(get_current_user),
@@ -56,7 +57,7 @@ async def update_comment(
 ):
     return await comment_service.update_comment(comment_id, user, payload)
 
-@comment_router.get("/courses/{course_id}/comments", response_model=list[CommentShortResponse])
+@comment_router.get("/courses/{course_id}/comments", response_model=list[CommentShortResponse], dependencies=[Depends(QueryBudget(5), scope="function")])
 async def get_course_wide_comments(
         course_id: int,
         course: CourseORM = Depends(validation_course_id),
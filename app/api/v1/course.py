@@ -1,18 +1,37 @@
-from fastapi import APIRouter, Depends, Query
-from fastapi_cache.coder import PickleCoder
-from fastapi_cache.decorator import cache
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from fastapi_limiter.depends import RateLimiter
 from starlette import status
 
+from functools import partial
+
 from app.api.v1.lesson import lesson_router
+from app.api.v1.quiz import quiz_router
+from app.core.config import config
+from app.core.database import after_commit
+from app.core.dependencies import DBSession
 from app.core.dependencies import get_course_service
+from app.core.dependencies import get_course_transfer_service
+from app.core.dependencies import get_course_with_access
 from app.core.dependencies import get_current_user
 from app.core.dependencies import service_http_user_id
+from app.core.quiz_cache import quiz_cache
+from app.core.response_cache import response_cache
+from app.core.sql_instrumentation import QueryBudget
+from app.helpers.course_sort import CourseSort
+from app.helpers.courses.cache_utils import course_validators
 from app.helpers.courses.cache_utils import invalidate_cache
 from app.helpers.courses.cache_utils import item_key_builder
+from app.helpers.courses.cache_utils import list_key_builder
+from app.helpers.courses.cache_utils import outline_key_builder
+from app.models.course import CourseORM
 from app.models.user import UserORM
 from app.schemas.course import CourseResponse, CourseCreate, CourseUpdate, CourseList
+from app.schemas.outline import CourseOutline
 from app.services.course import CourseService
+from app.services.course_transfer import CourseTransferService
 
 course_router = APIRouter(
     prefix="/courses",
@@ -20,13 +39,17 @@ course_router = APIRouter(
 
 
 
-@course_router.get('/', response_model=CourseList, tags=["Courses"])
-@cache(expire=60, namespace="courses", coder=PickleCoder)
+@course_router.get('/', response_model=CourseList, dependencies=[Depends(QueryBudget(3), scope='function')], tags=["Courses"])
+@response_cache.cached(list_key_builder, expire=config.COURSE_CACHE_TTL_SECONDS, stale=config.COURSE_CACHE_STALE_SECONDS)
 async def get_courses(
         page: int = Query(1, ge=1),
         per_page: int = Query(20, ge=1, le=100),
         min_price: float | None = Query(None, ge=0, description='Минимальная цена товара'),
         max_price: float | None = Query(None, ge=0, description='Максимальная цена товара'),
+        sort: CourseSort = Query(CourseSort.ID, description='Сортировка: id, newest, price'),
+        after: str | None = Query(None, description='Курсор next_cursor из предыдущего ответа, заменяет page'),
+        q: str | None = Query(None, min_length=2, max_length=200, description='Поиск по названию и описанию курса'),
+        prefix: bool = Query(False, description='Искать слова из q как префиксы'),
         course_service: CourseService = Depends(get_course_service),
 ) -> CourseList:
     return await course_service.get_paginated_courses(
@@ -34,19 +57,36 @@ async def get_courses(
          per_page=per_page,
          min_price=min_price,
          max_price=max_price,
+         sort=sort,
+         after=after,
+         search=q,
+         prefix=prefix,
      )
 
 @course_router.post('/', status_code=status.HTTP_201_CREATED, response_model=CourseResponse, dependencies=[Depends(RateLimiter(times=2, minutes=1, identifier=service_http_user_id))], tags=["Courses"])
 async def create_course(
         payload: CourseCreate,
+        db: DBSession,
         user: UserORM = Depends(get_current_user),
         course_service: CourseService = Depends(get_course_service),
 ):
     result = await course_service.create_course(user, payload)
-    await invalidate_cache()
+    after_commit(db, invalidate_cache)
+    return result
+
+@course_router.post('/import', status_code=status.HTTP_201_CREATED, response_model=CourseResponse, dependencies=[Depends(RateLimiter(times=2, minutes=1, identifier=service_http_user_id))], tags=["Courses"])
+async def import_course(
+        request: Request,
+        db: DBSession,
+        user: UserORM = Depends(get_current_user),
+        transfer_service: CourseTransferService = Depends(get_course_transfer_service),
+):
+    """Создаёт курс из NDJSON-выгрузки (GET /courses/{course_id}/export), тело читается потоком"""
+    result = await transfer_service.import_course(user, request.stream())
+    after_commit(db, invalidate_cache)
     return result
 
-@course_router.get('/my/', response_model=list[CourseResponse], dependencies=[Depends(RateLimiter(times=5, seconds=10, identifier=service_http_user_id))], tags=["Courses"])
+@course_router.get('/my/', response_model=list[CourseResponse], dependencies=[Depends(RateLimiter(times=5, seconds=10, identifier=service_http_user_id)), Depends(QueryBudget(3), scope='function')], tags=["Courses"])
 async def get_my_courses(
         user: UserORM = Depends(get_current_user),
         course_service: CourseService = Depends(get_course_service),
@@ -58,6 +98,7 @@ async def get_my_courses(
 async def update_course(
         payload: CourseUpdate,
         course_id: int,
+        db: DBSession,
         user: UserORM = Depends(get_current_user),
         course_service: CourseService = Depends(get_course_service),
 ):
@@ -67,38 +108,78 @@ async def update_course(
         payload=payload,
     )
 
-    await invalidate_cache(course_id=course_id)
+    after_commit(db, partial(invalidate_cache, course_id=course_id))
 
     return result
 
 @course_router.delete('/{course_id}', dependencies=[Depends(RateLimiter(times=2, minutes=1, identifier=service_http_user_id))], tags=["Courses"])
 async def delete_course(
         course_id: int,
+        db: DBSession,
         user: UserORM = Depends(get_current_user),
         course_service: CourseService = Depends(get_course_service),
 ):
     result = await course_service.delete_course(user,course_id)
-    await invalidate_cache(course_id=course_id)
+    after_commit(db, partial(invalidate_cache, course_id=course_id))
+    after_commit(db, partial(quiz_cache.invalidate_course, course_id))
+    return result
+
+@course_router.post('/{course_id}/clone', status_code=status.HTTP_201_CREATED, response_model=CourseResponse, dependencies=[Depends(RateLimiter(times=2, minutes=1, identifier=service_http_user_id))], tags=["Courses"])
+async def clone_course(
+        course_id: int,
+        db: DBSession,
+        user: UserORM = Depends(get_current_user),
+        course_service: CourseService = Depends(get_course_service),
+):
+    result = await course_service.clone_course(user, course_id)
+    after_commit(db, invalidate_cache)
     return result
 
+@course_router.get('/{course_id}/export', tags=["Courses"])
+async def export_course(
+        course: Annotated[CourseORM, Depends(get_course_with_access)],
+        transfer_service: Annotated[CourseTransferService, Depends(get_course_transfer_service)],
+):
+    return StreamingResponse(
+        transfer_service.export_course(course),
+        media_type='application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename="course-{course.id}.ndjson"'},
+    )
+
 @course_router.post('/{course_id}/publish', dependencies=[Depends(RateLimiter(times=2, minutes=1, identifier=service_http_user_id))], tags=["Courses"])
 async def publish_course(
         course_id: int,
+        db: DBSession,
         user: UserORM = Depends(get_current_user),
         course_service: CourseService = Depends(get_course_service),
 ):
     result = await course_service.publish_course(user,course_id)
-    await invalidate_cache(course_id=course_id)
+    after_commit(db, partial(invalidate_cache, course_id=course_id))
     return  result
 
 
 
-@course_router.get('/{course_id}', response_model=CourseResponse,tags=["Courses"])
-@cache(expire=60, namespace='courses', key_builder=item_key_builder, coder=PickleCoder)
+@course_router.get('/{course_id}', response_model=CourseResponse, dependencies=[Depends(QueryBudget(2), scope='function')], tags=["Courses"])
+@response_cache.cached(
+    item_key_builder,
+    expire=config.COURSE_CACHE_TTL_SECONDS,
+    stale=config.COURSE_CACHE_STALE_SECONDS,
+    validators=course_validators,
+)
 async def get_course(
         course_id: int,
         course_service: CourseService = Depends(get_course_service),
-):
-    return await course_service.get_by_id(course_id)
+) -> CourseResponse:
+    course = await course_service.get_by_id(course_id)
+    return CourseResponse.model_validate(course)
+
+@course_router.get('/{course_id}/outline', response_model=CourseOutline, dependencies=[Depends(QueryBudget(1), scope='function')], tags=["Courses"])
+@response_cache.cached(outline_key_builder, expire=config.COURSE_CACHE_TTL_SECONDS, stale=config.COURSE_CACHE_STALE_SECONDS)
+async def get_course_outline(
+        course_id: int,
+        course_service: CourseService = Depends(get_course_service),
+) -> CourseOutline:
+    return await course_service.get_course_outline(course_id)
 
-course_router.include_router(lesson_router)
\ No newline at end of file
+course_router.include_router(lesson_router)
+course_router.include_router(quiz_router)
\ No newline at end of file
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends
+
+from app.core.database import get_pool_stats
+from app.core.dependencies import get_admin_user
+from app.core.redis_pool import redis_pool
+from app.utils.security import hashing_executor
+
+internal_router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    dependencies=[Depends(get_admin_user)],
+)
+
+
+@internal_router.get('/hashing')
+async def get_hashing_stats():
+    return hashing_executor.stats()
+
+
+@internal_router.get('/redis')
+async def get_redis_stats():
+    return redis_pool.stats()
+
+
+@internal_router.get('/db')
+async def get_db_pool_stats():
+    return get_pool_stats()
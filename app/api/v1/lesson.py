@@ -1,17 +1,25 @@
+from functools import partial
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
 from starlette import status
 
 from app.api.v1.step import step_router
+from app.core.database import after_commit
+from app.core.dependencies import DBSession
 from app.core.dependencies import get_course_with_access
 from app.core.dependencies import get_lesson_service
 from app.core.dependencies import valid_lesson
 from app.core.dependencies import validation_course_id
+from app.core.quiz_cache import quiz_cache
+from app.helpers.courses.cache_utils import invalidate_outline
 from app.models.course import CourseORM
 from app.models.lesson import LessonORM
 from app.schemas.lesson import LessonCreate, LessonUpdate, LessonResponse
+from app.schemas.ordering import OrderItem, ReorderRequest
+from app.schemas.step import StepResponse
 from app.services.lesson import LessonService
+from app.utils.sparse import parse_fields, parse_include
 
 lesson_router = APIRouter(
     prefix="/{course_id}/lessons",
@@ -21,36 +29,85 @@ lesson_router = APIRouter(
 
 @lesson_router.get('/', tags=["Lessons"], response_model=list[LessonResponse])
 async def get_lessons(
+        request: Request,
+        response: Response,
+        fields: str | None = Query(None, description='Поля урока через запятую, например title,order_number'),
+        include: str | None = Query(None, description='steps - вложить шаги урока'),
+        steps_fields: str | None = Query(None, alias='fields[steps]', description='Поля вложенных шагов через запятую'),
         course: CourseORM = Depends(validation_course_id),
         lessons_service: LessonService = Depends(get_lesson_service),
 ):
+    lesson_fields = parse_fields(fields, LessonResponse, exclude=('steps',))
+    step_fields = parse_fields(steps_fields, StepResponse)
+    include_set = parse_include(include, allowed=('steps',))
+    sparse = lesson_fields is not None or step_fields is not None or include_set is not None
+
+    # Без параметров - полный ответ, как раньше. С ними шаги вкладываются только по include или fields[steps]
+    if sparse:
+        lesson_fields = lesson_fields or frozenset(LessonResponse.model_fields) - {'steps'}
+        if step_fields is None and include_set and 'steps' in include_set:
+            step_fields = frozenset(StepResponse.model_fields)
+        variant = f'{sorted(lesson_fields)}|{sorted(step_fields or ())}|{step_fields is not None}'
+    else:
+        variant = ''
+
+    validators = await lessons_service.get_lessons_validators(course.id, variant=variant)
+    if validators.is_not_modified(request):
+        return validators.not_modified_response()
+
+    if sparse:
+        content = await lessons_service.get_lessons_sparse(course.id, lesson_fields, step_fields)
+        return Response(content=content, media_type='application/json', headers=validators.headers)
+
+    response.headers.update(validators.headers)
     return await lessons_service.get_all_lessons(course.id)
 
 
 @lesson_router.post('/', tags=["Lessons"])
 async def create_lesson(
         payload: LessonCreate,
+        db: DBSession,
         course: CourseORM = Depends(get_course_with_access),
         lessons_service: LessonService = Depends(get_lesson_service),
 ):
-    return await lessons_service.create_lesson(payload=payload, course=course)
+    result = await lessons_service.create_lesson(payload=payload, course=course)
+    after_commit(db, partial(invalidate_outline, course.id))
+    return result
+
+@lesson_router.put('/order', tags=["Lessons"], response_model=list[OrderItem])
+async def reorder_lessons(
+        payload: ReorderRequest,
+        db: DBSession,
+        course: Annotated[CourseORM, Depends(get_course_with_access)],
+        lesson_service: Annotated[LessonService, Depends(get_lesson_service)],
+):
+    result = await lesson_service.reorder_lessons(course=course, ids=payload.ids)
+    after_commit(db, partial(invalidate_outline, course.id))
+    return result
 
 @lesson_router.patch('/{lesson_id}', tags=["Lessons"], response_model=LessonResponse)
 async def update_lesson(
         payload: LessonUpdate,
+        db: DBSession,
         course: Annotated[CourseORM, Depends(get_course_with_access)],
         lesson: Annotated[LessonORM, Depends(valid_lesson)],
         lesson_service: Annotated[LessonService, Depends(get_lesson_service)],
 ):
-    return await lesson_service.update_lesson(payload=payload, lesson=lesson)
+    result = await lesson_service.update_lesson(payload=payload, lesson=lesson)
+    after_commit(db, partial(invalidate_outline, course.id))
+    return result
 
 @lesson_router.delete('/{lesson_id}', tags=["Lessons"], status_code=status.HTTP_200_OK)
 async def delete_lesson(
         lesson_id: int,
+        db: DBSession,
         course: Annotated[CourseORM, Depends(get_course_with_access)],
         lesson: Annotated[LessonORM, Depends(valid_lesson)],
         lesson_service: LessonService = Depends(get_lesson_service),
 ):
-    return await lesson_service.delete_lesson(lesson=lesson)
+    result = await lesson_service.delete_lesson(lesson=lesson)
+    after_commit(db, partial(invalidate_outline, course.id))
+    after_commit(db, partial(quiz_cache.invalidate_lesson, lesson.id))
+    return result
 
 lesson_router.include_router(step_router)
\ No newline at end of file
@@ -0,0 +1,32 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from app.core.dependencies import get_current_user
+from app.core.dependencies import get_quiz_service
+from app.models.user import UserORM
+from app.schemas.quiz import QuizAttemptCreate, QuizAttemptResult
+from app.services.quiz import QuizService
+
+# Отдельно от lesson_router: его зависимость validation_course_id - запрос в БД на каждую попытку,
+# а курс, урок и доступ здесь проверяются по кэшам
+quiz_router = APIRouter(
+    prefix="/{course_id}/lessons/{lesson_id}/steps/{step_id}/attempts",
+)
+
+@quiz_router.post('', tags=["Steps"], response_model=QuizAttemptResult)
+async def submit_quiz_attempt(
+        course_id: int,
+        lesson_id: int,
+        step_id: int,
+        payload: QuizAttemptCreate,
+        user: Annotated[UserORM, Depends(get_current_user)],
+        quiz_service: Annotated[QuizService, Depends(get_quiz_service)],
+):
+    return await quiz_service.submit_attempt(
+        user=user,
+        course_id=course_id,
+        lesson_id=lesson_id,
+        step_id=step_id,
+        payload=payload,
+    )
@@ -1,16 +1,23 @@
+from functools import partial
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Request, Query
+from fastapi import APIRouter, Depends, Request, Query, Response
 
+from app.core.database import after_commit
+from app.core.dependencies import DBSession
 from app.core.dependencies import get_current_user
 from app.core.dependencies import get_step_service
 from app.core.dependencies import valid_step
+from app.core.quiz_cache import quiz_cache
+from app.helpers.courses.cache_utils import invalidate_outline
 from app.models.step import StepORM
 from app.core.dependencies import valid_lesson
+from app.schemas.ordering import OrderItem, ReorderRequest
 from app.schemas.step import StepCreate
 from app.models.user import UserORM
 from app.schemas.step import StepResponse, StepUpdate
 from app.services.step import StepService
+from app.utils.sparse import parse_fields
 from app.models.lesson import LessonORM
 
 step_router = APIRouter(
@@ -19,36 +26,75 @@ step_router = APIRouter(
 
 @step_router.get('', tags=["Steps"], response_model=list[StepResponse])
 async def get_steps(
+    request: Request,
+    response: Response,
     lesson: Annotated[LessonORM, Depends(valid_lesson)],
     user: Annotated[UserORM, Depends(get_current_user)],
-    step_service: Annotated[StepService, Depends(get_step_service)]
+    step_service: Annotated[StepService, Depends(get_step_service)],
+    fields: str | None = Query(None, description='Поля шага через запятую, например title,step_type,order_number'),
 ):
-    return await step_service.get_all_steps(lesson, user)
+    step_fields = parse_fields(fields, StepResponse)
+    variant = str(sorted(step_fields)) if step_fields is not None else ''
+
+    context = await step_service.authorize_read(lesson, user)
+    validators = await step_service.get_steps_validators(lesson, context, variant=variant)
+    if validators.is_not_modified(request):
+        return validators.not_modified_response()
+
+    if step_fields is not None:
+        content = await step_service.get_steps_sparse(lesson, context, step_fields)
+        return Response(content=content, media_type='application/json', headers=validators.headers)
+
+    response.headers.update(validators.headers)
+    return await step_service.get_all_steps(lesson, context)
 
 @step_router.post('', tags=["Steps"], response_model=StepResponse)
 async def create_step(
         payload: StepCreate,
+        db: DBSession,
+        lesson: Annotated[LessonORM, Depends(valid_lesson)],
+        user: Annotated[UserORM, Depends(get_current_user)],
+        step_service: Annotated[StepService, Depends(get_step_service)]
+):
+    result = await step_service.create_step(user=user, lesson=lesson, payload=payload)
+    after_commit(db, partial(invalidate_outline, lesson.course_id))
+    return result
+
+@step_router.put('/order', tags=["Steps"], response_model=list[OrderItem])
+async def reorder_steps(
+        payload: ReorderRequest,
+        db: DBSession,
         lesson: Annotated[LessonORM, Depends(valid_lesson)],
         user: Annotated[UserORM, Depends(get_current_user)],
         step_service: Annotated[StepService, Depends(get_step_service)]
 ):
-    return await step_service.create_step(user=user, lesson=lesson, payload=payload)
+    result = await step_service.reorder_steps(lesson=lesson, user=user, ids=payload.ids)
+    after_commit(db, partial(invalidate_outline, lesson.course_id))
+    return result
 
 @step_router.patch('/{step_id}', tags=["Steps"], response_model=StepResponse)
 async def update_step(
         payload: StepUpdate,
+        db: DBSession,
         step: Annotated[StepORM, Depends(valid_step)],
         lesson: Annotated[LessonORM, Depends(valid_lesson)],
         user: Annotated[UserORM, Depends(get_current_user)],
         step_service: Annotated[StepService, Depends(get_step_service)]
 ):
-    return await step_service.update_step(step=step,user=user, lesson=lesson, payload=payload)
+    result = await step_service.update_step(step=step,user=user, lesson=lesson, payload=payload)
+    after_commit(db, partial(invalidate_outline, lesson.course_id))
+    after_commit(db, partial(quiz_cache.invalidate, step.id))
+    return result
 
 @step_router.delete('/{step_id}', tags=["Steps"])
 async def delete_step(
+        db: DBSession,
         step: Annotated[StepORM, Depends(valid_step)],
         lesson: Annotated[LessonORM, Depends(valid_lesson)],
         user: Annotated[UserORM, Depends(get_current_user)],
         step_service: Annotated[StepService, Depends(get_step_service)]
 ):
-    return await step_service.delete_step(step=step,user=user, lesson=lesson)
\ No newline at end of file
+    result = await step_service.delete_step(step=step,user=user, lesson=lesson)
+    after_commit(db, partial(invalidate_outline, lesson.course_id))
+    after_commit(db, partial(quiz_cache.invalidate, step.id))
+    return result
\ No newline at end of file
@@ -0,0 +1,75 @@
+import asyncio
+import json
+from typing import Callable
+
+from loguru import logger
+from redis.asyncio.client import Redis
+
+from app.core.config import config
+
+Listener = Callable[[list[str]], None]
+
+
+class CacheInvalidationBus:
+    """
+        Рассылка инвалидаций in-process кэшей между воркерами через Redis pub/sub.
+        Сообщение - список инвалидированных ключей, каждый воркер (включая отправителя) передаёт его слушателям.
+        После переподключения сообщения могли потеряться, поэтому слушатели получают сброс (reset).
+    """
+
+    def __init__(self, channel: str, reconnect_delay: float = 1.0):
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.redis: Redis | None = None
+        self._listeners: list[Listener] = []
+        self._resets: list[Callable[[], None]] = []
+        self._task: asyncio.Task | None = None
+
+    def add_listener(self, listener: Listener, reset: Callable[[], None]) -> None:
+        self._listeners.append(listener)
+        self._resets.append(reset)
+
+    def _dispatch(self, keys: list[str]) -> None:
+        for listener in self._listeners:
+            listener(keys)
+
+    def _reset(self) -> None:
+        for reset in self._resets:
+            reset()
+
+    async def publish(self, keys: list[str]) -> None:
+        self._dispatch(keys)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.publish(self.channel, json.dumps(keys))
+        except Exception as e:
+            logger.warning(f'Cache invalidation publish failed for {keys}: {e}')
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    self._reset()
+                    async for message in pubsub.listen():
+                        self._dispatch(json.loads(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f'Cache invalidation subscriber disconnected: {e}')
+                await asyncio.sleep(self.reconnect_delay)
+
+    def start(self, redis: Redis) -> None:
+        self.redis = redis
+        self._task = asyncio.create_task(self._listen(), name='cache-invalidation-bus')
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+
+cache_bus = CacheInvalidationBus(channel=config.CACHE_INVALIDATION_CHANNEL)
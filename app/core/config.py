@@ -2,6 +2,19 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Config(BaseSettings):
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARMUP: int = 5
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_BULK_BATCH_SIZE: int = 500
+
+    DATABASE_REPLICA_URLS: str = ''
+    DATABASE_REPLICA_HEALTH_INTERVAL: int = 10
+    DATABASE_REPLICA_HEALTH_TIMEOUT: int = 2
+
     SECRET_KEY: str
 
     ADMIN_SECRET_KEY: str
@@ -13,13 +26,64 @@ class Config(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     ALGORITHM : str
 
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 4
+
     REDIS_HOST: str = 'redis'
     REDIS_PORT: int = 6379
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: int = 5
+
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_REDIS_TTL_SECONDS: int = 300
+
+    ENTITLEMENT_CACHE_TTL_SECONDS: int = 30
+    ENTITLEMENT_CACHE_MAX_SIZE: int = 10000
+    ENTITLEMENT_CACHE_REDIS_TTL_SECONDS: int = 3600
+
+    COURSE_COUNT_CACHE_TTL_SECONDS: int = 30
+    COURSE_CACHE_TTL_SECONDS: int = 60
+    COURSE_CACHE_STALE_SECONDS: int = 30
+    CACHE_LOCK_TTL_SECONDS: float = 5
+    CACHE_LOCK_POLL_INTERVAL_SECONDS: float = 0.05
+    CACHE_L1_TTL_SECONDS: int = 30
+    CACHE_L1_MAX_SIZE: int = 10000
+    CACHE_L1_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_INVALIDATION_CHANNEL: str = 'cache:invalidate'
+
+    COURSE_STATS_RECONCILE_INTERVAL_SECONDS: int = 3600
+    # Тяжёлые фоновые задачи не стартуют вместе с воркером: деплой не запускает их сразу во всех процессах
+    PERIODIC_TASK_INITIAL_DELAY_SECONDS: int = 300
+
+    COURSE_EXPORT_BATCH_SIZE: int = 500
+    COURSE_IMPORT_MAX_LINE_BYTES: int = 1024 * 1024
+
+    QUIZ_CACHE_TTL_SECONDS: int = 300
+    QUIZ_CACHE_MAX_SIZE: int = 10000
+    QUIZ_ATTEMPT_BATCH_SIZE: int = 500
+    QUIZ_ATTEMPT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    QUIZ_ATTEMPT_MAX_BUFFER: int = 20000
+    QUIZ_ANSWER_MAX_LENGTH: int = 500
+    QUIZ_ANSWER_MAX_ITEMS: int = 50
+    QUIZ_PATTERN_MAX_LENGTH: int = 200
+
+    ORDER_GAP: int = 1024
+    ORDER_MIN_GAP: int = 2
+    ORDER_REBALANCE_INTERVAL_SECONDS: int = 3600
+
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    SQL_QUERY_BUDGET_STRICT: bool = False
 
     YOOKASSA_SHOP_ID: str
     YOOKASSA_API_SECRET_KEY: str
     YOOKASSA_RETURN_URL: str
 
+    @property
+    def REPLICA_URLS(self) -> list[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(',') if url.strip()]
+
     @property
     def REDIS_URL(self) -> str:
         return f'redis://{self.REDIS_HOST}:{self.REDIS_PORT}'
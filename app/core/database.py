@@ -1,14 +1,205 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable
+
+from loguru import logger
+from sqlalchemy import event, exc, make_url, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import config
 
-async_engine = create_async_engine(url=config.DATABASE_URL,echo=False)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """QueuePool, который считает выдачи соединений, время ожидания и таймауты"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        self.checkouts += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return record
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+        }
+
+
+def _engine_options(url: str) -> dict:
+    backend = make_url(url).get_backend_name()
+    if backend == 'sqlite':
+        return {}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+    if make_url(url).get_driver_name() == 'asyncpg':
+        options["connect_args"] = {
+            "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+class ReplicaRouter:
+    """Round-robin по живым репликам. Если живых реплик нет, чтение идёт в primary"""
+
+    def __init__(self, urls: list[str]):
+        self.engines: list[AsyncEngine] = [
+            create_async_engine(url=url, echo=False, **_engine_options(url)) for url in urls
+        ]
+        self.healthy: list[bool] = [True] * len(self.engines)
+        self._counter = itertools.count()
+
+    def get_read_engine(self) -> AsyncEngine | None:
+        for _ in range(len(self.engines)):
+            index = next(self._counter) % len(self.engines)
+            if self.healthy[index]:
+                return self.engines[index]
+        return None
+
+    async def check_health(self) -> None:
+        for index, engine in enumerate(self.engines):
+            try:
+                async with engine.connect() as connection:
+                    await asyncio.wait_for(connection.execute(text('SELECT 1')), timeout=config.DATABASE_REPLICA_HEALTH_TIMEOUT)
+                healthy = True
+            except Exception as e:
+                logger.warning(f'Replica {engine.url.host} is unhealthy: {e}')
+                healthy = False
+            if healthy != self.healthy[index]:
+                logger.info(f'Replica {engine.url.host} healthy={healthy}')
+            self.healthy[index] = healthy
+
+    def stats(self) -> list[dict]:
+        return [
+            {"host": engine.url.host, "healthy": self.healthy[index], "pool": _pool_stats(engine)}
+            for index, engine in enumerate(self.engines)
+        ]
+
+
+class RoutingSession(Session):
+    """
+        Отправляет чтения из методов с @read_only на реплику.
+        После первой записи в сессии все запросы идут в primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get('read_only') and not self.info.get('wrote') and not self._flushing:
+            engine = replica_router.get_read_engine()
+            if engine is not None:
+                return engine.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_flush_as_write(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_dml_as_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+@event.listens_for(RoutingSession, 'after_rollback')
+def _reset_write_mark(session):
+    """Транзакция завершена - следующие чтения снова могут идти на реплику"""
+    session.info.pop('wrote', None)
+
+
+async_engine = create_async_engine(url=config.DATABASE_URL, echo=False, **_engine_options(config.DATABASE_URL))
+replica_router = ReplicaRouter(config.REPLICA_URLS)
 AsyncSessionLocal = async_sessionmaker(
     bind=async_engine,
     expire_on_commit=False,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
 )
 
+
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable]) -> None:
+    """Регистрирует действие (инвалидация кэша, уведомление), которое выполнится после коммита запроса"""
+    session.info.setdefault('after_commit', []).append(callback)
+
+
+@asynccontextmanager
+async def unit_of_work(session_factory: async_sessionmaker = AsyncSessionLocal):
+    """
+        Сессия на весь запрос. Репозитории только делают flush,
+        коммит один - в конце запроса и только если были записи.
+    """
+    async with session_factory() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+        if not (session.info.get('wrote') or session.new or session.dirty or session.deleted):
+            return
+
+        await session.commit()
+        for callback in session.info.pop('after_commit', []):
+            try:
+                await callback()
+            except Exception:
+                logger.exception('After-commit callback failed')
+
+
+async def warmup_pool(connections: int = config.DB_POOL_WARMUP) -> None:
+    """Открывает соединения заранее, чтобы первые запросы не платили за handshake"""
+    async def _touch():
+        async with async_engine.connect() as connection:
+            await connection.execute(text('SELECT 1'))
+
+    await asyncio.gather(*(_touch() for _ in range(connections)))
+
+
+def _pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.stats()
+    return {"status": pool.status()}
+
+
+def get_pool_stats() -> dict:
+    return {
+        "primary": _pool_stats(async_engine),
+        "replicas": replica_router.stats(),
+    }
+
+
 class Base(DeclarativeBase):
-    pass
\ No newline at end of file
+    pass
@@ -1,18 +1,20 @@
 from collections.abc import AsyncGenerator
-from typing import Annotated
+from typing import Annotated, NamedTuple
 
 import jwt
-import redis.asyncio as redis_asyncio
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from loguru import logger
 from redis.asyncio.client import Redis
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.core.config import config
-from app.core.database import AsyncSessionLocal
+from app.core.database import AsyncSessionLocal, unit_of_work
 from app.core.exceptions import ForbiddenException
 from app.core.exceptions import NotFoundException
+from app.core.principal_cache import principal_cache
+from app.core.redis_pool import redis_pool
 from app.core.websocket_manager import ConnectionManager
 from app.core.websocket_manager import manager
 from app.helpers.user_role import UserRoleEnum
@@ -22,6 +24,7 @@ from app.models.step import StepORM
 from app.models.user import UserORM
 from app.repositories.comment import CommentRepository
 from app.repositories.course import CourseRepository
+from app.repositories.course_stats import CourseStatsRepository
 from app.repositories.lesson import LessonRepository
 from app.repositories.purchase import PurchaseRepository
 from app.repositories.reaction import ReactionRepository
@@ -30,9 +33,11 @@ from app.repositories.progress import ProgressRepository
 from app.repositories.user import UserRepository
 from app.services.comment import CommentService
 from app.services.course import CourseService
+from app.services.course_transfer import CourseTransferService
 from app.services.lesson import LessonService
 from app.services.notification import NotificationService
 from app.services.purchase import PurchaseService
+from app.services.quiz import QuizService
 from app.services.reaction import ReactionService
 from app.services.step import StepService
 from app.services.user import UserService
@@ -40,20 +45,24 @@ from app.services.lesson_completion import LessonCompletionService
 from app.repositories.lesson_completion import LessonCompletionRepository
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+def get_session_factory() -> async_sessionmaker:
+    """Фабрика сессий приложения; тесты подменяют её, чтобы и запрос, и фоновые чтения шли в тестовую БД"""
+    return AsyncSessionLocal
+
+
+SessionFactory = Annotated[async_sessionmaker, Depends(get_session_factory)]
+
+
+async def get_db(session_factory: SessionFactory) -> AsyncGenerator[AsyncSession, None]:
+    async with unit_of_work(session_factory) as session:
         yield session
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="user/login")
 
-DBSession = Annotated[AsyncSession, Depends(get_db)]
+DBSession = Annotated[AsyncSession, Depends(get_db, scope="function")]
 
-async def get_redis():
-    client = redis_asyncio.from_url(config.REDIS_URL, decode_responses=True)
-    try:
-        yield client
-    finally:
-        await client.close()
+async def get_redis() -> Redis:
+    return redis_pool.client
 
 async def service_http_user_id(request: Request):
     return request.client.host
@@ -62,16 +71,36 @@ async def get_user_service(db: DBSession) -> UserService:
     return UserService(repository=UserRepository(session=db))
 
 async def get_course_service(db: DBSession) -> CourseService:
-    return CourseService(course_repo=CourseRepository(session=db))
+    return CourseService(course_repo=CourseRepository(session=db), stats_repo=CourseStatsRepository(session=db))
+
+async def get_course_transfer_service(db: DBSession, session_factory: SessionFactory) -> CourseTransferService:
+    return CourseTransferService(
+        course_repo=CourseRepository(session=db),
+        lesson_repo=LessonRepository(session=db),
+        step_repo=StepRepository(session=db),
+        stats_repo=CourseStatsRepository(session=db),
+        session_factory=session_factory,
+    )
 
-async def get_lesson_repository(db: AsyncSession = Depends(get_db)) -> LessonRepository:
+async def get_lesson_repository(db: DBSession) -> LessonRepository:
     return LessonRepository(session=db)
 
 async def get_lesson_service(db: DBSession) -> LessonService:
-    return LessonService(lesson_repo=LessonRepository(session=db), purchase_repo=PurchaseRepository(session=db))
+    return LessonService(
+        lesson_repo=LessonRepository(session=db),
+        purchase_repo=PurchaseRepository(session=db),
+        stats_repo=CourseStatsRepository(session=db),
+    )
 
 async def get_step_service(db: DBSession) -> StepService:
-    return StepService(step_repo=StepRepository(session=db), purchase_repo=PurchaseRepository(session=db))
+    return StepService(
+        step_repo=StepRepository(session=db),
+        purchase_repo=PurchaseRepository(session=db),
+        stats_repo=CourseStatsRepository(session=db),
+    )
+
+async def get_quiz_service(db: DBSession) -> QuizService:
+    return QuizService(step_repo=StepRepository(session=db), purchase_repo=PurchaseRepository(session=db))
 
 async def get_purchase_service(
         db: DBSession
@@ -79,6 +108,7 @@ async def get_purchase_service(
     return PurchaseService(
         purchase_repo=PurchaseRepository(session=db),
         course_repo=CourseRepository(session=db),
+        stats_repo=CourseStatsRepository(session=db),
         shop_id=config.YOOKASSA_SHOP_ID,
         secret_key=config.YOOKASSA_API_SECRET_KEY
     )
@@ -97,7 +127,7 @@ async def get_comment_service(db: DBSession, notification_service = Depends(get_
     step_repo = StepRepository(session=db)
     purchase_repo = PurchaseRepository(session=db)
 
-    step_service = StepService(step_repo=step_repo, purchase_repo=purchase_repo)
+    step_service = StepService(step_repo=step_repo, purchase_repo=purchase_repo, stats_repo=CourseStatsRepository(session=db))
 
     comment_repo = CommentRepository(session=db)
 
@@ -109,7 +139,12 @@ async def get_lesson_completion_service(
         purchase_service: PurchaseService = Depends(get_purchase_service),
 ) -> LessonCompletionService:
 
-    return LessonCompletionService(lesson_completion_repo=LessonCompletionRepository(session=db), progress_repo=ProgressRepository(session=db), purchase_service=purchase_service)
+    return LessonCompletionService(
+        lesson_completion_repo=LessonCompletionRepository(session=db),
+        progress_repo=ProgressRepository(session=db),
+        purchase_service=purchase_service,
+        stats_repo=CourseStatsRepository(session=db),
+    )
 
 
 
@@ -142,21 +177,87 @@ async def get_current_user(
     except (jwt.PyJWTError, jwt.ExpiredSignatureError):
         raise credentials_exception
 
-    user = await user_service.repository.get_by_username(username)
-    if not user:
+    user = await principal_cache.get(token)
+    if user is None:
+        epoch = principal_cache.epoch
+        user = await user_service.repository.get_by_username(username)
+        if not user:
+            raise credentials_exception
+        await principal_cache.set(token, user, epoch=epoch)
+
+    if not user.is_active:
         raise credentials_exception
     return user
 
 
+async def get_admin_user(
+        user: Annotated[UserORM, Depends(get_current_user)],
+) -> UserORM:
+    if not user.is_admin:
+        raise ForbiddenException(message="Only admins can access this resource")
+    return user
 
-async def validation_course_id(
+
+class CoursePath(NamedTuple):
+    course: CourseORM
+    lesson: LessonORM | None
+    step: StepORM | None
+    is_paid: bool
+    user_id: int | None
+
+
+def _path_int(request: Request, name: str) -> int | None:
+    try:
+        return int(request.path_params[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def _token_user_id(request: Request) -> int | None:
+    """id пользователя из JWT без похода в БД. Невалидный токен здесь не ошибка - её вернёт get_current_user"""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    try:
+        payload = jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
+    except jwt.PyJWTError:
+        return None
+    user_id = payload.get('id')
+    return user_id if isinstance(user_id, int) else None
+
+
+async def resolve_course_path(
         course_id: int,
-        db: DBSession
-):
-    course = await CourseRepository(session=db).get_by_id(course_id)
-    if not course:
+        request: Request,
+        db: DBSession,
+) -> CoursePath:
+    """
+        Курс, урок и шаг из пути и оплату курса текущим пользователем одним запросом.
+        FastAPI кэширует зависимость в рамках запроса, поэтому
+        validation_course_id, valid_lesson, valid_step и check_course_purchase делят один запрос.
+    """
+    user_id = _token_user_id(request)
+    row = await CourseRepository(session=db).get_course_path(
+        course_id=course_id,
+        lesson_id=_path_int(request, 'lesson_id'),
+        step_id=_path_int(request, 'step_id'),
+        user_id=user_id,
+    )
+    if row is None:
         raise NotFoundException(message="Course not found")
-    return course
+
+    course, lesson, step, is_paid = row
+    if lesson is not None:
+        set_committed_value(lesson, 'course', course)
+    if step is not None:
+        set_committed_value(step, 'lesson', lesson)
+    return CoursePath(course=course, lesson=lesson, step=step, is_paid=bool(is_paid), user_id=user_id)
+
+
+async def validation_course_id(
+        path: Annotated[CoursePath, Depends(resolve_course_path)],
+) -> CourseORM:
+    return path.course
 
 async def get_course_with_access(
         course: Annotated[CourseORM, Depends(validation_course_id)],
@@ -169,38 +270,35 @@ async def get_course_with_access(
 
 
 async def check_course_purchase(
-        course: Annotated[CourseORM, Depends(validation_course_id)],
+        path: Annotated[CoursePath, Depends(resolve_course_path)],
         user: Annotated[UserORM, Depends(get_current_user)],
         purchase_service: PurchaseService = Depends(get_purchase_service),
 
 ) -> CourseORM:
-    is_paid = await purchase_service.check_is_course_paid(user.id, course.id)
+    if path.user_id == user.id:
+        is_paid = path.is_paid
+    else:
+        is_paid = await purchase_service.check_is_course_paid(user.id, path.course.id)
 
     if not is_paid:
         raise ForbiddenException(message="Вы не купили этот курс!")
 
-    return course
+    return path.course
 
 async def valid_lesson(
         lesson_id: int,
-        course: Annotated[CourseORM, Depends(validation_course_id)],
-        db: DBSession
+        path: Annotated[CoursePath, Depends(resolve_course_path)],
 ) -> LessonORM:
-    repo = LessonRepository(db)
-    lesson = await repo.get_lesson_with_course(lesson_id)
+    if path.lesson is None:
+        raise NotFoundException(message=f"Lesson {lesson_id} not found in course {path.course.id}")
 
-    if not lesson or lesson.course_id != course.id:
-        raise NotFoundException(message=f"Lesson {lesson_id} not found in course {course.id}")
-
-    return lesson
+    return path.lesson
 
 async def valid_step(
         step_id: int,
         lesson: Annotated[LessonORM, Depends(valid_lesson)],
-        db: DBSession
+        path: Annotated[CoursePath, Depends(resolve_course_path)],
 ) -> StepORM:
-    repo = StepRepository(db)
-    step = await repo.get_by_id(step_id)
-    if not step or step.lesson_id != lesson.id:
+    if path.step is None:
         raise NotFoundException(message=f"Step {step_id} not found in lesson {lesson.id}")
-    return step
\ No newline at end of file
+    return path.step
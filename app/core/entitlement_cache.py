@@ -0,0 +1,150 @@
+from typing import Awaitable, Callable
+
+from loguru import logger
+from redis.asyncio.client import Redis
+
+from app.core.cache_bus import cache_bus
+from app.core.config import config
+from app.utils.ttl_cache import TTLCache
+
+# Redis не хранит пустые множества, поэтому загруженный набор помечается маркером.
+# Множество без маркера (например, созданное grant после истечения TTL) считается незагруженным.
+_LOADED_MARKER = '0'
+
+# Заполнение множества из БД, только если с момента чтения версии не было grant/revoke:
+# иначе загруженный до них набор затёр бы их изменение.
+# KEYS[1] - множество, KEYS[2] - версия; ARGV[1] - прочитанная версия, ARGV[2] - TTL, ARGV[3:] - члены
+_FILL_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('SADD', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class EntitlementCache:
+    """
+        Купленные курсы пользователя: множество id в Redis и in-process near cache поверх него.
+        Положительный ответ near cache отдаётся сразу, отрицательный перепроверяется в Redis,
+        чтобы только что оплаченный курс открывался на всех воркерах без ожидания TTL.
+        Отзыв рассылается через cache_bus и вытесняет near cache пользователя на всех воркерах.
+        grant и revoke увеличивают версию пользователя, и загрузка из БД, начатая до них, не пишется в Redis.
+    """
+
+    def __init__(self, max_size: int, ttl: int, redis_ttl: int, prefix: str = 'entitlements'):
+        self._local = TTLCache(max_size=max_size, ttl=ttl)
+        self.redis_ttl = redis_ttl
+        self.prefix = prefix
+        self.redis: Redis | None = None
+        # Счётчик вытеснений: набор, прочитанный до вытеснения, не кладётся в near cache
+        self._epoch = 0
+        cache_bus.add_listener(self._evict, reset=self._clear)
+
+    def init(self, redis: Redis) -> None:
+        self.redis = redis
+
+    def _user_key(self, user_id: int) -> str:
+        return f'{self.prefix}:user:{user_id}'
+
+    def _version_key(self, user_id: int) -> str:
+        return f'{self.prefix}:version:{user_id}'
+
+    def _evict(self, keys: list[str]) -> None:
+        for key in keys:
+            prefix, _, user_id = key.rpartition(':')
+            if prefix == f'{self.prefix}:user' and user_id.isdigit():
+                self._epoch += 1
+                self._local.pop(int(user_id))
+
+    def _clear(self) -> None:
+        self._epoch += 1
+        self._local.clear()
+
+    async def _read_redis(self, user_id: int) -> frozenset[int] | None:
+        if self.redis is None:
+            return None
+        try:
+            members = await self.redis.smembers(self._user_key(user_id))
+        except Exception as e:
+            logger.warning(f'Entitlement cache read failed for user {user_id}: {e}')
+            return None
+        members = {member.decode() if isinstance(member, bytes) else member for member in members}
+        if _LOADED_MARKER not in members:
+            return None
+        return frozenset(int(member) for member in members if member != _LOADED_MARKER)
+
+    async def _read_version(self, user_id: int) -> str | None:
+        if self.redis is None:
+            return None
+        try:
+            version = await self.redis.get(self._version_key(user_id))
+        except Exception as e:
+            logger.warning(f'Entitlement version read failed for user {user_id}: {e}')
+            return None
+        if isinstance(version, bytes):
+            version = version.decode()
+        return version or '0'
+
+    async def _fill_redis(self, user_id: int, version: str, course_ids: frozenset[int]) -> None:
+        try:
+            await self.redis.eval(
+                _FILL_SCRIPT, 2, self._user_key(user_id), self._version_key(user_id),
+                version, self.redis_ttl, _LOADED_MARKER, *course_ids,
+            )
+        except Exception as e:
+            logger.warning(f'Entitlement cache write failed for user {user_id}: {e}')
+
+    async def get_course_ids(self, user_id: int, loader: Callable[[], Awaitable[list[int]]]) -> frozenset[int]:
+        epoch = self._epoch
+        course_ids = await self._read_redis(user_id)
+        if course_ids is None:
+            version = await self._read_version(user_id)
+            course_ids = frozenset(await loader())
+            if version is not None:
+                await self._fill_redis(user_id, version, course_ids)
+        if epoch == self._epoch:
+            self._local.set(user_id, course_ids)
+        return course_ids
+
+    async def has_course(self, user_id: int, course_id: int, loader: Callable[[], Awaitable[list[int]]]) -> bool:
+        course_ids = self._local.get(user_id)
+        if course_ids is not None and course_id in course_ids:
+            return True
+        return course_id in await self.get_course_ids(user_id, loader)
+
+    async def grant(self, user_id: int, course_id: int) -> None:
+        self._local.pop(user_id)
+        if self.redis is None:
+            return
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.incr(self._version_key(user_id))
+                pipe.expire(self._version_key(user_id), self.redis_ttl)
+                pipe.sadd(self._user_key(user_id), course_id)
+                pipe.expire(self._user_key(user_id), self.redis_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f'Entitlement grant failed for user {user_id}, course {course_id}: {e}')
+
+    async def revoke(self, user_id: int, course_id: int) -> None:
+        if self.redis is not None:
+            try:
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    pipe.incr(self._version_key(user_id))
+                    pipe.expire(self._version_key(user_id), self.redis_ttl)
+                    pipe.srem(self._user_key(user_id), course_id)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f'Entitlement revoke failed for user {user_id}, course {course_id}: {e}')
+        # Положительный ответ near cache не перепроверяется, поэтому его нужно вытеснить на всех воркерах
+        await cache_bus.publish([self._user_key(user_id)])
+
+
+entitlement_cache = EntitlementCache(
+    max_size=config.ENTITLEMENT_CACHE_MAX_SIZE,
+    ttl=config.ENTITLEMENT_CACHE_TTL_SECONDS,
+    redis_ttl=config.ENTITLEMENT_CACHE_REDIS_TTL_SECONDS,
+)
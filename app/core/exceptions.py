@@ -32,4 +32,8 @@ class ConflictException(BaseAppException):
 
 class ForbiddenException(BaseAppException):
     status_code=status.HTTP_403_FORBIDDEN
-    message="Forbidden"
\ No newline at end of file
+    message="Forbidden"
+
+class QueryBudgetExceededException(BaseAppException):
+    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+    message="Query budget exceeded"
\ No newline at end of file
@@ -0,0 +1,124 @@
+import hashlib
+import json
+from datetime import datetime
+
+from loguru import logger
+from redis.asyncio.client import Redis
+
+from app.core.cache_bus import cache_bus
+from app.core.config import config
+from app.helpers.user_role import UserRoleEnum
+from app.models.user import UserORM
+from app.utils.ttl_cache import TTLCache
+
+
+class PrincipalCache:
+    """
+        Кэш пользователей по хэшу проверенного JWT.
+        Первый уровень - in-process TTL/LRU, второй - Redis.
+        Инвалидация пользователя (смена роли, деактивация) рассылается через cache_bus на все воркеры;
+        PRINCIPAL_CACHE_TTL_SECONDS ограничивает устаревание, если сообщение потерялось.
+    """
+    _fields = ('id', 'email', 'username', 'full_name', 'role', 'is_active', 'created_at', 'updated_at')
+
+    def __init__(self, max_size: int, ttl: int, redis_ttl: int, prefix: str = 'principal'):
+        self._local = TTLCache(max_size=max_size, ttl=ttl)
+        self.redis_ttl = redis_ttl
+        self.prefix = prefix
+        self.redis: Redis | None = None
+        # Счётчик инвалидаций: снимок, прочитанный до инвалидации, не кладётся в кэш
+        self.epoch = 0
+        cache_bus.add_listener(self._evict, reset=self._clear)
+
+    def init(self, redis: Redis) -> None:
+        self.redis = redis
+
+    @staticmethod
+    def _token_hash(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _token_key(self, token_hash: str) -> str:
+        return f'{self.prefix}:token:{token_hash}'
+
+    def _user_key(self, user_id: int) -> str:
+        return f'{self.prefix}:user:{user_id}'
+
+    def _evict(self, keys: list[str]) -> None:
+        for key in keys:
+            prefix, _, user_id = key.rpartition(':')
+            if prefix == f'{self.prefix}:user' and user_id.isdigit():
+                self.epoch += 1
+                self._local.pop_where(lambda _, data: data['id'] == int(user_id))
+
+    def _clear(self) -> None:
+        self.epoch += 1
+        self._local.clear()
+
+    def _snapshot(self, user: UserORM) -> dict:
+        data = {field: getattr(user, field) for field in self._fields}
+        data['role'] = UserRoleEnum(data['role']).value
+        data['created_at'] = data['created_at'].isoformat() if data['created_at'] else None
+        data['updated_at'] = data['updated_at'].isoformat() if data['updated_at'] else None
+        return data
+
+    @staticmethod
+    def _to_user(data: dict) -> UserORM:
+        values = dict(data)
+        values['role'] = UserRoleEnum(values['role'])
+        for field in ('created_at', 'updated_at'):
+            if values[field]:
+                values[field] = datetime.fromisoformat(values[field])
+        return UserORM(**values)
+
+    async def get(self, token: str) -> UserORM | None:
+        token_hash = self._token_hash(token)
+        data = self._local.get(token_hash)
+        epoch = self.epoch
+        if data is None and self.redis is not None:
+            try:
+                raw = await self.redis.get(self._token_key(token_hash))
+            except Exception as e:
+                logger.warning(f'Principal cache read failed: {e}')
+                raw = None
+            if raw:
+                data = json.loads(raw)
+                if epoch == self.epoch:
+                    self._local.set(token_hash, data)
+        return self._to_user(data) if data else None
+
+    async def set(self, token: str, user: UserORM, epoch: int | None = None) -> None:
+        """epoch - значение self.epoch до загрузки user из БД; если с тех пор была инвалидация, снимок не кэшируется"""
+        if epoch is not None and epoch != self.epoch:
+            return
+        token_hash = self._token_hash(token)
+        data = self._snapshot(user)
+        self._local.set(token_hash, data)
+        if self.redis is None:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(self._token_key(token_hash), json.dumps(data), ex=self.redis_ttl)
+                pipe.sadd(self._user_key(user.id), token_hash)
+                pipe.expire(self._user_key(user.id), self.redis_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f'Principal cache write failed: {e}')
+
+    async def invalidate_user(self, user_id: int) -> None:
+        if self.redis is not None:
+            try:
+                user_key = self._user_key(user_id)
+                token_hashes = await self.redis.smembers(user_key)
+                keys = [self._token_key(h.decode() if isinstance(h, bytes) else h) for h in token_hashes]
+                await self.redis.delete(user_key, *keys)
+            except Exception as e:
+                logger.warning(f'Principal cache invalidation failed for user {user_id}: {e}')
+        # После очистки Redis: воркер, получивший сообщение, не перечитает оттуда старый снимок
+        await cache_bus.publish([self._user_key(user_id)])
+
+
+principal_cache = PrincipalCache(
+    max_size=config.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=config.PRINCIPAL_CACHE_TTL_SECONDS,
+    redis_ttl=config.PRINCIPAL_CACHE_REDIS_TTL_SECONDS,
+)
@@ -0,0 +1,81 @@
+import asyncio
+
+from loguru import logger
+
+from app.core.config import config
+from app.core.database import AsyncSessionLocal, unit_of_work
+from app.repositories.quiz_attempt import QuizAttemptRepository
+
+
+class QuizAttemptWriter:
+    """
+        Попытки квизов копятся в памяти воркера и пишутся пачками: раз в flush_interval
+        или сразу, как набралось batch_size. На таймированном тесте это один INSERT на пачку
+        вместо транзакции на каждый ответ. Цена - попытки последней пачки теряются при падении воркера.
+        Пачка, которую не удалось записать, возвращается в буфер и повторяется на следующем сбросе.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_buffer: int, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer: list[dict] = []
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def add(self, row: dict) -> None:
+        self._buffer.append(row)
+        if len(self._buffer) >= self.max_buffer:
+            # Запись не успевает за потоком попыток: притормаживаем отправителя до сброса пачки
+            await self.flush()
+        elif len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            while self._buffer:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+                try:
+                    async with unit_of_work(self.session_factory) as session:
+                        written = await QuizAttemptRepository(session).insert_attempts(batch)
+                    logger.debug(f'Quiz attempts written: {written} of {len(batch)}')
+                except asyncio.CancelledError:
+                    # Остановка посреди записи: пачка вернётся в буфер и уйдёт финальным flush в stop()
+                    self._buffer[:0] = batch
+                    raise
+                except Exception:
+                    if len(self._buffer) + len(batch) > self.max_buffer:
+                        logger.exception(f'Failed to write {len(batch)} quiz attempts, buffer is full, dropping them')
+                    else:
+                        logger.exception(f'Failed to write {len(batch)} quiz attempts, will retry')
+                        self._buffer[:0] = batch
+                    break
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name='quiz-attempt-writer')
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+
+quiz_attempt_writer = QuizAttemptWriter(
+    batch_size=config.QUIZ_ATTEMPT_BATCH_SIZE,
+    flush_interval=config.QUIZ_ATTEMPT_FLUSH_INTERVAL_SECONDS,
+    max_buffer=config.QUIZ_ATTEMPT_MAX_BUFFER,
+)
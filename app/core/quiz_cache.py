@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, NamedTuple
+
+from app.core.cache_bus import cache_bus
+from app.core.config import config
+from app.helpers.quiz import QuizChecker
+from app.utils.ttl_cache import TTLCache
+
+
+class CompiledQuiz(NamedTuple):
+    step_id: int
+    lesson_id: int
+    course_id: int
+    author_id: int
+    version: datetime | None
+    checker: QuizChecker
+
+
+class QuizCache:
+    """
+        Скомпилированные проверщики квизов по id шага, in-process.
+        Изменение или удаление шага рассылается через cache_bus, и следующая попытка компилирует новую версию;
+        удаление урока или курса вытесняет все их шаги одним ключом quiz:lesson:{id} / quiz:course:{id}.
+        TTL ограничивает устаревание, если сообщение потерялось. Холодный шаг загружается одним запросом на воркер.
+    """
+
+    def __init__(self, max_size: int, ttl: int, prefix: str = 'quiz'):
+        self._local = TTLCache(max_size=max_size, ttl=ttl)
+        self.prefix = prefix
+        self._inflight: dict[int, asyncio.Future] = {}
+        cache_bus.add_listener(self._evict, reset=self._local.clear)
+
+    def _evict(self, keys: list[str]) -> None:
+        for key in keys:
+            prefix, _, object_id = key.rpartition(':')
+            namespace, _, scope = prefix.rpartition(':')
+            if namespace != self.prefix or not object_id.isdigit():
+                continue
+            object_id = int(object_id)
+            if scope == 'step':
+                self._local.pop(object_id)
+            elif scope == 'lesson':
+                self._local.pop_where(lambda _, quiz: quiz.lesson_id == object_id)
+            elif scope == 'course':
+                self._local.pop_where(lambda _, quiz: quiz.course_id == object_id)
+
+    async def get(self, step_id: int, loader: Callable[[], Awaitable[CompiledQuiz | None]]) -> CompiledQuiz | None:
+        compiled = self._local.get(step_id)
+        if compiled is not None:
+            return compiled
+
+        inflight = self._inflight.get(step_id)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[step_id] = future
+        try:
+            compiled = await loader()
+            future.set_result(compiled)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(step_id, None)
+
+        if compiled is not None:
+            self._local.set(step_id, compiled)
+        return compiled
+
+    async def invalidate(self, step_id: int) -> None:
+        await cache_bus.publish([f'{self.prefix}:step:{step_id}'])
+
+    async def invalidate_lesson(self, lesson_id: int) -> None:
+        await cache_bus.publish([f'{self.prefix}:lesson:{lesson_id}'])
+
+    async def invalidate_course(self, course_id: int) -> None:
+        await cache_bus.publish([f'{self.prefix}:course:{course_id}'])
+
+
+quiz_cache = QuizCache(max_size=config.QUIZ_CACHE_MAX_SIZE, ttl=config.QUIZ_CACHE_TTL_SECONDS)
@@ -0,0 +1,55 @@
+from redis.asyncio import BlockingConnectionPool
+from redis.asyncio.client import Redis
+
+from app.core.config import config
+
+
+class RedisPool:
+    """Общий пул соединений Redis на весь процесс. Создаётся в lifespan, отдаётся через get_redis"""
+
+    def __init__(self, url: str, max_connections: int, timeout: int):
+        self.url = url
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._pool: BlockingConnectionPool | None = None
+        self._client: Redis | None = None
+
+    @property
+    def client(self) -> Redis:
+        if self._client is None:
+            self._pool = BlockingConnectionPool.from_url(
+                self.url,
+                max_connections=self.max_connections,
+                timeout=self.timeout,
+            )
+            self._client = Redis(connection_pool=self._pool)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            await self._pool.disconnect()
+            self._client = None
+            self._pool = None
+
+    def stats(self) -> dict:
+        if self._pool is None:
+            return {"max_connections": self.max_connections, "created": 0, "idle": 0, "in_use": 0, "utilization": 0.0}
+
+        created = len(self._pool._connections)
+        idle = sum(1 for connection in self._pool.pool._queue if connection is not None)
+        in_use = created - idle
+        return {
+            "max_connections": self.max_connections,
+            "created": created,
+            "idle": idle,
+            "in_use": in_use,
+            "utilization": round(in_use / self.max_connections, 3),
+        }
+
+
+redis_pool = RedisPool(
+    url=config.REDIS_URL,
+    max_connections=config.REDIS_MAX_CONNECTIONS,
+    timeout=config.REDIS_POOL_TIMEOUT,
+)
@@ -0,0 +1,264 @@
+import asyncio
+import functools
+import inspect
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from fastapi import Request, Response
+from fastapi_cache import Coder, FastAPICache
+from loguru import logger
+
+from app.core.config import config
+from app.utils.cache_coder import ResponseBytesCoder
+from app.utils.conditional import Validators
+from app.utils.ttl_cache import TTLCache
+
+# None вместо ключа - кэш сейчас использовать нельзя (например, не прочитано поколение), ответ считается напрямую
+KeyBuilder = Callable[[Request, dict], Awaitable[str | None]]
+ValidatorsBuilder = Callable[[Any], Validators]
+
+# Лок снимается, только если он всё ещё наш: после истечения lock_ttl его мог взять другой воркер
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class CacheEntry(NamedTuple):
+    fresh_until: float
+    payload: bytes
+    etag: str = ''
+    last_modified: float | None = None
+
+    @property
+    def validators(self) -> Validators | None:
+        if not self.etag:
+            return None
+        last_modified = None
+        if self.last_modified is not None:
+            last_modified = datetime.fromtimestamp(self.last_modified, tz=timezone.utc)
+        return Validators(etag=self.etag, last_modified=last_modified)
+
+
+def _pack(entry: CacheEntry) -> bytes:
+    last_modified = '' if entry.last_modified is None else f'{entry.last_modified:.6f}'
+    return f'{entry.fresh_until:.3f}\t{entry.etag}\t{last_modified}\n'.encode() + entry.payload
+
+
+def _unpack(raw: bytes) -> CacheEntry:
+    header, _, payload = raw.partition(b'\n')
+    fresh_until, etag, last_modified = (header.decode().split('\t') + ['', ''])[:3]
+    return CacheEntry(float(fresh_until), payload, etag, float(last_modified) if last_modified else None)
+
+
+class ResponseCache:
+    """
+        Кэш ответов с защитой от stampede.
+        На промахе ответ считает один запрос на ключ: остальные запросы этого воркера ждут его future,
+        другие воркеры ждут, пока владелец Redis-лока положит значение в кэш.
+        Запись живёт expire + stale секунд: после expire один запрос пересчитывает ответ,
+        а остальные в это время получают предыдущее значение.
+        Перед бэкендом стоит in-process L1 с ограничением по байтам: в нём лежат только свежие записи.
+        Ключи версионированы поколениями, поэтому после инвалидации старые записи L1 просто перестают читаться.
+    """
+
+    def __init__(self, lock_ttl: float, lock_poll_interval: float, local: TTLCache):
+        self.lock_ttl = lock_ttl
+        self.lock_poll_interval = lock_poll_interval
+        self._local = local
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def _redis():
+        # Лок между воркерами есть только у Redis-бэкенда; с другим бэкендом остаётся single-flight внутри процесса
+        return getattr(FastAPICache.get_backend(), 'redis', None)
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        fresh_for = entry.fresh_until - time.time()
+        if fresh_for > 0:
+            self._local.set(key, entry, ttl=min(fresh_for, self._local.ttl))
+
+    async def _read(self, key: str) -> CacheEntry | None:
+        entry = self._local.get(key)
+        if entry is not None:
+            return entry
+        try:
+            raw = await FastAPICache.get_backend().get(key)
+        except Exception as e:
+            logger.warning(f'Response cache read failed for {key}: {e}')
+            return None
+        if not raw:
+            return None
+        entry = _unpack(raw)
+        self._remember(key, entry)
+        return entry
+
+    async def _write(self, key: str, entry: CacheEntry, expire: int, stale: int) -> None:
+        self._remember(key, entry)
+        try:
+            await FastAPICache.get_backend().set(key, _pack(entry), expire + stale)
+        except Exception as e:
+            logger.warning(f'Response cache write failed for {key}: {e}')
+
+    async def _acquire_lock(self, key: str) -> str | None:
+        """Токен владельца лока; '' - лока между воркерами нет (не Redis или Redis недоступен), None - лок занят"""
+        redis = self._redis()
+        if redis is None:
+            return ''
+        token = secrets.token_hex(16)
+        try:
+            acquired = await redis.set(f'lock:{key}', token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as e:
+            logger.warning(f'Response cache lock failed for {key}: {e}')
+            return ''
+        return token if acquired else None
+
+    async def _release_lock(self, key: str, token: str) -> None:
+        redis = self._redis()
+        if redis is None or not token:
+            return
+        try:
+            await redis.eval(_RELEASE_LOCK_SCRIPT, 1, f'lock:{key}', token)
+        except Exception as e:
+            logger.warning(f'Response cache unlock failed for {key}: {e}')
+
+    async def _wait_for_value(self, key: str, newer_than: float) -> CacheEntry | None:
+        """Ждёт, пока владелец лока в другом воркере положит свежее значение"""
+        deadline = time.monotonic() + self.lock_ttl
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+            entry = await self._read(key)
+            if entry is not None and entry.fresh_until > newer_than:
+                return entry
+        return None
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[CacheEntry]], expire: int, stale: int,
+                       previous: CacheEntry | None) -> tuple[CacheEntry, str]:
+        token = await self._acquire_lock(key)
+        if token is None:
+            if previous is not None:
+                return previous, 'STALE'
+            entry = await self._wait_for_value(key, newer_than=0)
+            if entry is not None:
+                return entry, 'HIT'
+            logger.warning(f'Response cache lock wait timed out for {key}, computing anyway')
+            token = ''
+
+        try:
+            entry = (await compute())._replace(fresh_until=time.time() + expire)
+            await self._write(key, entry, expire, stale)
+        finally:
+            await self._release_lock(key, token)
+        return entry, 'MISS'
+
+    async def get_or_compute(
+            self,
+            key: str,
+            compute: Callable[[], Awaitable[CacheEntry]],
+            expire: int,
+            stale: int = 0,
+    ) -> tuple[CacheEntry, str, float]:
+        """Возвращает (запись, статус HIT/STALE/MISS, сколько секунд ответ ещё свежий)"""
+        entry = await self._read(key)
+        now = time.time()
+        if entry is not None and entry.fresh_until > now:
+            return entry, 'HIT', entry.fresh_until - now
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            if entry is not None:
+                return entry, 'STALE', 0
+            try:
+                result, _ = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # Отменили лидера (клиент отключился), а не этот запрос: считаем ответ сами
+                return await self.get_or_compute(key, compute, expire, stale)
+            return result, 'HIT', expire
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._compute(key, compute, expire, stale, previous=entry)
+            future.set_result(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        entry, status = result
+        return entry, status, expire if status == 'MISS' else 0
+
+    def cached(
+            self,
+            key_builder: KeyBuilder,
+            expire: int,
+            stale: int = 0,
+            coder: type[Coder] = ResponseBytesCoder,
+            validators: ValidatorsBuilder | None = None,
+    ):
+        """
+            Декоратор для GET-эндпоинтов, которые возвращают pydantic-модели.
+            Ответ кэшируется готовыми байтами и отдаётся как Response с заголовком X-FastAPI-Cache.
+            С validators в запись кэша кладутся ETag и Last-Modified ответа,
+            и условный GET получает 304 прямо из кэша.
+        """
+        def decorator(func: Callable[..., Awaitable[Any]]):
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            async def wrapper(*args, _cache_request: Request, **kwargs):
+                async def compute() -> CacheEntry:
+                    value = await func(*args, **kwargs)
+                    entry = CacheEntry(fresh_until=0, payload=coder.encode(value))
+                    if validators is None:
+                        return entry
+                    built = validators(value)
+                    last_modified = built.last_modified.timestamp() if built.last_modified else None
+                    return entry._replace(etag=built.etag, last_modified=last_modified)
+
+                key = None
+                if _cache_request.headers.get('Cache-Control') != 'no-cache':
+                    key = await key_builder(_cache_request, kwargs)
+                if key is None:
+                    entry, status, max_age = await compute(), 'MISS', 0
+                else:
+                    entry, status, max_age = await self.get_or_compute(key, compute, expire, stale)
+
+                headers = {
+                    'Cache-Control': f'max-age={int(max_age)}',
+                    FastAPICache.get_cache_status_header(): status,
+                }
+                entry_validators = entry.validators
+                if entry_validators is not None:
+                    headers.update(entry_validators.headers)
+                    if entry_validators.is_not_modified(_cache_request):
+                        return Response(status_code=304, headers=headers)
+                return Response(content=entry.payload, media_type='application/json', headers=headers)
+
+            request_param = inspect.Parameter('_cache_request', inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+            wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), request_param])
+            return wrapper
+
+        return decorator
+
+
+response_cache = ResponseCache(
+    lock_ttl=config.CACHE_LOCK_TTL_SECONDS,
+    lock_poll_interval=config.CACHE_LOCK_POLL_INTERVAL_SECONDS,
+    local=TTLCache(
+        max_size=config.CACHE_L1_MAX_SIZE,
+        ttl=config.CACHE_L1_TTL_SECONDS,
+        max_weight=config.CACHE_L1_MAX_BYTES,
+        weigher=lambda entry: len(entry.payload),
+    ),
+)
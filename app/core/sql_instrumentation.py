@@ -0,0 +1,120 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from fastapi import FastAPI, Request
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import config
+from app.core.exceptions import QueryBudgetExceededException
+
+
+class RequestSQLStats:
+    """Статистика SQL одного запроса: число стейтментов, время в БД и повторы одинаковых запросов"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(statement, count) for statement, count in self.statements.most_common() if count > threshold]
+
+    @property
+    def total_ms(self) -> float:
+        return round(self.total_seconds * 1000, 3)
+
+
+_request_stats: ContextVar[RequestSQLStats | None] = ContextVar('request_sql_stats', default=None)
+
+
+def current_sql_stats() -> RequestSQLStats | None:
+    return _request_stats.get()
+
+
+# Время старта хранится на контексте выполнения стейтмента: если стейтмент упал,
+# after_cursor_execute не вызовется, и контекст просто уйдёт вместе со своим значением
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = getattr(context, '_query_started_at', None)
+    stats = _request_stats.get()
+    if stats is not None and started_at is not None:
+        stats.record(statement, time.perf_counter() - started_at)
+
+
+class SQLInstrumentationMiddleware:
+    """
+        Собирает статистику SQL на время HTTP-запроса,
+        отдаёт её в заголовке Server-Timing и пишет в лог повторяющиеся запросы (N+1).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSQLStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                headers = list(message.get('headers', []))
+                headers.append((
+                    b'server-timing',
+                    f'db;dur={stats.total_ms};desc="{stats.count} queries"'.encode(),
+                ))
+                message['headers'] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            route = f"{scope['method']} {scope['path']}"
+            for statement, count in stats.repeated(config.SQL_N_PLUS_ONE_THRESHOLD):
+                logger.warning(f'Possible N+1 in {route}: statement ran {count} times: {statement[:200]}')
+            logger.debug(f'{route}: {stats.count} queries, {stats.total_ms} ms in DB')
+
+
+class QueryBudget:
+    """
+        Бюджет запросов к БД для роута. Подключается как
+        Depends(QueryBudget(5), scope='function'): проверка идёт после обработчика, до отправки ответа.
+    """
+
+    def __init__(self, max_queries: int):
+        self.max_queries = max_queries
+
+    async def __call__(self, request: Request):
+        yield
+        stats = _request_stats.get()
+        if stats is None or stats.count <= self.max_queries:
+            return
+
+        message = f'{request.method} {request.url.path} ran {stats.count} queries, budget is {self.max_queries}'
+        if config.SQL_QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceededException(log_message=message)
+        logger.warning(f'Query budget exceeded: {message}')
+
+
+def setup_sql_instrumentation(app: FastAPI) -> None:
+    if not config.SQL_INSTRUMENTATION_ENABLED:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    app.add_middleware(SQLInstrumentationMiddleware)
@@ -0,0 +1,83 @@
+import asyncio
+import secrets
+from typing import Awaitable, Callable, NamedTuple
+
+from loguru import logger
+from redis.asyncio.client import Redis
+
+
+class PeriodicJob(NamedTuple):
+    name: str
+    interval: float
+    func: Callable[[], Awaitable]
+    initial_delay: float
+    exclusive: bool
+
+
+class PeriodicTasks:
+    """
+        Фоновые задачи, которые запускаются в lifespan и повторяются с заданным интервалом.
+        Задача с exclusive=True выполняется одним воркером на интервал: перед запуском она берёт
+        в Redis ключ periodic:{name} (SET NX) на время интервала. Без Redis задача выполняется в каждом воркере.
+    """
+
+    def __init__(self, prefix: str = 'periodic'):
+        self.prefix = prefix
+        self._redis: Redis | None = None
+        self._jobs: list[PeriodicJob] = []
+        self._tasks: list[asyncio.Task] = []
+
+    def init(self, redis: Redis) -> None:
+        self._redis = redis
+
+    def register(
+            self,
+            name: str,
+            interval: float,
+            func: Callable[[], Awaitable],
+            initial_delay: float = 0.0,
+            exclusive: bool = False,
+    ) -> None:
+        self._jobs.append(PeriodicJob(name, interval, func, initial_delay, exclusive))
+
+    async def _claim(self, job: PeriodicJob) -> bool:
+        """Занимает интервал задачи; False - в этом интервале её уже выполнил или выполняет другой воркер"""
+        if not job.exclusive or self._redis is None:
+            return True
+        try:
+            claimed = await self._redis.set(
+                f'{self.prefix}:{job.name}', secrets.token_hex(8), nx=True, px=max(int(job.interval * 1000), 1),
+            )
+        except Exception as e:
+            logger.warning(f'Periodic task {job.name} lock failed, running without it: {e}')
+            return True
+        return bool(claimed)
+
+    async def _run(self, job: PeriodicJob) -> None:
+        if job.initial_delay:
+            await asyncio.sleep(job.initial_delay)
+        while True:
+            try:
+                if await self._claim(job):
+                    await job.func()
+                else:
+                    logger.debug(f'Periodic task {job.name} skipped: claimed by another worker')
+            except Exception:
+                logger.exception(f'Periodic task {job.name} failed')
+            await asyncio.sleep(job.interval)
+
+    def start(self) -> None:
+        for job in self._jobs:
+            self._tasks.append(asyncio.create_task(self._run(job), name=job.name))
+
+    async def stop(self) -> None:
+        """Задачи регистрируются заново при каждом входе в lifespan, поэтому вместе с ними сбрасываются и регистрации"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._jobs.clear()
+        self._redis = None
+
+
+periodic_tasks = PeriodicTasks()
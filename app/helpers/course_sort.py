@@ -0,0 +1,6 @@
+import enum
+
+class CourseSort(str, enum.Enum):
+    ID = "id"
+    NEWEST = "newest"
+    PRICE = "price"
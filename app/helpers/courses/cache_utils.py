@@ -1,22 +1,164 @@
+import hashlib
+from typing import Awaitable, Callable
+from urllib.parse import urlencode
+
+from fastapi import Request
 from fastapi_cache import FastAPICache
+from loguru import logger
+
+from app.core.cache_bus import cache_bus
+from app.core.config import config
+from app.schemas.course import CourseResponse
+from app.utils.conditional import Validators
+from app.utils.ttl_cache import TTLCache
+
+# Версии кэша: номер поколения входит в ключ, инвалидация - один INCR.
+# Старые записи больше не читаются и истекают по своему TTL
+LIST_GENERATION_KEY = "courses:gen:list"
+
+# Счётчики для бэкендов без Redis (InMemoryBackend в тестах и локальной разработке)
+_local_generations: dict[str, int] = {}
+
+# Поколения, прочитанные из Redis, кэшируются в процессе, чтобы попадание в L1 не ходило в Redis.
+# Инвалидации приходят через cache_bus, TTL ограничивает устаревание, если сообщение потерялось
+_generation_cache = TTLCache(max_size=config.CACHE_L1_MAX_SIZE, ttl=config.CACHE_L1_TTL_SECONDS)
+
+# Чтения поколений из Redis, которые ещё не вернулись: ключ -> метка чтения.
+# Инвалидация снимает метку, и значение, прочитанное до INCR, не попадает в _generation_cache
+_pending_reads: dict[str, object] = {}
+
+
+def _evict_generations(keys: list[str]) -> None:
+    for key in keys:
+        _generation_cache.pop(key)
+        _pending_reads.pop(key, None)
+
+
+def _reset_generations() -> None:
+    _generation_cache.clear()
+    _pending_reads.clear()
+
+
+cache_bus.add_listener(_evict_generations, reset=_reset_generations)
+
+
+def _item_generation_key(course_id: int) -> str:
+    return f"courses:gen:item:{course_id}"
+
+
+def _outline_generation_key(course_id: int) -> str:
+    return f"courses:gen:outline:{course_id}"
+
 
-def item_key_builder(
-    func,
-    namespace: str = "",
-    request = None,
-    response = None,
-    args: tuple = None,
-    kwargs: dict = None,
-):
+def _redis():
+    return getattr(FastAPICache.get_backend(), "redis", None)
+
+
+async def get_generation(key: str) -> int | None:
+    """
+        Текущее поколение ключа. None - Redis не ответил: поколение неизвестно,
+        и кэш нужно обойти, иначе запрос прочитал бы записи g0, оставшиеся от давно сдвинутых поколений.
+    """
+    redis = _redis()
+    if redis is None:
+        return _local_generations.get(key, 0)
+    generation = _generation_cache.get(key)
+    if generation is not None:
+        return generation
+
+    marker = object()
+    _pending_reads[key] = marker
+    try:
+        value = await redis.get(key)
+    except Exception as e:
+        logger.warning(f'Cache generation read failed for {key}, bypassing the cache: {e}')
+        return None
+    finally:
+        read_is_current = _pending_reads.get(key) is marker
+        if read_is_current:
+            del _pending_reads[key]
+    generation = int(value) if value else 0
+    if read_is_current:
+        _generation_cache.set(key, generation)
+    return generation
+
+
+async def bump_generations(*keys: str) -> None:
+    redis = _redis()
+    if redis is None:
+        for key in keys:
+            _local_generations[key] = _local_generations.get(key, 0) + 1
+        return
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f'Cache generation bump failed for {keys}: {e}')
+    await cache_bus.publish(list(keys))
+
+
+# Билдеры возвращают None, если поколение неизвестно: response_cache тогда считает ответ мимо кэша
+async def item_key_builder(request: Request, kwargs: dict) -> str | None:
     course_id = kwargs.get("course_id")
-    return f"courses:item:{course_id}"
+    generation = await get_generation(_item_generation_key(course_id))
+    if generation is None:
+        return None
+    return f"courses:item:{course_id}:g{generation}"
+
+async def outline_key_builder(request: Request, kwargs: dict) -> str | None:
+    course_id = kwargs.get("course_id")
+    generation = await get_generation(_outline_generation_key(course_id))
+    if generation is None:
+        return None
+    return f"courses:outline:{course_id}:g{generation}"
+
+async def list_key_builder(request: Request, kwargs: dict) -> str | None:
+    """Ключ страницы каталога по query-параметрам (фильтры, сортировка, курсор, поиск)"""
+    params = urlencode(sorted(request.query_params.multi_items()))
+    generation = await get_generation(LIST_GENERATION_KEY)
+    if generation is None:
+        return None
+    return f"courses:list:g{generation}:{hashlib.md5(params.encode()).hexdigest()}"
+
+def course_validators(course: CourseResponse) -> Validators:
+    rows = [(course.id, course.updated_at)]
+    if course.stats is not None:
+        rows.append(tuple(course.stats.model_dump().values()))
+    return Validators.build(CourseResponse, rows, last_modified=course.updated_at)
 
 async def invalidate_cache(course_id: int | None = None):
     """
-        Универсальная очистка кэша курсов.
-        Если передан course_id, удаляет конкретный курс.
-        Всегда очищает списки (namespace).
+        Инвалидация кэша курсов.
+        Всегда сдвигает поколение списков (страницы каталога и count),
+        если передан course_id - ещё и поколения карточки и оглавления курса.
     """
+    keys = [LIST_GENERATION_KEY]
     if course_id:
-        await FastAPICache.clear(key=f"courses:item:{course_id}")
-    await FastAPICache.clear(namespace="courses")
\ No newline at end of file
+        keys.extend([_item_generation_key(course_id), _outline_generation_key(course_id)])
+    await bump_generations(*keys)
+
+async def invalidate_outline(course_id: int):
+    """Инвалидация оглавления курса после изменения его уроков или шагов"""
+    await bump_generations(_outline_generation_key(course_id))
+
+async def get_cached_count(key: str, loader: Callable[[], Awaitable[int]], expire: int) -> int:
+    """Кэш для count(*) каталога: точный подсчёт выполняется не чаще раза в expire секунд на фильтр"""
+    try:
+        backend = FastAPICache.get_backend()
+        cached = await backend.get(key)
+    except Exception as e:
+        logger.warning(f'Count cache read failed for {key}: {e}')
+        backend, cached = None, None
+
+    if cached is not None:
+        return int(cached)
+
+    total = await loader()
+    if backend is not None:
+        try:
+            await backend.set(key, str(total).encode(), expire)
+        except Exception as e:
+            logger.warning(f'Count cache write failed for {key}: {e}')
+    return total
@@ -0,0 +1,37 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from app.core.exceptions import BadRequestException
+from app.helpers.course_sort import CourseSort
+from app.models.course import CourseORM
+
+
+def _sort_value(course: CourseORM, sort: CourseSort) -> str | None:
+    if sort == CourseSort.NEWEST:
+        return course.created_at.isoformat()
+    if sort == CourseSort.PRICE:
+        return str(course.price)
+    return None
+
+
+def encode_cursor(course: CourseORM, sort: CourseSort) -> str:
+    """Непрозрачный курсор: base64 от (сортировка, значение ключа сортировки, id) последнего курса на странице"""
+    payload = json.dumps([sort.value, _sort_value(course, sort), course.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str, sort: CourseSort) -> tuple[datetime | Decimal | None, int]:
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        cursor_sort, value, course_id = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort != sort.value or not isinstance(course_id, int):
+            raise ValueError
+        if sort == CourseSort.NEWEST:
+            value = datetime.fromisoformat(value)
+        elif sort == CourseSort.PRICE:
+            value = Decimal(value)
+    except (ValueError, TypeError, ArithmeticError):
+        raise BadRequestException(message='Invalid cursor')
+    return value, course_id
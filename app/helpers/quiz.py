@@ -0,0 +1,118 @@
+import re
+from dataclasses import dataclass
+from re import _constants as sre_constants, _parser as sre_parser
+from typing import Any
+
+from app.core.config import config
+
+# Формат quiz_data для проверки ответов (остальные ключи - вопрос, варианты - проверкой не читаются):
+#   {"type": "choice", "correct": ["b", "d"]}    - ответ: значение или список, сравнивается как множество
+#   {"type": "text", "answers": ["Paris", "Париж"]} - ответ: строка из списка допустимых
+#   {"type": "regex", "pattern": "4([.,]0+)?"}    - ответ: строка, целиком подходящая под шаблон
+#     Шаблон не длиннее QUIZ_PATTERN_MAX_LENGTH и без вложенных квантификаторов вроде (a+)+:
+#     проверка идёт в event loop, и такие шаблоны на длинном ответе уходят в экспоненциальный перебор
+# Строки нормализуются: обрезаются пробелы, схлопываются внутренние, регистр не учитывается
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Ключи с правильными ответами: студентам quiz_data отдаётся без них
+ANSWER_KEYS = frozenset({'correct', 'answers', 'pattern'})
+
+
+class QuizDefinitionError(ValueError):
+    pass
+
+
+def public_quiz_data(quiz_data: dict | None) -> dict | None:
+    if not isinstance(quiz_data, dict):
+        return quiz_data
+    return {key: value for key, value in quiz_data.items() if key not in ANSWER_KEYS}
+
+
+def normalize(value: Any) -> str:
+    return _WHITESPACE.sub(' ', str(value)).strip().casefold()
+
+
+@dataclass(frozen=True, slots=True)
+class SetChecker:
+    """choice: множество ответа совпадает с множеством правильных; text: ответ входит во множество"""
+    expected: frozenset[str]
+    exact: bool
+
+    def check(self, answer: Any) -> bool:
+        if self.exact:
+            values = answer if isinstance(answer, list) else [answer]
+            return frozenset(normalize(value) for value in values) == self.expected
+        return not isinstance(answer, list) and normalize(answer) in self.expected
+
+
+@dataclass(frozen=True, slots=True)
+class RegexChecker:
+    pattern: re.Pattern
+
+    def check(self, answer: Any) -> bool:
+        return not isinstance(answer, list) and self.pattern.fullmatch(_WHITESPACE.sub(' ', str(answer)).strip()) is not None
+
+
+QuizChecker = SetChecker | RegexChecker
+
+
+_REPEATS = frozenset({sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, sre_constants.POSSESSIVE_REPEAT})
+
+
+def _subpatterns(value: Any):
+    if isinstance(value, sre_parser.SubPattern):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _subpatterns(item)
+
+
+def _has_nested_repeat(pattern: sre_parser.SubPattern, in_repeat: bool = False) -> bool:
+    for op, value in pattern:
+        if op in _REPEATS:
+            _, high, body = value
+            repeats = high > 1
+            if repeats and in_repeat:
+                return True
+            if _has_nested_repeat(body, in_repeat or repeats):
+                return True
+        elif any(_has_nested_repeat(child, in_repeat) for child in _subpatterns(value)):
+            return True
+    return False
+
+
+def _compile_pattern(pattern: Any) -> re.Pattern:
+    if not isinstance(pattern, str) or not pattern:
+        raise QuizDefinitionError('"pattern" must be a non-empty string')
+    if len(pattern) > config.QUIZ_PATTERN_MAX_LENGTH:
+        raise QuizDefinitionError(f'"pattern" must be at most {config.QUIZ_PATTERN_MAX_LENGTH} characters')
+    try:
+        compiled = re.compile(pattern, re.IGNORECASE)
+    except re.error as e:
+        raise QuizDefinitionError(f'Invalid pattern: {e}')
+    if _has_nested_repeat(sre_parser.parse(pattern, re.IGNORECASE)):
+        raise QuizDefinitionError('"pattern" must not contain nested quantifiers')
+    return compiled
+
+
+def _values(quiz_data: dict, key: str) -> list:
+    values = quiz_data.get(key)
+    if not isinstance(values, list) or not values:
+        raise QuizDefinitionError(f'"{key}" must be a non-empty list')
+    return values
+
+
+def compile_quiz(quiz_data: dict | None) -> QuizChecker:
+    """Разбирает quiz_data в проверщик ответа. Вызывается один раз на версию шага"""
+    if not isinstance(quiz_data, dict):
+        raise QuizDefinitionError('Quiz definition is missing')
+
+    quiz_type = quiz_data.get('type')
+    if quiz_type == 'choice':
+        return SetChecker(frozenset(normalize(value) for value in _values(quiz_data, 'correct')), exact=True)
+    if quiz_type == 'text':
+        return SetChecker(frozenset(normalize(value) for value in _values(quiz_data, 'answers')), exact=False)
+    if quiz_type == 'regex':
+        return RegexChecker(_compile_pattern(quiz_data.get('pattern')))
+    raise QuizDefinitionError('"type" must be one of: choice, text, regex')
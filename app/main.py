@@ -1,7 +1,6 @@
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from redis import asyncio as redis_asyncio
 from fastapi_cache.backends.redis import RedisBackend
 from fastapi_cache import FastAPICache, JsonCoder
 from app.api.v1.user import user_router
@@ -10,12 +9,25 @@ from app.api.v1.comment import comment_router
 from app.api.v1.purchase import purchase_router
 from app.api.v1.notifications import notification_router
 from app.core.config import config
+from app.core.database import async_engine, warmup_pool, replica_router
+from app.core.tasks import periodic_tasks
+from app.core.principal_cache import principal_cache
+from app.core.entitlement_cache import entitlement_cache
+from app.core.cache_bus import cache_bus
+from app.core.quiz_attempt_writer import quiz_attempt_writer
+from app.core.redis_pool import redis_pool
 from app.core.logger import setup_logging
+from app.services.course_stats import reconcile_course_stats
+from app.services.ordering import rebalance_order_gaps
+from app.core.sql_instrumentation import setup_sql_instrumentation
+from app.repositories.base import check_upsert_support
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_limiter import FastAPILimiter
 from app.helpers.exception_handler import add_exception_handler
 from app.api.v1.reactions import reactions_router
 from app.api.v1.progress import progress_router
+from app.api.v1.internal import internal_router
+from app.utils.security import hashing_executor
 setup_logging()
 
 
@@ -23,8 +35,34 @@ setup_logging()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print('App is starting. Initializing resources')
+    check_upsert_support(async_engine.dialect.name)
+    hashing_executor.start()
 
-    redis = redis_asyncio.from_url(config.REDIS_URL)
+    try:
+        await warmup_pool()
+        print('Database pool warmed up')
+    except Exception as e:
+        print('Database warmup failed:' + str(e))
+
+    if replica_router.engines:
+        periodic_tasks.register('replica-health', config.DATABASE_REPLICA_HEALTH_INTERVAL, replica_router.check_health)
+    periodic_tasks.register(
+        'course-stats-reconcile',
+        config.COURSE_STATS_RECONCILE_INTERVAL_SECONDS,
+        reconcile_course_stats,
+        initial_delay=config.PERIODIC_TASK_INITIAL_DELAY_SECONDS,
+        exclusive=True,
+    )
+    periodic_tasks.register(
+        'order-rebalance',
+        config.ORDER_REBALANCE_INTERVAL_SECONDS,
+        rebalance_order_gaps,
+        initial_delay=config.PERIODIC_TASK_INITIAL_DELAY_SECONDS,
+        exclusive=True,
+    )
+    quiz_attempt_writer.start()
+
+    redis = redis_pool.client
 
     try:
         await redis.ping()
@@ -35,12 +73,21 @@ async def lifespan(app: FastAPI):
         )
         await FastAPILimiter.init(redis)
         print('FastAPILimiter established')
+        principal_cache.init(redis)
+        entitlement_cache.init(redis)
+        periodic_tasks.init(redis)
+        cache_bus.start(redis)
     except Exception as e:
         print('Redis connection failed:' + str(e))
+    periodic_tasks.start()
 
     yield
-    await redis.close()
+    await quiz_attempt_writer.stop()
+    await cache_bus.stop()
+    await periodic_tasks.stop()
+    await redis_pool.close()
     print('Redis connection closed')
+    hashing_executor.shutdown()
 
 app = FastAPI(
     title=config.APP_NAME,
@@ -58,6 +105,7 @@ app.add_middleware(
 )
 
 add_exception_handler(app)
+setup_sql_instrumentation(app)
 
 @app.get('/')
 async def root():
@@ -70,4 +118,5 @@ app.include_router(comment_router)
 app.include_router(reactions_router)
 
 app.include_router(notification_router)
-app.include_router(progress_router)
\ No newline at end of file
+app.include_router(progress_router)
+app.include_router(internal_router)
\ No newline at end of file
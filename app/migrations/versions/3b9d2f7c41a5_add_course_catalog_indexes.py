@@ -0,0 +1,29 @@
+"""add course catalog indexes
+
+Revision ID: 3b9d2f7c41a5
+Revises: 012e4ca9ccfe
+Create Date: 2026-10-18 09:02:11.314521
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '3b9d2f7c41a5'
+down_revision: Union[str, None] = '012e4ca9ccfe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_courses_published_id', 'courses', ['is_published', 'id'], unique=False)
+    op.create_index('ix_courses_published_created_at_id', 'courses', ['is_published', 'created_at', 'id'], unique=False)
+    op.create_index('ix_courses_published_price_id', 'courses', ['is_published', 'price', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_courses_published_price_id', table_name='courses')
+    op.drop_index('ix_courses_published_created_at_id', table_name='courses')
+    op.drop_index('ix_courses_published_id', table_name='courses')
@@ -0,0 +1,30 @@
+"""add updated_at to steps
+
+Revision ID: 5d7f0b3e9a61
+Revises: c52e9a1f7b08
+Create Date: 2026-10-18 11:20:41.208764
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '5d7f0b3e9a61'
+down_revision: Union[str, None] = 'c52e9a1f7b08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('steps', sa.Column(
+        'updated_at',
+        sa.DateTime(timezone=True),
+        server_default=sa.text('now()'),
+        nullable=True,
+    ))
+
+
+def downgrade() -> None:
+    op.drop_column('steps', 'updated_at')
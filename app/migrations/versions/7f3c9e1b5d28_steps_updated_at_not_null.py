@@ -0,0 +1,38 @@
+"""steps.updated_at not null
+
+Revision ID: 7f3c9e1b5d28
+Revises: b8d2f4c6a017
+Create Date: 2026-10-18 18:40:12.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '7f3c9e1b5d28'
+down_revision: Union[str, None] = 'b8d2f4c6a017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Модель объявляет updated_at обязательным: он - версия шага в ETag списка шагов и в кэше квизов.
+    # 5d7f0b3e9a61 заполнил старые строки server_default, UPDATE - на случай строк, вставленных с NULL явно
+    op.execute('UPDATE steps SET updated_at = now() WHERE updated_at IS NULL')
+    op.alter_column(
+        'steps', 'updated_at',
+        existing_type=sa.DateTime(timezone=True),
+        existing_server_default=sa.text('now()'),
+        nullable=False,
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'steps', 'updated_at',
+        existing_type=sa.DateTime(timezone=True),
+        existing_server_default=sa.text('now()'),
+        nullable=True,
+    )
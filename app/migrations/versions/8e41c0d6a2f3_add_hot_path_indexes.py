@@ -0,0 +1,40 @@
+"""add hot path indexes
+
+Revision ID: 8e41c0d6a2f3
+Revises: 3b9d2f7c41a5
+Create Date: 2026-10-18 09:20:42.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '8e41c0d6a2f3'
+down_revision: Union[str, None] = '3b9d2f7c41a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# CREATE INDEX CONCURRENTLY не блокирует запись, но не работает внутри транзакции
+INDEXES = [
+    ('ix_comments_step_id', 'comments', ['step_id']),
+    ('ix_comments_course_id', 'comments', ['course_id']),
+    ('ix_reactions_comment_id_is_like', 'reactions', ['comment_id', 'is_like']),
+    ('ix_purchases_payment_id', 'purchases', ['payment_id']),
+    ('ix_purchases_user_id_status', 'purchases', ['user_id', 'status']),
+    ('ix_user_lesson_completions_user_id_course_id', 'user_lesson_completions', ['user_id', 'course_id']),
+    ('ix_courses_author_id', 'courses', ['author_id']),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,54 @@
+"""add course stats
+
+Revision ID: 9a4c2e7d1b58
+Revises: 5d7f0b3e9a61
+Create Date: 2026-10-18 12:05:17.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '9a4c2e7d1b58'
+down_revision: Union[str, None] = '5d7f0b3e9a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'course_stats',
+        sa.Column('course_id', sa.Integer(), nullable=False),
+        sa.Column('lessons_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('steps_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('students_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('comments_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_minutes', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('progress_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('progress_sum', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('course_id'),
+    )
+    op.execute("""
+        INSERT INTO course_stats (
+            course_id, lessons_count, steps_count, students_count, comments_count,
+            total_minutes, progress_count, progress_sum
+        )
+        SELECT
+            c.id,
+            (SELECT count(*) FROM lessons l WHERE l.course_id = c.id),
+            (SELECT count(*) FROM steps s JOIN lessons l ON l.id = s.lesson_id WHERE l.course_id = c.id),
+            (SELECT count(DISTINCT p.user_id) FROM purchases p WHERE p.course_id = c.id AND p.status = 'SUCCEEDED'),
+            (SELECT count(*) FROM comments cm WHERE cm.course_id = c.id AND cm.is_deleted IS FALSE),
+            (SELECT coalesce(sum(l.duration_minutes), 0) FROM lessons l WHERE l.course_id = c.id),
+            (SELECT count(*) FROM user_course_progress ucp WHERE ucp.course_id = c.id),
+            (SELECT coalesce(sum(ucp.progress_percentage), 0) FROM user_course_progress ucp WHERE ucp.course_id = c.id)
+        FROM courses c
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('course_stats')
@@ -0,0 +1,38 @@
+"""add quiz attempts
+
+Revision ID: b8d2f4c6a017
+Revises: e3b7c1a94f20
+Create Date: 2026-10-18 15:02:11.734509
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b8d2f4c6a017'
+down_revision: Union[str, None] = 'e3b7c1a94f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'quiz_attempts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('step_id', sa.Integer(), nullable=False),
+        sa.Column('answer', sa.JSON(), nullable=True),
+        sa.Column('is_correct', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['step_id'], ['steps.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_quiz_attempts_step_id_user_id', 'quiz_attempts', ['step_id', 'user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quiz_attempts_step_id_user_id', table_name='quiz_attempts')
+    op.drop_table('quiz_attempts')
@@ -0,0 +1,37 @@
+"""add course search vector
+
+Revision ID: c52e9a1f7b08
+Revises: 8e41c0d6a2f3
+Create Date: 2026-10-18 09:48:05.530817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'c52e9a1f7b08'
+down_revision: Union[str, None] = '8e41c0d6a2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('courses', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index('ix_courses_search_vector', 'courses', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_courses_search_vector', table_name='courses', postgresql_using='gin')
+    op.drop_column('courses', 'search_vector')
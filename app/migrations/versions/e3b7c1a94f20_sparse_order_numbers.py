@@ -0,0 +1,51 @@
+"""sparse order numbers
+
+Revision ID: e3b7c1a94f20
+Revises: 9a4c2e7d1b58
+Create Date: 2026-10-18 13:40:52.613027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'e3b7c1a94f20'
+down_revision: Union[str, None] = '9a4c2e7d1b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ORDER_GAP = 1024
+
+CONSTRAINTS = (
+    ('lessons', 'course_id', 'uq_course_lesson_order'),
+    ('steps', 'lesson_id', 'uq_lesson_step_order'),
+)
+
+
+def _renumber(table: str, partition: str, gap: int) -> None:
+    op.execute(f"""
+        UPDATE {table} SET order_number = ranked.position
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY {partition} ORDER BY order_number, id) * {gap} AS position
+            FROM {table}
+        ) AS ranked
+        WHERE {table}.id = ranked.id
+    """)
+
+
+def upgrade() -> None:
+    for table, partition, name in CONSTRAINTS:
+        op.drop_constraint(name, table, type_='unique')
+        _renumber(table, partition, ORDER_GAP)
+        op.create_unique_constraint(
+            name, table, [partition, 'order_number'],
+            deferrable=True, initially='IMMEDIATE',
+        )
+
+
+def downgrade() -> None:
+    for table, partition, name in CONSTRAINTS:
+        op.drop_constraint(name, table, type_='unique')
+        _renumber(table, partition, 1)
+        op.create_unique_constraint(name, table, [partition, 'order_number'])
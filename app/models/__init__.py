@@ -1,5 +1,6 @@
 from .user import UserORM
 from .course import CourseORM
+from .course_stats import CourseStatsORM
 from .lesson import LessonORM
 from .purchace import PurchaseORM
 from .step import StepORM
@@ -7,6 +8,7 @@ from .comment import CommentORM
 from .reaction import ReactionORM
 from .progress import UserCourseProgressORM
 from .progress import UserLessonCompletionORM
+from .quiz_attempt import QuizAttemptORM
 
 
-__all__ = ["UserORM", 'CourseORM', 'LessonORM', 'PurchaseORM', 'StepORM', 'CommentORM', 'ReactionORM', 'UserCourseProgressORM', 'UserLessonCompletionORM']
\ No newline at end of file
+__all__ = ["UserORM", 'CourseORM', 'CourseStatsORM', 'LessonORM', 'PurchaseORM', 'StepORM', 'CommentORM', 'ReactionORM', 'UserCourseProgressORM', 'UserLessonCompletionORM', 'QuizAttemptORM']
\ No newline at end of file
@@ -13,9 +13,9 @@ class CommentORM(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
-    step_id: Mapped[int] = mapped_column(ForeignKey('steps.id', ondelete='CASCADE'))
+    step_id: Mapped[int] = mapped_column(ForeignKey('steps.id', ondelete='CASCADE'), index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
-    course_id: Mapped[int] = mapped_column(ForeignKey('courses.id', ondelete='CASCADE'))
+    course_id: Mapped[int] = mapped_column(ForeignKey('courses.id', ondelete='CASCADE'), index=True)
     content: Mapped[Text] = mapped_column(Text, nullable=False)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
     is_edited: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import String, Text, Numeric, Boolean, DateTime, func, ForeignKey
+from sqlalchemy import String, Text, Numeric, Boolean, DateTime, func, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column,relationship
 
 from app.core.database import Base
@@ -9,6 +9,11 @@ from app.core.database import Base
 
 class CourseORM(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        Index('ix_courses_published_id', 'is_published', 'id'),
+        Index('ix_courses_published_created_at_id', 'is_published', 'created_at', 'id'),
+        Index('ix_courses_published_price_id', 'is_published', 'price', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(130), nullable=False)
@@ -25,7 +30,7 @@ class CourseORM(Base):
         onupdate=func.now()
     )
 
-    author_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
+    author_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), index=True)
 
     author: Mapped['UserORM'] = relationship(
         'UserORM',
@@ -49,6 +54,15 @@ class CourseORM(Base):
         cascade='all, delete-orphan',
     )
 
+    # Загружается тем же запросом, что и курс: статистика в ответах не стоит отдельного запроса
+    stats: Mapped['CourseStatsORM | None'] = relationship(
+        'CourseStatsORM',
+        back_populates='course',
+        uselist=False,
+        lazy='joined',
+        passive_deletes=True,
+    )
+
     progresses: Mapped[list['ProgressORM']] = relationship(
         'UserCourseProgressORM',
         back_populates='course',
@@ -0,0 +1,44 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.database import Base
+
+
+class CourseStatsORM(Base):
+    """
+        Read-model статистики курса. Счётчики меняются инкрементально в тех же транзакциях,
+        что и исходные данные, а периодическая сверка пересчитывает их целиком.
+    """
+    __tablename__ = 'course_stats'
+
+    course_id: Mapped[int] = mapped_column(ForeignKey('courses.id', ondelete='CASCADE'), primary_key=True)
+
+    lessons_count: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+    steps_count: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+    students_count: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+    comments_count: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+    total_minutes: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+
+    # Средний прогресс = progress_sum / progress_count по записям user_course_progress
+    progress_count: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+    progress_sum: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, server_default='0', nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+    course: Mapped['CourseORM'] = relationship(
+        'CourseORM',
+        back_populates='stats',
+    )
+
+    @property
+    def average_progress(self) -> Decimal:
+        if not self.progress_count:
+            return Decimal('0.00')
+        return round(Decimal(self.progress_sum) / self.progress_count, 2)
@@ -1,17 +1,16 @@
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import String, Text, Numeric, Boolean, DateTime, func, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy import String, Text, Numeric, Boolean, DateTime, func, ForeignKey, Integer
 from sqlalchemy.orm import Mapped, mapped_column,relationship
 
 from app.core.database import Base
+from app.models.ordering import OrderUniqueConstraint
 
 
 class LessonORM(Base):
     __tablename__ = 'lessons'
-    __table_args__ = (
-        UniqueConstraint('course_id', 'order_number', name='uq_course_lesson_order'),
-    )
+    __table_args__ = (OrderUniqueConstraint('course_id', name='uq_course_lesson_order'),)
     id: Mapped[int] = mapped_column(primary_key=True)
 
     title: Mapped[str] = mapped_column(String(80), nullable=False)
@@ -0,0 +1,22 @@
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.ext.compiler import compiles
+
+
+class OrderUniqueConstraint(UniqueConstraint):
+    """
+        Уникальность (контейнер, order_number). В Postgres она DEFERRABLE INITIALLY IMMEDIATE, как в миграции
+        e3b7c1a94f20: новый порядок применяется одним UPDATE. SQLite не разбирает DEFERRABLE у UNIQUE -
+        там ограничение компилируется без него.
+        Отложенное ограничение Postgres не принимает арбитром ON CONFLICT, поэтому upsert_many по нему не работает.
+    """
+
+    def __init__(self, partition: str, name: str):
+        super().__init__(partition, 'order_number', name=name, deferrable=True, initially='IMMEDIATE')
+
+
+@compiles(OrderUniqueConstraint)
+def _compile_order_unique_constraint(constraint, compiler, **kw) -> str:
+    text = compiler.visit_unique_constraint(constraint, **kw)
+    if compiler.dialect.name == 'postgresql':
+        return text
+    return text.removesuffix(compiler.define_constraint_deferrability(constraint))
@@ -2,7 +2,7 @@ from datetime import datetime
 from decimal import Decimal
 
 from app.core.database import Base
-from sqlalchemy import Boolean, ForeignKey, Numeric, DateTime, func, UniqueConstraint
+from sqlalchemy import Boolean, ForeignKey, Numeric, DateTime, func, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 
@@ -34,6 +34,7 @@ class UserLessonCompletionORM(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "lesson_id", name="_user_lesson_completion_uc"),
+        Index("ix_user_lesson_completions_user_id_course_id", "user_id", "course_id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
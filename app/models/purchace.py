@@ -1,6 +1,6 @@
 from app.core.database import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, DateTime, func, Numeric, UniqueConstraint, String
+from sqlalchemy import ForeignKey, DateTime, func, Numeric, UniqueConstraint, String, Index
 from datetime import datetime
 from decimal import Decimal
 from app.helpers.purchase_status import PurchaseStatus
@@ -11,10 +11,11 @@ class PurchaseORM(Base):
 
     __table_args__ = (
         UniqueConstraint('user_id', 'course_id', name='uq_purchase_user_course'),
+        Index('ix_purchases_user_id_status', 'user_id', 'status'),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    payment_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    payment_id: Mapped[str | None] = mapped_column(String(255), nullable=True, index=True)
     status: Mapped[PurchaseStatus] = mapped_column(default=PurchaseStatus.PENDING)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     course_id: Mapped[int] = mapped_column(ForeignKey("courses.id"), nullable=False)
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, JSON, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class QuizAttemptORM(Base):
+    __tablename__ = 'quiz_attempts'
+    __table_args__ = (
+        Index('ix_quiz_attempts_step_id_user_id', 'step_id', 'user_id'),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    step_id: Mapped[int] = mapped_column(ForeignKey('steps.id', ondelete='CASCADE'), nullable=False)
+    answer: Mapped[dict | list | str | None] = mapped_column(JSON, nullable=True)
+    is_correct: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    # Время отправки, а не записи: попытки пишутся пачками с задержкой
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
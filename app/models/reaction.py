@@ -1,10 +1,13 @@
 from app.core.database import Base
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import ForeignKey, DateTime, func, Boolean
+from sqlalchemy import ForeignKey, DateTime, func, Boolean, Index
 
 class ReactionORM(Base):
     __tablename__ = 'reactions'
+    __table_args__ = (
+        Index('ix_reactions_comment_id_is_like', 'comment_id', 'is_like'),
+    )
 
     comment_id: Mapped[int] = mapped_column(
         ForeignKey('comments.id', ondelete='CASCADE'),
@@ -1,14 +1,15 @@
-from sqlalchemy import String, Text, ForeignKey, Integer, UniqueConstraint, JSON
+from datetime import datetime
+
+from sqlalchemy import String, Text, ForeignKey, Integer, JSON, DateTime, func
 from sqlalchemy.orm import Mapped, mapped_column,relationship
 
 from app.core.database import Base
+from app.models.ordering import OrderUniqueConstraint
 from app.helpers.step_type import StepType
 
 class StepORM(Base):
     __tablename__ = 'steps'
-    __table_args__ = (
-        UniqueConstraint('lesson_id', 'order_number', name='uq_lesson_step_order'),
-    )
+    __table_args__ = (OrderUniqueConstraint('lesson_id', name='uq_lesson_step_order'),)
     id: Mapped[int] = mapped_column(primary_key=True)
     lesson_id: Mapped[int] = mapped_column(ForeignKey('lessons.id', ondelete='CASCADE'))
     title: Mapped[str] = mapped_column(String(255), nullable=True)
@@ -17,6 +18,12 @@ class StepORM(Base):
     video_url: Mapped[str] = mapped_column(String, nullable=True)
     order_number: Mapped[int] = mapped_column(Integer, default=1)
     quiz_data: Mapped[dict] = mapped_column(JSON, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
     lesson: Mapped['LessonORM'] = relationship(
         'LessonORM',
         back_populates='steps',
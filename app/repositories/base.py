@@ -1,13 +1,54 @@
-from typing import Generic, TypeVar, Type
+import functools
+from typing import Generic, Iterator, Sequence, TypeVar, Type
 
-from sqlalchemy import select, update, delete as sqlalchemy_delete
+from sqlalchemy import UniqueConstraint, select, insert, update, delete as sqlalchemy_delete
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import config
 from app.core.database import Base
 
 ModelType = TypeVar('ModelType', bound=Base)
 
 
+def read_only(method):
+    """Помечает метод репозитория как чистое чтение: такие запросы могут уйти на реплику"""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        info = self.session.info
+        previous = info.get('read_only', False)
+        info['read_only'] = True
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            info['read_only'] = previous
+    return wrapper
+
+
+def _batches(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+_dialect_inserts = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def check_upsert_support(dialect_name: str) -> None:
+    """Вызывается при старте: ON CONFLICT нужен счётчикам курсов, без него приложение не должно подниматься"""
+    if dialect_name not in _dialect_inserts:
+        raise RuntimeError(
+            f'Database dialect {dialect_name} is not supported, use one of: {", ".join(_dialect_inserts)}'
+        )
+
+
+def upsert_insert(session: AsyncSession, model: Type[Base]):
+    """INSERT с on_conflict_* для диалекта сессии; диалект проверен check_upsert_support при старте"""
+    return _dialect_inserts[session.get_bind().dialect.name](model)
+
+
 class BaseRepository(Generic[ModelType]):
     def __init__(self, session: AsyncSession, model: Type[ModelType]):
         self.session = session
@@ -17,17 +58,14 @@ class BaseRepository(Generic[ModelType]):
         result = await self.session.scalar(select(self.model).filter(self.model.id == id)) # type: ignore
         return result
 
-    async def create(self, data: ModelType) -> ModelType:
-        db_obj = self.model(**data)
-        self.session.add(db_obj)
-        await self.session.commit()
-        await self.session.refresh(db_obj)
-        return db_obj
+    async def create(self, data: dict) -> ModelType:
+        query = insert(self.model).values(**data).returning(self.model)
+        result = await self.session.execute(query)
+        return result.scalar_one()
 
     async def delete(self, object_id: int) -> None:
         query = sqlalchemy_delete(self.model).where(self.model.id == object_id)
         await self.session.execute(query)
-        await self.session.commit()
 
     async def update(self, object_id: int, data: dict) -> ModelType | None:
         query = (
@@ -37,5 +75,79 @@ class BaseRepository(Generic[ModelType]):
             .returning(self.model)
         )
         result = await self.session.execute(query)
-        await self.session.commit()
-        return result.scalars().first()
\ No newline at end of file
+        return result.scalars().first()
+
+    async def create_many(self, rows: Sequence[dict], batch_size: int | None = None) -> list[ModelType]:
+        """Многострочный INSERT ... RETURNING, по batch_size строк за запрос"""
+        created = []
+        for batch in _batches(rows, batch_size or config.DB_BULK_BATCH_SIZE):
+            result = await self.session.scalars(insert(self.model).returning(self.model), list(batch))
+            created.extend(result.all())
+        return created
+
+    async def insert_many(self, rows: Sequence[dict], batch_size: int | None = None) -> None:
+        """Многострочный INSERT без RETURNING - когда созданные объекты не нужны"""
+        for batch in _batches(rows, batch_size or config.DB_BULK_BATCH_SIZE):
+            await self.session.execute(insert(self.model), list(batch))
+
+    async def update_many(self, rows: Sequence[dict], batch_size: int | None = None) -> None:
+        """Bulk UPDATE по первичному ключу: в каждой строке должен быть id"""
+        for batch in _batches(rows, batch_size or config.DB_BULK_BATCH_SIZE):
+            await self.session.execute(update(self.model), list(batch))
+
+    async def upsert_many(
+        self,
+        rows: Sequence[dict],
+        index_elements: Sequence[str] | None = None,
+        update_columns: Sequence[str] | None = None,
+        batch_size: int | None = None,
+    ) -> list[ModelType]:
+        """
+            INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+            index_elements - колонки уникального ограничения (по умолчанию первичный ключ),
+            update_columns - что обновлять при конфликте (по умолчанию все остальные переданные колонки).
+            Если обновлять нечего (update_columns пуст), выполняется ON CONFLICT DO NOTHING,
+            и RETURNING возвращает только вставленные строки: конфликтующие в результат не попадают.
+            Все строки должны содержать одинаковый набор ключей - они уходят одним многострочным VALUES.
+            Отложенное (DEFERRABLE) ограничение арбитром быть не может: Postgres отклоняет такой ON CONFLICT.
+        """
+        if not rows:
+            return []
+
+        keys = rows[0].keys()
+        if any(row.keys() != keys for row in rows):
+            raise ValueError('upsert_many requires the same keys in every row')
+
+        index_elements = list(index_elements or [column.name for column in self.model.__table__.primary_key])
+        for constraint in self.model.__table__.constraints:
+            if (
+                isinstance(constraint, UniqueConstraint)
+                and constraint.deferrable
+                and set(constraint.columns.keys()) == set(index_elements)
+            ):
+                raise ValueError(f'Constraint {constraint.name} is deferrable and cannot be an ON CONFLICT arbiter')
+        if update_columns is None:
+            update_columns = [key for key in rows[0] if key not in index_elements]
+
+        upserted = []
+        for batch in _batches(rows, batch_size or config.DB_BULK_BATCH_SIZE):
+            query = upsert_insert(self.session, self.model).values(list(batch))
+            if update_columns:
+                query = query.on_conflict_do_update(
+                    index_elements=index_elements,
+                    set_={column: query.excluded[column] for column in update_columns},
+                )
+            else:
+                query = query.on_conflict_do_nothing(index_elements=index_elements)
+            query = query.returning(self.model).execution_options(populate_existing=True)
+            result = await self.session.scalars(query)
+            upserted.extend(result.all())
+        return upserted
+
+    async def delete_many(self, object_ids: Sequence[int], batch_size: int | None = None) -> int:
+        deleted = 0
+        for batch in _batches(object_ids, batch_size or config.DB_BULK_BATCH_SIZE):
+            query = sqlalchemy_delete(self.model).where(self.model.id.in_(batch))
+            result = await self.session.execute(query)
+            deleted += result.rowcount
+        return deleted
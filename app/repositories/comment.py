@@ -3,15 +3,13 @@ from sqlalchemy.orm import joinedload
 
 from app.core.exceptions import NotFoundException, ForbiddenException, \
     BadRequestException
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, read_only
 from app.models.comment import CommentORM
 from sqlalchemy import select, update, exists
 
 from app.models.step import StepORM
 from app.models.course import CourseORM
-from app.models.purchace import PurchaseORM
 from sqlalchemy import func, and_
-from app.helpers.purchase_status import PurchaseStatus
 from app.models.reaction import ReactionORM
 from app.models.user import UserORM
 from app.models.lesson import LessonORM
@@ -23,8 +21,7 @@ class CommentRepository(BaseRepository):
 
     async def create_comment(self, comment_obj: CommentORM) -> CommentORM:
         self.session.add(comment_obj)
-        await self.session.commit()
-        await self.session.refresh(comment_obj)
+        await self.session.flush()
         return comment_obj
 
     def _get_comment_with_reactions_query(self, user_id: int | None = None):
@@ -69,6 +66,7 @@ class CommentRepository(BaseRepository):
 
         return select(*columns)
 
+    @read_only
     async def get_comments_for_step(self, step_id: int, user_id: int):
         query = self._get_comment_with_reactions_query(user_id)
         query = query.where(CommentORM.step_id == step_id).options(
@@ -85,17 +83,7 @@ class CommentRepository(BaseRepository):
             await self.session.refresh(updated_comment, attribute_names=['author'])
         return updated_comment
 
-    async def check_user_enrollment(self, user_id: int, course_id: int) -> bool:
-        query = (
-            select(exists().where(
-                PurchaseORM.user_id == user_id,
-                PurchaseORM.course_id == course_id,
-                PurchaseORM.status == PurchaseStatus.SUCCEEDED
-            ))
-        )
-        result = await self.session.execute(query)
-        return result.scalar()
-
+    @read_only
     async def get_all_course_comments(self, course_id: int, user_id: int):
         query = self._get_comment_with_reactions_query(user_id)
 
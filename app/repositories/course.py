@@ -1,35 +1,172 @@
+import re
 from typing import Sequence
 
-from sqlalchemy import select, delete, func
+from sqlalchemy import select, insert, delete, func, tuple_, and_, or_, exists, false, literal, literal_column
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.helpers.course_sort import CourseSort
+from app.helpers.purchase_status import PurchaseStatus
 from app.models.course import CourseORM
-from app.repositories.base import BaseRepository
+from app.models.lesson import LessonORM
+from app.models.purchace import PurchaseORM
+from app.models.step import StepORM
+from app.repositories.base import BaseRepository, read_only
+
+
+# Колонка есть только в Postgres (см. миграцию add_course_search_vector), поэтому в модели её нет
+_search_vector = literal_column('courses.search_vector')
 
 
 class CourseRepository(BaseRepository):
     def __init__(self, session: AsyncSession):
         super().__init__(session, CourseORM)
 
+    @read_only
     async def get_my_courses(self, user_id: int) -> Sequence[CourseORM]:
         result = await self.session.scalars(
             select(CourseORM).where(CourseORM.author_id == user_id)
         )
         return result.all()
 
+    async def get_course_path(
+            self,
+            course_id: int,
+            lesson_id: int | None = None,
+            step_id: int | None = None,
+            user_id: int | None = None,
+    ):
+        """
+            Курс, урок, шаг и факт оплаты курса пользователем одним запросом.
+            Урок (шаг) равен None, если его нет или он принадлежит другому курсу (уроку).
+        """
+        is_paid = (
+            exists().where(
+                PurchaseORM.user_id == user_id,
+                PurchaseORM.course_id == CourseORM.id,
+                PurchaseORM.status == PurchaseStatus.SUCCEEDED,
+            )
+            if user_id is not None else false()
+        )
+        query = (
+            select(CourseORM, LessonORM, StepORM, is_paid.label('is_paid'))
+            .select_from(CourseORM)
+            .outerjoin(LessonORM, and_(LessonORM.id == lesson_id, LessonORM.course_id == CourseORM.id))
+            .outerjoin(StepORM, and_(StepORM.id == step_id, StepORM.lesson_id == LessonORM.id))
+            .where(CourseORM.id == course_id)
+        )
+        result = await self.session.execute(query)
+        return result.one_or_none()
+
+    @read_only
+    async def get_course_outline(self, course_id: int):
+        """
+            Уроки и шаги курса без контента одним запросом, в порядке прохождения.
+            Пустой результат - курса нет; у курса без уроков одна строка с lesson_id = None.
+        """
+        query = (
+            select(
+                LessonORM.id.label('lesson_id'),
+                LessonORM.title.label('lesson_title'),
+                LessonORM.order_number.label('lesson_order'),
+                LessonORM.is_free,
+                LessonORM.duration_minutes,
+                StepORM.id.label('step_id'),
+                StepORM.title.label('step_title'),
+                StepORM.step_type,
+                StepORM.order_number.label('step_order'),
+            )
+            .select_from(CourseORM)
+            .outerjoin(LessonORM, LessonORM.course_id == CourseORM.id)
+            .outerjoin(StepORM, StepORM.lesson_id == LessonORM.id)
+            .where(CourseORM.id == course_id)
+            .order_by(LessonORM.order_number, LessonORM.id, StepORM.order_number, StepORM.id)
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def clone_course(self, course_id: int, author_id: int) -> int | None:
+        """
+            Копия курса с уроками и шагами тремя INSERT ... SELECT, без выборки строк в Python.
+            Новые уроки сопоставляются со старыми по order_number (уникален в курсе).
+            Копия не опубликована; None - исходного курса нет.
+        """
+        course_query = (
+            insert(CourseORM)
+            .from_select(
+                ['title', 'description', 'price', 'is_published', 'author_id'],
+                select(CourseORM.title, CourseORM.description, CourseORM.price, false(), literal(author_id))
+                .where(CourseORM.id == course_id),
+            )
+            .returning(CourseORM.id)
+        )
+        new_course_id = await self.session.scalar(course_query)
+        if new_course_id is None:
+            return None
+
+        lessons_query = insert(LessonORM).from_select(
+            ['title', 'duration_minutes', 'order_number', 'is_free', 'course_id'],
+            select(
+                LessonORM.title,
+                LessonORM.duration_minutes,
+                LessonORM.order_number,
+                LessonORM.is_free,
+                literal(new_course_id),
+            ).where(LessonORM.course_id == course_id),
+        )
+        await self.session.execute(lessons_query)
+
+        source_lesson = aliased(LessonORM)
+        target_lesson = aliased(LessonORM)
+        steps_query = insert(StepORM).from_select(
+            ['lesson_id', 'title', 'step_type', 'content', 'video_url', 'order_number', 'quiz_data'],
+            select(
+                target_lesson.id,
+                StepORM.title,
+                StepORM.step_type,
+                StepORM.content,
+                StepORM.video_url,
+                StepORM.order_number,
+                StepORM.quiz_data,
+            )
+            .join(source_lesson, StepORM.lesson_id == source_lesson.id)
+            .join(
+                target_lesson,
+                and_(
+                    target_lesson.course_id == new_course_id,
+                    target_lesson.order_number == source_lesson.order_number,
+                ),
+            )
+            .where(source_lesson.course_id == course_id),
+        )
+        await self.session.execute(steps_query)
+        return new_course_id
+
     async def delete_course(self, course_id: int) -> None:
         query = delete(CourseORM).where(CourseORM.id == course_id)
         await self.session.execute(query)
-        await self.session.commit()
 
-    async def get_paginated_courses_with_filters(
-            self,
-            page: int,
-            per_page: int,
-            min_price: float | None = None,
-            max_price: float | None = None,
-    ) -> dict:
+    @property
+    def _has_search_vector(self) -> bool:
+        return self.session.get_bind().dialect.name == 'postgresql'
 
+    def _search_query(self, search: str, prefix: bool):
+        """
+            tsquery для поиска по courses.search_vector (generated-колонка с GIN-индексом, только в Postgres).
+            В prefix-режиме каждое слово ищется как префикс: "fast pyth" -> fast:* & pyth:*.
+        """
+        if prefix:
+            terms = re.findall(r'\w+', search)
+            return func.to_tsquery('simple', ' & '.join(f'{term}:*' for term in terms)) if terms else None
+        return func.websearch_to_tsquery('simple', search)
+
+    def _catalog_filters(
+            self,
+            min_price: float | None,
+            max_price: float | None,
+            search: str | None = None,
+            prefix: bool = False,
+    ) -> list:
         filters = [CourseORM.is_published == True]
 
         if min_price is not None:
@@ -38,21 +175,68 @@ class CourseRepository(BaseRepository):
         if max_price is not None:
             filters.append(CourseORM.price <= max_price)
 
+        if search:
+            if self._has_search_vector:
+                ts_query = self._search_query(search, prefix)
+                filters.append(_search_vector.op('@@')(ts_query) if ts_query is not None else false())
+            else:
+                pattern = f'%{search}%'
+                filters.append(or_(CourseORM.title.ilike(pattern), CourseORM.description.ilike(pattern)))
+
+        return filters
+
+    @read_only
+    async def count_catalog_courses(
+            self,
+            min_price: float | None = None,
+            max_price: float | None = None,
+            search: str | None = None,
+            prefix: bool = False,
+    ) -> int:
+        filters = self._catalog_filters(min_price, max_price, search, prefix)
         total_stmt = select(func.count()).select_from(CourseORM).where(*filters)
+        return await self.session.scalar(total_stmt) or 0
 
-        total_count = await self.session.scalar(total_stmt) or 0
+    @read_only
+    async def get_catalog_page(
+            self,
+            limit: int,
+            sort: CourseSort = CourseSort.ID,
+            offset: int = 0,
+            after: tuple | None = None,
+            min_price: float | None = None,
+            max_price: float | None = None,
+            search: str | None = None,
+            prefix: bool = False,
+    ) -> Sequence[CourseORM]:
+        """
+            Страница каталога, упорядоченная по (ключ сортировки, id).
+            При переданном after (значение ключа и id последнего курса) - keyset-пагинация без OFFSET.
+            С search курсы упорядочены по релевантности (ts_rank_cd), сортировка и after не применяются.
+        """
+        filters = self._catalog_filters(min_price, max_price, search, prefix)
 
-        data_query = await self.session.scalars(
-            select(CourseORM)
-            .where(*filters)
-            .offset((page - 1) * per_page)
-            .limit(per_page)
-            .order_by(CourseORM.id)
-        )
+        if search:
+            order_by = (CourseORM.id,)
+            ts_query = self._search_query(search, prefix)
+            if self._has_search_vector and ts_query is not None:
+                order_by = (func.ts_rank_cd(_search_vector, ts_query).desc(), CourseORM.id)
+        elif sort == CourseSort.NEWEST:
+            order_by = (CourseORM.created_at.desc(), CourseORM.id.desc())
+            if after is not None:
+                filters.append(tuple_(CourseORM.created_at, CourseORM.id) < after)
+        elif sort == CourseSort.PRICE:
+            order_by = (CourseORM.price, CourseORM.id)
+            if after is not None:
+                filters.append(tuple_(CourseORM.price, CourseORM.id) > after)
+        else:
+            order_by = (CourseORM.id,)
+            if after is not None:
+                filters.append(CourseORM.id > after[1])
+
+        query = select(CourseORM).where(*filters).order_by(*order_by).limit(limit)
+        if (search or after is None) and offset:
+            query = query.offset(offset)
 
-        return {
-            "items": data_query.all(),
-            "page": page,
-            "per_page": per_page,
-            "total": total_count
-        }
\ No newline at end of file
+        result = await self.session.scalars(query)
+        return result.all()
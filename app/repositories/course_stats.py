@@ -0,0 +1,143 @@
+from decimal import Decimal
+from typing import Sequence
+
+from sqlalchemy import select, update, func, true, distinct
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.helpers.purchase_status import PurchaseStatus
+from app.models.comment import CommentORM
+from app.models.course import CourseORM
+from app.models.course_stats import CourseStatsORM
+from app.models.lesson import LessonORM
+from app.models.progress import UserCourseProgressORM
+from app.models.purchace import PurchaseORM
+from app.models.step import StepORM
+from app.repositories.base import BaseRepository, upsert_insert
+
+_COUNTERS = (
+    'lessons_count',
+    'steps_count',
+    'students_count',
+    'comments_count',
+    'total_minutes',
+    'progress_count',
+    'progress_sum',
+)
+
+
+class CourseStatsRepository(BaseRepository):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, CourseStatsORM)
+
+    def _insert(self):
+        return upsert_insert(self.session, CourseStatsORM)
+
+    async def create_for_course(self, course_id: int) -> CourseStatsORM:
+        return await self.create({'course_id': course_id})
+
+    async def increment(self, course_id: int, **deltas: int | Decimal) -> None:
+        """Атомарно сдвигает счётчики курса на deltas; строка создаётся, если её ещё нет"""
+        deltas = {column: delta for column, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        query = self._insert().values(course_id=course_id, **deltas)
+        query = query.on_conflict_do_update(
+            index_elements=['course_id'],
+            set_={
+                **{column: getattr(CourseStatsORM, column) + query.excluded[column] for column in deltas},
+                'updated_at': func.now(),
+            },
+        )
+        await self.session.execute(query)
+
+    async def remove_lesson(self, lesson: LessonORM) -> None:
+        """Вычитает урок, его шаги и их комментарии (удаляются каскадом); вызывается до удаления урока"""
+        steps_count = select(func.count()).select_from(StepORM).where(StepORM.lesson_id == lesson.id).scalar_subquery()
+        comments_count = (
+            select(func.count()).select_from(CommentORM)
+            .join(StepORM, CommentORM.step_id == StepORM.id)
+            .where(StepORM.lesson_id == lesson.id, CommentORM.is_deleted.is_(False))
+            .scalar_subquery()
+        )
+        query = (
+            update(CourseStatsORM)
+            .where(CourseStatsORM.course_id == lesson.course_id)
+            .values(
+                lessons_count=CourseStatsORM.lessons_count - 1,
+                steps_count=CourseStatsORM.steps_count - steps_count,
+                comments_count=CourseStatsORM.comments_count - comments_count,
+                total_minutes=CourseStatsORM.total_minutes - (lesson.duration_minutes or 0),
+                updated_at=func.now(),
+            )
+        )
+        await self.session.execute(query)
+
+    async def remove_step(self, course_id: int, step_id: int) -> None:
+        """Вычитает шаг и его комментарии (удаляются каскадом); вызывается до удаления шага"""
+        comments_count = (
+            select(func.count()).select_from(CommentORM)
+            .where(CommentORM.step_id == step_id, CommentORM.is_deleted.is_(False))
+            .scalar_subquery()
+        )
+        query = (
+            update(CourseStatsORM)
+            .where(CourseStatsORM.course_id == course_id)
+            .values(
+                steps_count=CourseStatsORM.steps_count - 1,
+                comments_count=CourseStatsORM.comments_count - comments_count,
+                updated_at=func.now(),
+            )
+        )
+        await self.session.execute(query)
+
+    async def apply_progress(self, course_id: int, percentage: Decimal, previous: Decimal | None) -> None:
+        """previous=None - у пользователя появилась первая запись прогресса по курсу"""
+        if previous is None:
+            await self.increment(course_id, progress_count=1, progress_sum=Decimal(percentage))
+        else:
+            await self.increment(course_id, progress_sum=Decimal(percentage) - Decimal(previous))
+
+    async def reconcile(self, course_ids: Sequence[int] | None = None) -> int:
+        """
+            Пересчитывает статистику курсов одним INSERT ... SELECT ... ON CONFLICT DO UPDATE.
+            course_ids ограничивает пересчёт этими курсами (например, только что созданной копией), None - все курсы.
+            Строки статистики сначала блокируются: increment, закоммиченный раньше, попадает в снимок пересчёта,
+            а начатый позже ждёт коммита сверки и ложится поверх пересчитанных значений, а не теряется.
+        """
+        stats_course_id = CourseStatsORM.course_id
+        await self.session.execute(
+            select(stats_course_id)
+            .where(true() if course_ids is None else stats_course_id.in_(course_ids))
+            .order_by(stats_course_id)
+            .with_for_update()
+        )
+
+        course_id = CourseORM.id
+        source = select(
+            course_id,
+            select(func.count()).where(LessonORM.course_id == course_id).scalar_subquery(),
+            select(func.count()).select_from(StepORM).join(LessonORM, StepORM.lesson_id == LessonORM.id)
+            .where(LessonORM.course_id == course_id).scalar_subquery(),
+            select(func.count(distinct(PurchaseORM.user_id)))
+            .where(PurchaseORM.course_id == course_id, PurchaseORM.status == PurchaseStatus.SUCCEEDED)
+            .scalar_subquery(),
+            select(func.count()).where(CommentORM.course_id == course_id, CommentORM.is_deleted.is_(False))
+            .scalar_subquery(),
+            select(func.coalesce(func.sum(LessonORM.duration_minutes), 0))
+            .where(LessonORM.course_id == course_id).scalar_subquery(),
+            select(func.count()).where(UserCourseProgressORM.course_id == course_id).scalar_subquery(),
+            select(func.coalesce(func.sum(UserCourseProgressORM.progress_percentage), 0))
+            .where(UserCourseProgressORM.course_id == course_id).scalar_subquery(),
+        # WHERE нужен SQLite: без него INSERT ... SELECT ... ON CONFLICT не разбирается
+        ).where(true() if course_ids is None else course_id.in_(course_ids))
+
+        query = self._insert().from_select(['course_id', *_COUNTERS], source)
+        query = query.on_conflict_do_update(
+            index_elements=['course_id'],
+            set_={
+                **{column: query.excluded[column] for column in _COUNTERS},
+                'updated_at': func.now(),
+            },
+        )
+        result = await self.session.execute(query)
+        return result.rowcount
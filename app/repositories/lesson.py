@@ -1,14 +1,19 @@
-from typing import Sequence
+from typing import Iterable, Sequence
 
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from sqlalchemy.orm import selectinload, joinedload, load_only
 
+from app.core.config import config
 from app.models.lesson import LessonORM
-from app.repositories.base import BaseRepository
+from app.models.step import StepORM
+from app.repositories.base import BaseRepository, read_only
+from app.repositories.ordering import OrderedRepositoryMixin
 
 
-class LessonRepository(BaseRepository):
+class LessonRepository(OrderedRepositoryMixin, BaseRepository):
+    order_partition = 'course_id'
+
     def __init__(self, session: AsyncSession):
         super().__init__(session, LessonORM)
 
@@ -19,6 +24,7 @@ class LessonRepository(BaseRepository):
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
+    @read_only
     async def get_all_lessons(self, course_id: int) -> Sequence[LessonORM]:
         result = await self.session.scalars(
             select(LessonORM).where(LessonORM.course_id == course_id)
@@ -27,6 +33,48 @@ class LessonRepository(BaseRepository):
         )
         return result.all()
 
+    @read_only
+    async def stream_lessons(self, course_id: int) -> AsyncResult:
+        """Уроки курса серверным курсором, по COURSE_EXPORT_BATCH_SIZE строк за раз"""
+        query = (
+            select(LessonORM.title, LessonORM.order_number, LessonORM.duration_minutes, LessonORM.is_free)
+            .where(LessonORM.course_id == course_id)
+            .order_by(LessonORM.order_number)
+            .execution_options(yield_per=config.COURSE_EXPORT_BATCH_SIZE)
+        )
+        return await self.session.stream(query)
+
+    @read_only
+    async def get_lessons_projection(
+            self,
+            course_id: int,
+            lesson_fields: Iterable[str],
+            step_fields: Iterable[str] | None = None,
+    ) -> Sequence[LessonORM]:
+        """Уроки курса, у которых загружены только lesson_fields; шаги - только step_fields и только если переданы"""
+        query = (
+            select(LessonORM).where(LessonORM.course_id == course_id)
+            .options(load_only(*(getattr(LessonORM, field) for field in lesson_fields)))
+            .order_by(LessonORM.order_number)
+        )
+        if step_fields is not None:
+            query = query.options(
+                selectinload(LessonORM.steps).load_only(*(getattr(StepORM, field) for field in step_fields))
+            )
+        result = await self.session.scalars(query)
+        return result.all()
+
+    @read_only
+    async def get_lessons_versions(self, course_id: int) -> Sequence[tuple]:
+        """(id, updated_at) уроков курса и их шагов без контента - для ETag списка уроков"""
+        result = await self.session.execute(
+            select(LessonORM.id, LessonORM.updated_at, StepORM.id, StepORM.updated_at)
+            .outerjoin(StepORM, StepORM.lesson_id == LessonORM.id)
+            .where(LessonORM.course_id == course_id)
+            .order_by(LessonORM.id, StepORM.id)
+        )
+        return result.all()
+
     async def get_lesson_with_course(self, lesson_id: int):
         query = (
             select(LessonORM)
@@ -34,4 +82,7 @@ class LessonRepository(BaseRepository):
             .options(joinedload(LessonORM.course))
         )
         result = await self.session.execute(query)
-        return result.scalar_one_or_none()
\ No newline at end of file
+        return result.scalar_one_or_none()
+    async def get_course_ids(self, lesson_ids: Iterable[int]) -> set[int]:
+        result = await self.session.scalars(select(LessonORM.course_id).where(LessonORM.id.in_(lesson_ids)).distinct())
+        return set(result.all())
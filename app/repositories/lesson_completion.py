@@ -12,12 +12,13 @@ class LessonCompletionRepository(BaseRepository):
     def __init__(self, session: AsyncSession):
         super().__init__(session, UserLessonCompletionORM)
 
-    async def update_course_progress(self, user_id: int, course_id: int, lesson_id: int):
+    async def update_course_progress(self, user_id: int, course_id: int, lesson_id: int) -> tuple[Decimal, Decimal | None]:
+        """Возвращает (новый процент, предыдущий процент или None, если записи прогресса не было)"""
         total_lessons_query = select(func.count()).select_from(LessonORM).where(LessonORM.course_id == course_id)
         total_result_count = await self.session.execute(total_lessons_query)
         total_count = total_result_count.scalar() or 0
         if total_count == 0:
-            return 0
+            return Decimal(0), Decimal(0)
 
         completed_lessons_query = (
             select(func.count()).select_from(UserLessonCompletionORM)
@@ -37,6 +38,7 @@ class LessonCompletionRepository(BaseRepository):
         )
         result_progress = await self.session.execute(existing_course_progres_query)
         progress_record = result_progress.scalar_one_or_none()
+        previous = progress_record.progress_percentage if progress_record else None
         if progress_record:
             progress_record.progress_percentage = percentage
             progress_record.is_completed = (percentage >= 100)
@@ -50,8 +52,8 @@ class LessonCompletionRepository(BaseRepository):
                 is_completed=(percentage >= 100),
             )
             self.session.add(new_progress)
-        await self.session.commit()
-        return percentage
+        await self.session.flush()
+        return percentage, previous
 
 
 
@@ -71,8 +73,7 @@ class LessonCompletionRepository(BaseRepository):
             .where(UserLessonCompletionORM.user_id == user_id)
             .where(UserLessonCompletionORM.lesson_id == lesson_id)
         )
-        result = await self.session.execute(query)
-        await self.session.commit()
+        await self.session.execute(query)
 
     async def check_exists(self, user_id: int, lesson_id: int) -> bool:
         query = (
@@ -0,0 +1,90 @@
+from typing import Sequence
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.config import config
+
+
+class OrderedRepositoryMixin:
+    """
+        Разреженный порядок: order_number идёт с шагом ORDER_GAP внутри контейнера (курса или урока).
+        Новая запись встаёт в конец одним запросом, удаление не сдвигает соседей,
+        а между соседями можно вставить запись, пока между ними есть зазор.
+        В Postgres уникальность (контейнер, order_number) - DEFERRABLE INITIALLY IMMEDIATE (миграция e3b7c1a94f20)
+        и проверяется в конце стейтмента, поэтому новый порядок целиком применяется одним UPDATE.
+    """
+    # Имя колонки контейнера: course_id для уроков, lesson_id для шагов
+    order_partition: str
+
+    @property
+    def _partition(self) -> InstrumentedAttribute:
+        return getattr(self.model, self.order_partition)
+
+    async def get_next_order_number(self, container_id: int) -> int:
+        query = select(func.max(self.model.order_number)).where(self._partition == container_id)
+        last = await self.session.scalar(query)
+        return (last or 0) + config.ORDER_GAP
+
+    async def get_ordered_ids(self, container_id: int) -> list[int]:
+        query = (
+            select(self.model.id)
+            .where(self._partition == container_id)
+            .order_by(self.model.order_number, self.model.id)
+        )
+        result = await self.session.scalars(query)
+        return list(result.all())
+
+    async def apply_order(self, container_id: int, ids: Sequence[int]) -> dict[int, int]:
+        """Ставит записи контейнера в порядке ids с равными зазорами; возвращает {id: order_number}"""
+        positions = {object_id: index * config.ORDER_GAP for index, object_id in enumerate(ids, start=1)}
+        if self.session.get_bind().dialect.name != 'postgresql':
+            # Без DEFERRABLE (SQLite) уникальность проверяется построчно: сначала уводим номера в отрицательные
+            await self.session.execute(
+                update(self.model)
+                .where(self._partition == container_id)
+                .values(order_number=-self.model.order_number)
+                .execution_options(synchronize_session=False)
+            )
+        query = (
+            update(self.model)
+            .where(self._partition == container_id, self.model.id.in_(positions))
+            .values(order_number=case(positions, value=self.model.id))
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(query)
+        return positions
+
+    async def rebalance_crowded(self) -> set[int]:
+        """Перенумеровывает контейнеры, где зазор между соседями меньше ORDER_MIN_GAP; возвращает их id"""
+        gaps = select(
+            self._partition.label('container_id'),
+            (
+                self.model.order_number
+                - func.lag(self.model.order_number).over(
+                    partition_by=self._partition,
+                    order_by=self.model.order_number,
+                )
+            ).label('gap'),
+        ).subquery()
+        crowded = select(gaps.c.container_id).where(gaps.c.gap < config.ORDER_MIN_GAP).distinct()
+
+        ranked = select(
+            self.model.id,
+            (
+                func.row_number().over(
+                    partition_by=self._partition,
+                    order_by=(self.model.order_number, self.model.id),
+                ) * config.ORDER_GAP
+            ).label('position'),
+        ).where(self._partition.in_(crowded)).subquery()
+
+        query = (
+            update(self.model)
+            .where(self.model.id == ranked.c.id)
+            .values(order_number=ranked.c.position)
+            .returning(self._partition)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.scalars(query)
+        return set(result.all())
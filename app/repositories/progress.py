@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.models.progress import UserCourseProgressORM
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, read_only
 
 
 class ProgressRepository(BaseRepository):
@@ -20,6 +20,7 @@ class ProgressRepository(BaseRepository):
         data = result.scalar_one_or_none()
         return data
 
+    @read_only
     async def get_all_progress_for_courses(self, user_id: int):
         query = (
             select(UserCourseProgressORM)
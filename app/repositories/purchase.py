@@ -1,14 +1,16 @@
 from decimal import Decimal
+from functools import partial
 from typing import Sequence
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy.dialects.postgresql import insert
+from app.core.entitlement_cache import entitlement_cache
 from app.helpers.purchase_status import PurchaseStatus
 from app.models.course import CourseORM
 from app.models.purchace import PurchaseORM
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, read_only
 
 
 class PurchaseRepository(BaseRepository):
@@ -58,6 +60,24 @@ class PurchaseRepository(BaseRepository):
     async def update_status(self, purchase: PurchaseORM, new_status: PurchaseStatus) -> None:
         purchase.status = new_status
 
+    async def change_status(
+            self,
+            purchase_id: int,
+            new_status: PurchaseStatus,
+            only_from: Sequence[PurchaseStatus] | None = None,
+    ) -> bool:
+        """
+            Условный UPDATE: статус меняется, только если он ещё не new_status (и входит в only_from).
+            True - строка обновлена. Параллельный UPDATE той же строки ждёт блокировку и перепроверяет WHERE,
+            поэтому из двух одинаковых вебхуков переход засчитывает только один.
+        """
+        conditions = [PurchaseORM.id == purchase_id, PurchaseORM.status != new_status]
+        if only_from is not None:
+            conditions.append(PurchaseORM.status.in_(only_from))
+        query = update(PurchaseORM).where(*conditions).values(status=new_status).returning(PurchaseORM.id)
+        return await self.session.scalar(query) is not None
+
+    @read_only
     async def get_purchased_courses(self, user_id: int) -> Sequence[CourseORM]:
         query = select(CourseORM).join(PurchaseORM, CourseORM.id==PurchaseORM.course_id).where(
             PurchaseORM.user_id == user_id,
@@ -66,12 +86,15 @@ class PurchaseRepository(BaseRepository):
         result = await self.session.execute(query)
         return result.scalars().all()
 
-    async def check_purchased_confirmed(self, user_id: int, course_id: int):
-        query = (
-            select(PurchaseORM)
-            .where(PurchaseORM.user_id == user_id)
-            .where(PurchaseORM.course_id == course_id)
-            .where(PurchaseORM.status == PurchaseStatus.SUCCEEDED)
+    async def get_purchased_course_ids(self, user_id: int) -> list[int]:
+        query = select(PurchaseORM.course_id).where(
+            PurchaseORM.user_id == user_id,
+            PurchaseORM.status == PurchaseStatus.SUCCEEDED,
         )
-        result = await self.session.execute(query)
-        return result.scalar_one_or_none() is not None
\ No newline at end of file
+        result = await self.session.scalars(query)
+        return list(result.all())
+
+    async def check_purchased_confirmed(self, user_id: int, course_id: int) -> bool:
+        return await entitlement_cache.has_course(
+            user_id, course_id, partial(self.get_purchased_course_ids, user_id)
+        )
\ No newline at end of file
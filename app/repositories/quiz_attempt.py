@@ -0,0 +1,28 @@
+from typing import Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.quiz_attempt import QuizAttemptORM
+from app.models.step import StepORM
+from app.repositories.base import BaseRepository
+
+
+class QuizAttemptRepository(BaseRepository):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, QuizAttemptORM)
+
+    async def insert_attempts(self, rows: Sequence[dict]) -> int:
+        """
+            Пачка попыток одним многострочным INSERT. Попытки по шагам, удалённым, пока пачка ждала записи,
+            отбрасываются, чтобы внешний ключ не уронил всю пачку. Найденные шаги блокируются FOR KEY SHARE
+            (та же блокировка, что берёт проверка внешнего ключа) до конца транзакции,
+            поэтому параллельное удаление ждёт INSERT, а не проскакивает между проверкой и записью.
+            Возвращает число записанных.
+        """
+        step_ids = {row['step_id'] for row in rows}
+        query = select(StepORM.id).where(StepORM.id.in_(step_ids)).with_for_update(read=True, key_share=True)
+        existing = set(await self.session.scalars(query))
+        rows = [row for row in rows if row['step_id'] in existing]
+        await self.insert_many(rows)
+        return len(rows)
@@ -1,12 +1,21 @@
-from sqlalchemy.orm import joinedload
+from typing import Iterable
 
-from app.repositories.base import BaseRepository
+from sqlalchemy.ext.asyncio import AsyncResult
+from sqlalchemy.orm import joinedload, load_only
+
+from app.core.config import config
+
+from app.repositories.base import BaseRepository, read_only
+from app.repositories.ordering import OrderedRepositoryMixin
 from app.models.step import StepORM
 from app.models.lesson import LessonORM
-from sqlalchemy import select, func, update
+from app.models.course import CourseORM
+from sqlalchemy import select
 
 
-class StepRepository(BaseRepository):
+class StepRepository(OrderedRepositoryMixin, BaseRepository):
+    order_partition = 'lesson_id'
+
     def __init__(self, session):
         super().__init__(session, StepORM)
 
@@ -22,24 +31,63 @@ class StepRepository(BaseRepository):
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_all_steps(self, lesson_id: int):
-        result = await self.session.scalars(
+    @read_only
+    async def get_all_steps(self, lesson_id: int, fields: Iterable[str] | None = None):
+        query = (
             select(StepORM).where(StepORM.lesson_id == lesson_id)
             .order_by(StepORM.order_number)
         )
+        if fields is not None:
+            query = query.options(load_only(*(getattr(StepORM, field) for field in fields)))
+        result = await self.session.scalars(query)
         return result.all()
 
-    async def get_count_by_lesson(self, lesson_id: int) -> int:
-        query = select(func.count()).select_from(StepORM).where(StepORM.lesson_id == lesson_id)
-        result = await self.session.execute(query)
-        return result.scalar() or 0
+    @read_only
+    async def get_steps_versions(self, lesson_id: int):
+        """(id, updated_at) шагов урока без контента - для ETag списка шагов"""
+        result = await self.session.execute(
+            select(StepORM.id, StepORM.updated_at)
+            .where(StepORM.lesson_id == lesson_id)
+            .order_by(StepORM.id)
+        )
+        return result.all()
 
-    async def reorder_steps_after_delete(self, lesson_id: int, deleted_order_id: int):
+    @read_only
+    async def stream_course_steps(self, course_id: int) -> AsyncResult:
+        """Шаги всех уроков курса с order_number урока, серверным курсором"""
         query = (
-            update(StepORM)
-            .where(StepORM.lesson_id == lesson_id)
-            .where(StepORM.order_number > deleted_order_id)
-            .values(order_number=StepORM.order_number - 1)
+            select(
+                LessonORM.order_number.label('lesson_order'),
+                StepORM.title,
+                StepORM.step_type,
+                StepORM.order_number,
+                StepORM.content,
+                StepORM.video_url,
+                StepORM.quiz_data,
+            )
+            .join(LessonORM, StepORM.lesson_id == LessonORM.id)
+            .where(LessonORM.course_id == course_id)
+            .order_by(LessonORM.order_number, StepORM.order_number)
+            .execution_options(yield_per=config.COURSE_EXPORT_BATCH_SIZE)
+        )
+        return await self.session.stream(query)
+
+    @read_only
+    async def get_quiz_source(self, step_id: int):
+        """quiz_data и версия шага вместе с уроком, курсом и автором курса - всё, что нужно для проверки ответа"""
+        query = (
+            select(
+                StepORM.id,
+                StepORM.step_type,
+                StepORM.quiz_data,
+                StepORM.updated_at,
+                StepORM.lesson_id,
+                LessonORM.course_id,
+                CourseORM.author_id,
+            )
+            .join(LessonORM, StepORM.lesson_id == LessonORM.id)
+            .join(CourseORM, LessonORM.course_id == CourseORM.id)
+            .where(StepORM.id == step_id)
         )
-        await self.session.execute(query)
-        await self.session.commit()
\ No newline at end of file
+        result = await self.session.execute(query)
+        return result.one_or_none()
@@ -26,6 +26,6 @@ class UserRepository(BaseRepository):
         for key,value in data.items():
             if hasattr(obj, key):
                 setattr(obj, key, value)
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(obj)
         return obj
\ No newline at end of file
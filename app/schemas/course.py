@@ -18,6 +18,16 @@ class CourseUpdate(BaseModel):
     description: str | None = Field(default=None, min_length=20)
     price: Decimal | None = Field(default=None, max_digits=10, decimal_places=2)
 
+class CourseStats(BaseModel):
+    lessons_count: int = 0
+    steps_count: int = 0
+    students_count: int = 0
+    comments_count: int = 0
+    total_minutes: int = 0
+    average_progress: Decimal = Decimal("0.00")
+
+    model_config = ConfigDict(from_attributes=True)
+
 class CourseResponse(CourseBase):
     id: int
     author_id: int
@@ -27,6 +37,8 @@ class CourseResponse(CourseBase):
     created_at: datetime
     updated_at: datetime
 
+    stats: CourseStats | None = None
+
     model_config = ConfigDict(from_attributes=True)
 
 class CourseList(BaseModel):
@@ -34,6 +46,7 @@ class CourseList(BaseModel):
     page: int
     per_page: int
     total: int
+    next_cursor: str | None = None
 
 class CourseShortInfo(BaseModel):
     id: int
@@ -0,0 +1,36 @@
+from decimal import Decimal
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.helpers.step_type import StepType
+
+
+class TransferRecord(BaseModel):
+    """Строка NDJSON выгрузки курса. Поля повторяют колонки таблиц, а не ограничения API"""
+    model_config = ConfigDict(from_attributes=True)
+
+class CourseRecord(TransferRecord):
+    type: Literal['course'] = 'course'
+    title: str = Field(..., min_length=1, max_length=130)
+    description: str | None = None
+    price: Decimal = Field(default=Decimal("0.0"), max_digits=10, decimal_places=2)
+
+class LessonRecord(TransferRecord):
+    type: Literal['lesson'] = 'lesson'
+    title: str = Field(..., min_length=1, max_length=80)
+    order_number: int = Field(..., ge=1)
+    duration_minutes: int | None = Field(None, ge=1)
+    is_free: bool = False
+
+class StepRecord(TransferRecord):
+    type: Literal['step'] = 'step'
+    lesson_order: int = Field(..., ge=1, description='order_number урока, к которому относится шаг')
+    title: str | None = Field(None, max_length=255)
+    step_type: StepType
+    order_number: int = Field(..., ge=1)
+    content: str | None = None
+    video_url: str | None = None
+    quiz_data: dict | None = None
+
+AnyRecord = Annotated[CourseRecord | LessonRecord | StepRecord, Field(discriminator='type')]
@@ -11,7 +11,7 @@ class LessonBase(BaseModel):
     is_free: bool = Field(default=False, description='Бесплатный ли урок')
 
 class LessonCreate(LessonBase):
-    pass
+    order_number: int | None = Field(None, ge=1, description='Порядковый номер урока; без него урок встаёт в конец')
 
 class LessonUpdate(BaseModel):
     title: str | None = Field(default=None, min_length=5, max_length=80)
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field, field_validator
+
+
+class ReorderRequest(BaseModel):
+    ids: list[int] = Field(..., min_length=1, description='Все id контейнера в новом порядке')
+
+    @field_validator('ids')
+    @classmethod
+    def unique_ids(cls, ids: list[int]) -> list[int]:
+        if len(set(ids)) != len(ids):
+            raise ValueError('ids must be unique')
+        return ids
+
+class OrderItem(BaseModel):
+    id: int
+    order_number: int
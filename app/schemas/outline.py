@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+
+from app.helpers.step_type import StepType
+
+
+class OutlineStep(BaseModel):
+    id: int
+    title: str | None
+    step_type: StepType
+    order_number: int
+    prev_step_id: int | None = None
+    next_step_id: int | None = None
+
+class OutlineLesson(BaseModel):
+    id: int
+    title: str
+    order_number: int
+    is_free: bool
+    duration_minutes: int | None
+    steps: list[OutlineStep] = []
+
+class CourseOutline(BaseModel):
+    course_id: int
+    lessons: list[OutlineLesson]
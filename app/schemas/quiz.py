@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from app.core.config import config
+
+Answer = Annotated[str, Field(max_length=config.QUIZ_ANSWER_MAX_LENGTH)] | int | float | bool
+
+class QuizAttemptCreate(BaseModel):
+    answer: Answer | Annotated[list[Answer], Field(max_length=config.QUIZ_ANSWER_MAX_ITEMS)] = Field(
+        ..., description='Ответ: значение или список значений для вопроса с выбором',
+    )
+
+class QuizAttemptResult(BaseModel):
+    step_id: int
+    is_correct: bool
+    submitted_at: datetime
@@ -1,14 +1,28 @@
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Annotated
+
+from pydantic import AfterValidator, BaseModel, Field, ConfigDict, ValidationInfo
+from app.helpers.quiz import public_quiz_data
 from app.helpers.step_type import StepType
 
 
+def _hide_answer_key(quiz_data: dict | None, info: ValidationInfo) -> dict | None:
+    """Ответы квиза вырезаются, если схема валидируется с context={'hide_answer_key': True} (ответ студенту)"""
+    if info.context and info.context.get('hide_answer_key'):
+        return public_quiz_data(quiz_data)
+    return quiz_data
+
+QuizData = Annotated[dict | None, AfterValidator(_hide_answer_key)]
+
+# Контекст валидации для ответов тем, кто не редактирует курс
+PUBLIC_VIEW = {'hide_answer_key': True}
+
 class StepBase(BaseModel):
     title: str = Field(..., min_length=3, max_length=255)
     step_type: StepType = Field(..., description='Тип урока')
     order_number: int | None = Field(None, ge=1, description='Порядковый номер урока')
     content: str | None = None
     video_url: str | None = None
-    quiz_data: dict | None = None
+    quiz_data: QuizData = None
 
 class StepCreate(StepBase):
     pass
@@ -25,4 +39,4 @@ class StepResponse(StepBase):
     id: int
     lesson_id: int
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
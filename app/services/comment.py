@@ -1,3 +1,6 @@
+from functools import partial
+
+from app.core.database import after_commit
 from app.core.exceptions import NotFoundException, ForbiddenException
 from app.helpers.user_role import UserRoleEnum
 from app.models.comment import CommentORM
@@ -100,7 +103,9 @@ class CommentService:
             parent_id=None
         )
 
-        return await self.comment_repo.create_comment(new_comment)
+        created = await self.comment_repo.create_comment(new_comment)
+        await self.step_service.stats_repo.increment(new_comment.course_id, comments_count=1)
+        return created
 
     async def reply_to_comment(self, comment_id: int, user: UserORM, content: str):
         existing_comment, step = await self.get_comment_and_check_rights(comment_id, user, check_author=False)
@@ -116,6 +121,7 @@ class CommentService:
         )
 
         created = await self.comment_repo.create_comment(new_comment)
+        await self.step_service.stats_repo.increment(new_comment.course_id, comments_count=1)
 
         if existing_comment.user_id != user.id:
             comment_reply = {
@@ -125,17 +131,24 @@ class CommentService:
                 "comment_id": existing_comment.id,
                 "content": created.content[:50] + '...' if len(created.content) > 50 else created.content,
             }
-            await self.notification_service.send_notification(target_user_id=existing_comment.user_id,payload=comment_reply)
+            after_commit(self.comment_repo.session, partial(
+                self.notification_service.send_notification,
+                target_user_id=existing_comment.user_id,
+                payload=comment_reply,
+            ))
 
-        return self._build_comment_response(created)
+        return self._build_comment_response(created, author_obj=user)
 
     async def soft_delete_comment(self, comment_id: int, user: UserORM):
         comment, _ = await self.get_comment_and_check_rights(comment_id, user)
+        was_deleted = comment.is_deleted
 
         updated = await self.comment_repo.update(comment_id, data={
             "content": 'Сообщение удалено пользователем',
             'is_deleted': True
         })
+        if not was_deleted:
+            await self.step_service.stats_repo.increment(comment.course_id, comments_count=-1)
         return self._build_comment_response(updated, author_obj=comment.author)
 
     async def update_comment(self, comment_id: int, user: UserORM, payload: CommentUpdate):
@@ -149,7 +162,7 @@ class CommentService:
 
     async def get_all_course_comments(self, course_id: int, user: UserORM):
         if user.role != UserRoleEnum.ADMIN:
-            is_enrolled = await self.comment_repo.check_user_enrollment(user.id, course_id)
+            is_enrolled = await self.step_service.purchase_repo.check_purchased_confirmed(user.id, course_id)
             if not is_enrolled:
                 raise ForbiddenException('Доступ к обсуждениям закрыт. Купите курс.')
 
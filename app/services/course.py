@@ -1,18 +1,32 @@
+import hashlib
+from functools import partial
+
 from loguru import logger
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import config
 
 from app.core.exceptions import NotFoundException, ForbiddenException, \
     BadRequestException
+from app.helpers.course_sort import CourseSort
+from app.helpers.courses.cache_utils import LIST_GENERATION_KEY
+from app.helpers.courses.cache_utils import get_cached_count
+from app.helpers.courses.cache_utils import get_generation
+from app.helpers.courses.cursor import decode_cursor, encode_cursor
 from app.helpers.user_role import UserRoleEnum
 from app.models.course import CourseORM
 from app.models.user import UserORM
 from app.repositories.course import CourseRepository
-from app.schemas.course import CourseCreate, CourseResponse, CourseUpdate
+from app.repositories.course_stats import CourseStatsRepository
+from app.schemas.course import CourseCreate, CourseResponse, CourseUpdate, CourseList
+from app.schemas.outline import CourseOutline, OutlineLesson, OutlineStep
 
 
 class CourseService:
 
-    def __init__(self, course_repo: CourseRepository):
+    def __init__(self, course_repo: CourseRepository, stats_repo: CourseStatsRepository):
         self.course_repo = course_repo
+        self.stats_repo = stats_repo
 
     async def get_paginated_courses(
             self,
@@ -20,17 +34,52 @@ class CourseService:
             per_page: int,
             min_price: float | None,
             max_price: float | None,
-    ):
+            sort: CourseSort = CourseSort.ID,
+            after: str | None = None,
+            search: str | None = None,
+            prefix: bool = False,
+    ) -> CourseList:
         if min_price is not None and max_price is not None and min_price > max_price:
             raise BadRequestException(
                 message='Min price can\'t be higher than max price'
             )
 
-        return await self.course_repo.get_paginated_courses_with_filters(
-            page=page,
-            per_page=per_page,
+        search = search.strip() if search else None
+        if search and after:
+            raise BadRequestException(message='Search results are paginated by page, not by cursor')
+
+        cursor = decode_cursor(after, sort) if after else None
+        courses = await self.course_repo.get_catalog_page(
+            limit=per_page + 1,
+            sort=sort,
+            offset=(page - 1) * per_page,
+            after=cursor,
             min_price=min_price,
             max_price=max_price,
+            search=search,
+            prefix=prefix,
+        )
+        has_next = len(courses) > per_page
+        courses = courses[:per_page]
+
+        search_key = hashlib.md5(search.encode()).hexdigest() if search else None
+        generation = await get_generation(LIST_GENERATION_KEY)
+        count_loader = partial(self.course_repo.count_catalog_courses, min_price, max_price, search, prefix)
+        if generation is None:
+            total = await count_loader()
+        else:
+            total = await get_cached_count(
+                key=f'courses:count:g{generation}:{min_price}:{max_price}:{search_key}:{prefix}',
+                loader=count_loader,
+                expire=config.COURSE_COUNT_CACHE_TTL_SECONDS,
+            )
+
+        return CourseList(
+            items=[CourseResponse.model_validate(course) for course in courses],
+            page=page,
+            per_page=per_page,
+            total=total,
+            next_cursor=encode_cursor(courses[-1], sort) if has_next and not search else None,
         )
 
     async def _get_course_or_404(self, course_id: int) -> CourseORM:
@@ -47,6 +96,37 @@ class CourseService:
     async def get_by_id(self, course_id: int) -> CourseORM:
         return await self._get_course_or_404(course_id)
 
+    async def get_course_outline(self, course_id: int) -> CourseOutline:
+        rows = await self.course_repo.get_course_outline(course_id)
+        if not rows:
+            raise NotFoundException(message=f'Course not found')
+
+        lessons: dict[int, OutlineLesson] = {}
+        steps: list[OutlineStep] = []
+        for row in rows:
+            if row.lesson_id is None:
+                continue
+            lesson = lessons.get(row.lesson_id)
+            if lesson is None:
+                lesson = lessons[row.lesson_id] = OutlineLesson(
+                    id=row.lesson_id,
+                    title=row.lesson_title,
+                    order_number=row.lesson_order,
+                    is_free=bool(row.is_free),
+                    duration_minutes=row.duration_minutes,
+                )
+            if row.step_id is not None:
+                step = OutlineStep(id=row.step_id, title=row.step_title, step_type=row.step_type, order_number=row.step_order)
+                lesson.steps.append(step)
+                steps.append(step)
+
+        # Навигация сквозная: после последнего шага урока идёт первый шаг следующего
+        for previous, current in zip(steps, steps[1:]):
+            previous.next_step_id = current.id
+            current.prev_step_id = previous.id
+
+        return CourseOutline(course_id=course_id, lessons=list(lessons.values()))
+
     async def create_course(self, current_user: UserORM, payload: CourseCreate) -> CourseResponse:
         logger.debug(f'Attempting to create a course by user: {current_user.id}')
         if current_user.role not in [UserRoleEnum.AUTHOR, UserRoleEnum.ADMIN]:
@@ -60,6 +140,8 @@ class CourseService:
 
         try:
             created_course = await self.course_repo.create(created_course)
+            stats = await self.stats_repo.create_for_course(created_course.id)
+            set_committed_value(created_course, 'stats', stats)
             logger.success(f'Successfully created {payload.title} by user: {current_user.id}')
             return CourseResponse.model_validate(created_course)
         except Exception as e:
@@ -67,6 +149,18 @@ class CourseService:
         raise
 
 
+    async def clone_course(self, current_user: UserORM, course_id: int) -> CourseResponse:
+        db_course = await self._get_course_or_404(course_id)
+
+        self._check_course_access(db_course, current_user)
+
+        new_course_id = await self.course_repo.clone_course(course_id, author_id=current_user.id)
+        # Счётчики копии считаются по только что вставленным строкам: у исходного курса они могли разойтись
+        await self.stats_repo.reconcile([new_course_id])
+        cloned_course = await self._get_course_or_404(new_course_id)
+        logger.success(f'Course {course_id} cloned to {new_course_id} by user: {current_user.id}')
+        return CourseResponse.model_validate(cloned_course)
+
     async def get_my_courses(self, user_id: int) -> list[CourseResponse]:
         courses = await self.course_repo.get_my_courses(user_id)
         return [CourseResponse.model_validate(course) for course in courses]
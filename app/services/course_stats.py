@@ -0,0 +1,11 @@
+from loguru import logger
+
+from app.core.database import unit_of_work
+from app.repositories.course_stats import CourseStatsRepository
+
+
+async def reconcile_course_stats() -> None:
+    """Периодическая сверка course_stats: исправляет дрейф инкрементальных счётчиков"""
+    async with unit_of_work() as session:
+        updated = await CourseStatsRepository(session=session).reconcile()
+    logger.info(f'Course stats reconciled for {updated} courses')
@@ -0,0 +1,163 @@
+from typing import AsyncIterator
+
+from loguru import logger
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import config
+from app.core.exceptions import BadRequestException, ForbiddenException
+from app.helpers.user_role import UserRoleEnum
+from app.models.course import CourseORM
+from app.models.user import UserORM
+from app.repositories.course import CourseRepository
+from app.repositories.course_stats import CourseStatsRepository
+from app.repositories.lesson import LessonRepository
+from app.repositories.step import StepRepository
+from app.schemas.course import CourseResponse
+from app.schemas.course_transfer import AnyRecord, CourseRecord, LessonRecord, StepRecord, TransferRecord
+
+_record_adapter = TypeAdapter(AnyRecord)
+
+
+def _dump(records: list[TransferRecord]) -> bytes:
+    return b''.join(record.model_dump_json().encode() + b'\n' for record in records)
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[tuple[int, bytes]]:
+    """Строки потока по мере поступления: в памяти не больше одной незавершённой строки"""
+    buffer = b''
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+        if len(buffer) > max_line_bytes:
+            raise BadRequestException(message=f'Line {line_number + 1} is longer than {max_line_bytes} bytes')
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+class CourseTransferService:
+    """
+        Перенос курса между окружениями в NDJSON: строка course, затем все lesson, затем все step.
+        Шаг ссылается на урок через его order_number (lesson_order), поэтому id окружения в файл не попадают.
+    """
+
+    def __init__(
+            self,
+            course_repo: CourseRepository,
+            lesson_repo: LessonRepository,
+            step_repo: StepRepository,
+            stats_repo: CourseStatsRepository,
+            session_factory: async_sessionmaker,
+    ):
+        self.course_repo = course_repo
+        self.lesson_repo = lesson_repo
+        self.step_repo = step_repo
+        self.stats_repo = stats_repo
+        self.session_factory = session_factory
+
+    async def export_course(self, course: CourseORM) -> AsyncIterator[bytes]:
+        """
+            Тело отдаётся после выхода из эндпоинта, когда сессия запроса уже закрыта,
+            поэтому выгрузка читает в своей сессии из session_factory - серверным курсором, пачками по yield_per.
+            Выгрузка только читает, поэтому сессия закрывается без коммита.
+        """
+        yield _dump([CourseRecord.model_validate(course)])
+        async with self.session_factory() as session:
+            lessons = await LessonRepository(session).stream_lessons(course.id)
+            async for rows in lessons.partitions():
+                yield _dump([LessonRecord.model_validate(row) for row in rows])
+
+            steps = await StepRepository(session).stream_course_steps(course.id)
+            async for rows in steps.partitions():
+                yield _dump([StepRecord.model_validate(row) for row in rows])
+
+    async def import_course(self, current_user: UserORM, chunks: AsyncIterator[bytes]) -> CourseResponse:
+        if current_user.role not in [UserRoleEnum.AUTHOR, UserRoleEnum.ADMIN]:
+            raise ForbiddenException(message='Only authors can import courses')
+
+        course: CourseORM | None = None
+        lesson_ids: dict[int, int] = {}
+        lesson_orders: set[int] = set()
+        pending_lessons: list[dict] = []
+        pending_steps: list[dict] = []
+        totals = {'lessons_count': 0, 'steps_count': 0, 'total_minutes': 0}
+
+        async for line_number, line in _iter_lines(chunks, config.COURSE_IMPORT_MAX_LINE_BYTES):
+            try:
+                record = _record_adapter.validate_json(line)
+            except ValidationError as e:
+                errors = '; '.join(
+                    f"{'.'.join(map(str, error['loc'])) or 'record'}: {error['msg']}" for error in e.errors()
+                )
+                raise BadRequestException(message=f'Line {line_number}: {errors}')
+
+            if course is None:
+                if not isinstance(record, CourseRecord):
+                    raise BadRequestException(message='The first record must be a course')
+                course = await self.course_repo.create({
+                    **record.model_dump(exclude={'type'}),
+                    'author_id': current_user.id,
+                })
+                continue
+
+            if isinstance(record, LessonRecord):
+                if pending_steps or totals['steps_count']:
+                    raise BadRequestException(message=f'Line {line_number}: lessons must precede steps')
+                if record.order_number in lesson_orders:
+                    raise BadRequestException(message=f'Line {line_number}: duplicate lesson order_number')
+                lesson_orders.add(record.order_number)
+                pending_lessons.append({**record.model_dump(exclude={'type'}), 'course_id': course.id})
+                totals['lessons_count'] += 1
+                totals['total_minutes'] += record.duration_minutes or 0
+                if len(pending_lessons) >= config.DB_BULK_BATCH_SIZE:
+                    await self._flush_lessons(pending_lessons, lesson_ids)
+
+            elif isinstance(record, StepRecord):
+                if pending_lessons:
+                    await self._flush_lessons(pending_lessons, lesson_ids)
+                lesson_id = lesson_ids.get(record.lesson_order)
+                if lesson_id is None:
+                    raise BadRequestException(message=f'Line {line_number}: unknown lesson_order {record.lesson_order}')
+                pending_steps.append({**record.model_dump(exclude={'type', 'lesson_order'}), 'lesson_id': lesson_id})
+                totals['steps_count'] += 1
+                if len(pending_steps) >= config.DB_BULK_BATCH_SIZE:
+                    await self._flush_steps(pending_steps)
+
+            else:
+                raise BadRequestException(message=f'Line {line_number}: only one course record is allowed')
+
+        if course is None:
+            raise BadRequestException(message='Empty import')
+        await self._flush_lessons(pending_lessons, lesson_ids)
+        await self._flush_steps(pending_steps)
+
+        stats = await self.stats_repo.create({'course_id': course.id, **totals})
+        set_committed_value(course, 'stats', stats)
+        logger.success(
+            f'Imported course {course.id} by user {current_user.id}: '
+            f'{totals["lessons_count"]} lessons, {totals["steps_count"]} steps'
+        )
+        return CourseResponse.model_validate(course)
+
+    async def _flush_lessons(self, pending: list[dict], lesson_ids: dict[int, int]) -> None:
+        if not pending:
+            return
+        lessons = await self.lesson_repo.create_many(pending)
+        lesson_ids.update((lesson.order_number, lesson.id) for lesson in lessons)
+        pending.clear()
+
+    async def _flush_steps(self, pending: list[dict]) -> None:
+        if not pending:
+            return
+        try:
+            await self.step_repo.insert_many(pending)
+        except IntegrityError:
+            raise BadRequestException(message='Duplicate step order_number within a lesson')
+        pending.clear()
@@ -1,17 +1,23 @@
 from loguru import logger
 
-from app.core.exceptions import NotFoundException
+from app.core.exceptions import BadRequestException, NotFoundException
 from app.models.course import CourseORM
 from app.models.lesson import LessonORM
+from app.repositories.course_stats import CourseStatsRepository
 from app.repositories.lesson import LessonRepository
 from app.repositories.purchase import PurchaseRepository
-from app.schemas.lesson import LessonCreate, LessonUpdate
+from app.schemas.lesson import LessonCreate, LessonUpdate, LessonResponse
+from app.schemas.ordering import OrderItem
+from app.schemas.step import PUBLIC_VIEW, StepResponse
+from app.utils.conditional import Validators
+from app.utils.sparse import dump_sparse, sparse_model
 
 
 class LessonService:
-    def __init__(self, lesson_repo: LessonRepository, purchase_repo: PurchaseRepository):
+    def __init__(self, lesson_repo: LessonRepository, purchase_repo: PurchaseRepository, stats_repo: CourseStatsRepository):
         self.lesson_repo = lesson_repo
         self.purchase_repo = purchase_repo
+        self.stats_repo = stats_repo
 
 
     async def get_lesson_or_404(self, lesson_id: int) -> LessonORM:
@@ -23,22 +29,62 @@ class LessonService:
     async def create_lesson(self, course: CourseORM, payload: LessonCreate):
         lesson_data = payload.model_dump()
         lesson_data['course_id'] = course.id
+        if not lesson_data.get('order_number'):
+            lesson_data['order_number'] = await self.lesson_repo.get_next_order_number(course.id)
 
-        return await self.lesson_repo.create(lesson_data)
+        lesson = await self.lesson_repo.create(lesson_data)
+        await self.stats_repo.increment(course.id, lessons_count=1, total_minutes=lesson.duration_minutes or 0)
+        return lesson
 
     async def update_lesson(self, lesson: LessonORM, payload: LessonUpdate):
         data = payload.model_dump(exclude_unset=True)
+        previous_minutes = lesson.duration_minutes or 0
 
         updated_data = await self.lesson_repo.update(object_id=lesson.id, data=data)
+        if 'duration_minutes' in data:
+            await self.stats_repo.increment(
+                lesson.course_id,
+                total_minutes=(updated_data.duration_minutes or 0) - previous_minutes,
+            )
         await self.lesson_repo.session.refresh(updated_data, attribute_names=['steps'])
 
         return updated_data
 
 
     async def delete_lesson(self, lesson: LessonORM) -> dict:
+        await self.stats_repo.remove_lesson(lesson)
         await self.lesson_repo.delete(lesson.id)
         logger.success(f'Successfully deleted {lesson.id}')
         return {"message": "Lesson deleted successfully"}
 
-    async def get_all_lessons(self, course_id: int):
-        return await self.lesson_repo.get_all_lessons(course_id)
\ No newline at end of file
+    async def reorder_lessons(self, course: CourseORM, ids: list[int]) -> list[OrderItem]:
+        """Новый порядок всех уроков курса одним UPDATE"""
+        current = await self.lesson_repo.get_ordered_ids(course.id)
+        if sorted(current) != sorted(ids):
+            raise BadRequestException(message='ids должны содержать все уроки курса ровно по одному разу')
+
+        positions = await self.lesson_repo.apply_order(course.id, ids)
+        logger.success(f'Lessons of course {course.id} reordered')
+        return [OrderItem(id=object_id, order_number=order_number) for object_id, order_number in positions.items()]
+
+    async def get_all_lessons(self, course_id: int) -> list[LessonResponse]:
+        """Список уроков публичный: ответы квизов во вложенных шагах вырезаются"""
+        lessons = await self.lesson_repo.get_all_lessons(course_id)
+        return [LessonResponse.model_validate(lesson, context=PUBLIC_VIEW) for lesson in lessons]
+
+    async def get_lessons_sparse(
+            self,
+            course_id: int,
+            lesson_fields: frozenset[str],
+            step_fields: frozenset[str] | None,
+    ) -> bytes:
+        """JSON уроков только с запрошенными полями; шаги вкладываются, если передан step_fields"""
+        lessons = await self.lesson_repo.get_lessons_projection(course_id, lesson_fields, step_fields)
+        nested = ()
+        if step_fields is not None:
+            nested = (('steps', list[sparse_model(StepResponse, step_fields)]),)
+        return dump_sparse(sparse_model(LessonResponse, lesson_fields, nested), lessons, context=PUBLIC_VIEW)
+
+    async def get_lessons_validators(self, course_id: int, variant: str = '') -> Validators:
+        rows = await self.lesson_repo.get_lessons_versions(course_id)
+        return Validators.build(LessonResponse, rows, variant=variant)
@@ -1,15 +1,22 @@
 from datetime import datetime
 
+from app.repositories.course_stats import CourseStatsRepository
 from app.repositories.lesson_completion import LessonCompletionRepository
 from app.services.purchase import PurchaseService
 from app.repositories.progress import ProgressRepository
 
 
 class LessonCompletionService:
-    def __init__(self,progress_repo: ProgressRepository, lesson_completion_repo: LessonCompletionRepository, purchase_service: PurchaseService):
+    def __init__(self,progress_repo: ProgressRepository, lesson_completion_repo: LessonCompletionRepository, purchase_service: PurchaseService, stats_repo: CourseStatsRepository):
         self.lesson_completion_repo = lesson_completion_repo
         self.purchase_service = purchase_service
         self.progress_repo = progress_repo
+        self.stats_repo = stats_repo
+
+    async def _update_course_progress(self, user_id: int, course_id: int, lesson_id: int):
+        percentage, previous = await self.lesson_completion_repo.update_course_progress(user_id, course_id, lesson_id)
+        await self.stats_repo.apply_progress(course_id, percentage, previous)
+        return percentage
 
     async def mark_lesson_as_complete(self, user_id: int, lesson_id: int, course_id: int):
         is_already_completed = await self.lesson_completion_repo.check_exists(user_id, lesson_id)
@@ -22,7 +29,7 @@ class LessonCompletionService:
             }
             await self.lesson_completion_repo.create(data=completion_data)  # type: ignore
 
-        new_progress = await self.lesson_completion_repo.update_course_progress(user_id, course_id, lesson_id)
+        new_progress = await self._update_course_progress(user_id, course_id, lesson_id)
 
         return {
             "status": "success",
@@ -33,7 +40,7 @@ class LessonCompletionService:
 
     async def unmark_lesson_as_complete(self, user_id: int, lesson_id: int, course_id: int):
         await self.lesson_completion_repo.delete_completion(user_id, lesson_id)
-        return await self.lesson_completion_repo.update_course_progress(user_id, course_id, lesson_id)
+        return await self._update_course_progress(user_id, course_id, lesson_id)
 
     async def get_progress_for_course(self, user_id: int, course_id: int):
         main_progress = await self.progress_repo.get_progress_for_course(user_id=user_id, course_id=course_id)
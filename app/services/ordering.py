@@ -0,0 +1,22 @@
+from functools import partial
+
+from loguru import logger
+
+from app.core.database import after_commit, unit_of_work
+from app.helpers.courses.cache_utils import invalidate_outline
+from app.repositories.lesson import LessonRepository
+from app.repositories.step import StepRepository
+
+
+async def rebalance_order_gaps() -> None:
+    """Периодическое восстановление зазоров order_number в курсах и уроках, где вставки их исчерпали"""
+    async with unit_of_work() as session:
+        lesson_repo = LessonRepository(session)
+        course_ids = await lesson_repo.rebalance_crowded()
+        lesson_ids = await StepRepository(session).rebalance_crowded()
+        if lesson_ids:
+            course_ids |= await lesson_repo.get_course_ids(lesson_ids)
+        # order_number входит в оглавление курса
+        for course_id in course_ids:
+            after_commit(session, partial(invalidate_outline, course_id))
+    logger.info(f'Order gaps rebalanced: {len(course_ids)} courses, {len(lesson_ids)} lessons with steps')
@@ -1,4 +1,5 @@
 from decimal import Decimal
+from functools import partial
 from typing import Any
 from uuid import uuid4
 
@@ -7,20 +8,24 @@ from loguru import logger
 from yookassa import Configuration, Payment
 from yookassa.domain.notification import WebhookNotificationFactory
 
+from app.core.database import after_commit
+from app.core.entitlement_cache import entitlement_cache
 from app.core.exceptions import BadRequestException, NotFoundException
 from app.core.exceptions import ForbiddenException
 from app.helpers.purchase_status import PurchaseStatus
 from app.models.course import CourseORM
 from app.models.user import UserORM
 from app.repositories.course import CourseRepository
+from app.repositories.course_stats import CourseStatsRepository
 from app.repositories.purchase import PurchaseRepository
 from app.schemas.purchase import PurchaseDetailResponse
 
 
 class PurchaseService:
-    def __init__(self, purchase_repo: PurchaseRepository, course_repo: CourseRepository,  shop_id: str, secret_key: str):
+    def __init__(self, purchase_repo: PurchaseRepository, course_repo: CourseRepository, stats_repo: CourseStatsRepository, shop_id: str, secret_key: str):
         self.purchase_repo = purchase_repo
         self.course_repo = course_repo
+        self.stats_repo = stats_repo
         self.shop_id = shop_id
         self.secret_key = secret_key
         Configuration.account_id = self.shop_id
@@ -107,7 +112,6 @@ class PurchaseService:
         )
 
         purchase.payment_id = payment_data["id"]
-        await self.purchase_repo.session.commit()
 
         return payment_data["confirmation_url"]
 
@@ -133,12 +137,21 @@ class PurchaseService:
         if not purchase:
             raise NotFoundException(message=f'Payment {payment_id} not found')
 
+        # Статус меняется условным UPDATE, а не по прочитанному выше значению:
+        # повторный вебхук мог прийти параллельно и уже засчитать студента
+        session = self.purchase_repo.session
         if status == PurchaseStatus.SUCCEEDED:
-            purchase.status = PurchaseStatus.SUCCEEDED
+            if await self.purchase_repo.change_status(purchase.id, PurchaseStatus.SUCCEEDED):
+                await self.stats_repo.increment(purchase.course_id, students_count=1)
+            after_commit(session, partial(entitlement_cache.grant, purchase.user_id, purchase.course_id))
         elif status == PurchaseStatus.CANCELED:
-            purchase.status = PurchaseStatus.CANCELED
-
-        await self.purchase_repo.session.commit()
+            if await self.purchase_repo.change_status(
+                    purchase.id, PurchaseStatus.CANCELED, only_from=[PurchaseStatus.SUCCEEDED]
+            ):
+                await self.stats_repo.increment(purchase.course_id, students_count=-1)
+            else:
+                await self.purchase_repo.change_status(purchase.id, PurchaseStatus.CANCELED)
+            after_commit(session, partial(entitlement_cache.revoke, purchase.user_id, purchase.course_id))
 
     async def get_my_courses(self, user_id: int):
         return await self.purchase_repo.get_purchased_courses(user_id=user_id)
@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+from functools import partial
+
+from loguru import logger
+
+from app.core.exceptions import ForbiddenException, NotFoundException
+from app.core.quiz_attempt_writer import quiz_attempt_writer
+from app.core.quiz_cache import CompiledQuiz, quiz_cache
+from app.helpers.quiz import QuizDefinitionError, compile_quiz
+from app.helpers.step_type import StepType
+from app.helpers.user_role import UserRoleEnum
+from app.models.user import UserORM
+from app.repositories.purchase import PurchaseRepository
+from app.repositories.step import StepRepository
+from app.schemas.quiz import QuizAttemptCreate, QuizAttemptResult
+
+
+class QuizService:
+    def __init__(self, step_repo: StepRepository, purchase_repo: PurchaseRepository):
+        self.step_repo = step_repo
+        self.purchase_repo = purchase_repo
+
+    async def _load(self, step_id: int) -> CompiledQuiz | None:
+        source = await self.step_repo.get_quiz_source(step_id)
+        if source is None or source.step_type != StepType.QUIZ:
+            return None
+        try:
+            checker = compile_quiz(source.quiz_data)
+        except QuizDefinitionError as e:
+            logger.warning(f'Step {step_id} has an invalid quiz definition: {e}')
+            return None
+        return CompiledQuiz(
+            step_id=source.id,
+            lesson_id=source.lesson_id,
+            course_id=source.course_id,
+            author_id=source.author_id,
+            version=source.updated_at,
+            checker=checker,
+        )
+
+    async def submit_attempt(
+            self,
+            user: UserORM,
+            course_id: int,
+            lesson_id: int,
+            step_id: int,
+            payload: QuizAttemptCreate,
+    ) -> QuizAttemptResult:
+        """
+            Проверка ответа без запросов в БД на горячем пути: проверщик шага из quiz_cache,
+            доступ к курсу из entitlement_cache, попытка уходит в пакетную запись.
+        """
+        quiz = await quiz_cache.get(step_id, partial(self._load, step_id))
+        if quiz is None or quiz.lesson_id != lesson_id or quiz.course_id != course_id:
+            raise NotFoundException(message=f'Quiz step {step_id} not found in lesson {lesson_id}')
+
+        if not (user.role == UserRoleEnum.ADMIN or quiz.author_id == user.id):
+            if not await self.purchase_repo.check_purchased_confirmed(user_id=user.id, course_id=course_id):
+                raise ForbiddenException(message='Доступ закрыт. Оплатите курс, чтобы начать обучение.')
+
+        is_correct = quiz.checker.check(payload.answer)
+        submitted_at = datetime.now(timezone.utc)
+        await quiz_attempt_writer.add({
+            'user_id': user.id,
+            'step_id': step_id,
+            'answer': payload.answer,
+            'is_correct': is_correct,
+            'created_at': submitted_at,
+        })
+        return QuizAttemptResult(step_id=step_id, is_correct=is_correct, submitted_at=submitted_at)
+
@@ -1,3 +1,6 @@
+from functools import partial
+
+from app.core.database import after_commit
 from app.core.exceptions import BadRequestException
 from app.models.user import UserORM
 from app.repositories.reaction import ReactionRepository
@@ -20,8 +23,6 @@ class ReactionService:
             raise BadRequestException(message='Вы не можете лайкать свой комментарий')
 
         reaction = await self.reaction_repository.toggle_reaction(comment_id, user.id, is_like)
-        await self.reaction_repository.session.commit()
-
 
         if reaction == 'created' and is_like and comment.user_id != user.id:
             notification_data = {
@@ -32,10 +33,11 @@ class ReactionService:
                 "comment_text": comment.content[:50] + '...' if len(comment.content) > 50 else comment.content,
             }
 
-            await self.notification_service.send_notification(
+            after_commit(self.reaction_repository.session, partial(
+                self.notification_service.send_notification,
                 target_user_id=comment.user_id,
                 payload=notification_data
-            )
+            ))
 
 
         return {"status": "success", "action": reaction}
\ No newline at end of file
@@ -1,21 +1,29 @@
 from typing import Sequence
 
+from app.repositories.course_stats import CourseStatsRepository
 from app.repositories.step import StepRepository
-from app.schemas.step import StepCreate, StepUpdate, StepResponse
+from app.schemas.step import PUBLIC_VIEW, StepCreate, StepUpdate, StepResponse
 from app.models.lesson import LessonORM
 from app.models.user import UserORM
 from app.models.step import StepORM
+from app.helpers.quiz import QuizDefinitionError, compile_quiz
+from app.helpers.step_type import StepType
 from app.helpers.user_role import UserRoleEnum
-from app.core.exceptions import ForbiddenException, NotFoundException
+from app.core.exceptions import BadRequestException, ForbiddenException, NotFoundException
 from loguru import logger
 
+from app.schemas.ordering import OrderItem
+from app.utils.conditional import Validators
+from app.utils.sparse import dump_sparse, sparse_model
+
 from app.repositories.purchase import PurchaseRepository
 
 
 class StepService:
-    def __init__(self, step_repo: StepRepository, purchase_repo: PurchaseRepository):
+    def __init__(self, step_repo: StepRepository, purchase_repo: PurchaseRepository, stats_repo: CourseStatsRepository):
         self.step_repo = step_repo
         self.purchase_repo = purchase_repo
+        self.stats_repo = stats_repo
 
     async def get_step_with_details(self, step_id: int):
         step = await self.step_repo.get_step_with_details(step_id)
@@ -23,8 +31,12 @@ class StepService:
             raise NotFoundException(message="Шаг не найден")
         return step
 
+    @staticmethod
+    def _is_editor(user: UserORM, lesson: LessonORM) -> bool:
+        return user.role == UserRoleEnum.ADMIN or lesson.course.author_id == user.id
+
     async def _check_access(self, user: UserORM, lesson: LessonORM, is_write_operation: bool = False, error_message: str = None):
-        if user.role == UserRoleEnum.ADMIN or lesson.course.author_id == user.id:
+        if self._is_editor(user, lesson):
             return
 
         if is_write_operation:
@@ -36,18 +48,36 @@ class StepService:
             msg = error_message or 'Доступ закрыт. Оплатите курс, чтобы начать обучение.'
             raise ForbiddenException(message=msg)
 
+    async def authorize_read(self, lesson: LessonORM, user: UserORM) -> dict | None:
+        """
+            Проверка доступа к шагам урока - один раз на запрос, до get_steps_validators/get_all_steps/get_steps_sparse.
+            Возвращает контекст валидации StepResponse для них: ответы квизов видят только автор курса и админы.
+        """
+        await self._check_access(user, lesson, is_write_operation=False)
+        return None if self._is_editor(user, lesson) else PUBLIC_VIEW
+
+    @staticmethod
+    def _validate_quiz(step_type: StepType | None, quiz_data: dict | None) -> None:
+        """Определение квиза проверяется при сохранении, чтобы об ошибке узнал автор, а не студент"""
+        if step_type != StepType.QUIZ or quiz_data is None:
+            return
+        try:
+            compile_quiz(quiz_data)
+        except QuizDefinitionError as e:
+            raise BadRequestException(message=f'Invalid quiz_data: {e}')
 
     async def create_step(self, lesson: LessonORM, user: UserORM, payload: StepCreate) -> StepResponse:
         await self._check_access(user, lesson, is_write_operation=True)
 
         data = payload.model_dump()
+        self._validate_quiz(data['step_type'], data['quiz_data'])
 
         if not data.get('order_number'):
-            current_steps_count = await self.step_repo.get_count_by_lesson(lesson.id)
-            data['order_number'] = current_steps_count + 1
+            data['order_number'] = await self.step_repo.get_next_order_number(lesson.id)
 
         data['lesson_id'] = lesson.id
         new_data = await self.step_repo.create(data)
+        await self.stats_repo.increment(lesson.course_id, steps_count=1)
         logger.success(f"Step successfully created")
         return StepResponse.model_validate(new_data)
 
@@ -55,6 +85,7 @@ class StepService:
         await self._check_access(user, lesson, is_write_operation=True)
 
         data = payload.model_dump(exclude_unset=True)
+        self._validate_quiz(data.get('step_type', step.step_type), data.get('quiz_data', step.quiz_data))
         updated_data = await self.step_repo.update(object_id=step.id, data=data)
         await self.step_repo.session.refresh(updated_data)
         logger.success(f"Step {step.id} update for lesson {lesson.id}")
@@ -62,13 +93,33 @@ class StepService:
 
     async def delete_step(self, step: StepORM, lesson: LessonORM, user: UserORM) -> dict:
         await self._check_access(user, lesson, is_write_operation=True)
-        order_to_remove = step.order_number
+        await self.stats_repo.remove_step(lesson.course_id, step.id)
         await self.step_repo.delete(object_id=step.id)
-        await self.step_repo.reorder_steps_after_delete(lesson.id, deleted_order_id=order_to_remove)
         logger.success(f"Step {step.id} deleted from lesson {lesson.id}")
         return {"message": "success"}
 
-    async def get_all_steps(self, lesson: LessonORM, user: UserORM) -> Sequence[StepResponse]:
-        await self._check_access(user, lesson, is_write_operation=False)
+    async def reorder_steps(self, lesson: LessonORM, user: UserORM, ids: list[int]) -> list[OrderItem]:
+        """Новый порядок всех шагов урока одним UPDATE"""
+        await self._check_access(user, lesson, is_write_operation=True)
+
+        current = await self.step_repo.get_ordered_ids(lesson.id)
+        if sorted(current) != sorted(ids):
+            raise BadRequestException(message='ids должны содержать все шаги урока ровно по одному разу')
+
+        positions = await self.step_repo.apply_order(lesson.id, ids)
+        logger.success(f"Steps of lesson {lesson.id} reordered")
+        return [OrderItem(id=object_id, order_number=order_number) for object_id, order_number in positions.items()]
+
+    async def get_all_steps(self, lesson: LessonORM, context: dict | None) -> Sequence[StepResponse]:
+        steps = await self.step_repo.get_all_steps(lesson.id)
+        return [StepResponse.model_validate(step, context=context) for step in steps]
+
+    async def get_steps_sparse(self, lesson: LessonORM, context: dict | None, fields: frozenset[str]) -> bytes:
+        """JSON шагов урока только с запрошенными полями: остальные колонки не читаются из БД"""
+        steps = await self.step_repo.get_all_steps(lesson.id, fields=fields)
+        return dump_sparse(sparse_model(StepResponse, fields), steps, context=context)
 
-        return await self.step_repo.get_all_steps(lesson.id)
\ No newline at end of file
+    async def get_steps_validators(self, lesson: LessonORM, context: dict | None, variant: str = '') -> Validators:
+        rows = await self.step_repo.get_steps_versions(lesson.id)
+        view = 'student' if context else 'editor'
+        return Validators.build(StepResponse, rows, variant=f'{view}|{variant}')
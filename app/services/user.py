@@ -1,15 +1,19 @@
 from loguru import logger
 
+from functools import partial
+
 from app.core.config import config
+from app.core.database import after_commit
 from app.core.exceptions import NotFoundException, ConflictException, UnauthorizedException, ForbiddenException, \
     BaseAppException
+from app.core.principal_cache import principal_cache
 from app.helpers.user_role import UserRoleEnum
 from app.models.user import UserORM
 from app.repositories.user import UserRepository
 from app.schemas.user import AdminCreate
 from app.schemas.user import UserCreate, UserResponse, UserPublic, UserUpdate
 from app.schemas.user import UserRoleUpdate
-from app.utils.security import hash_password, verify_password, create_access_token
+from app.utils.security import hash_password_async, verify_password_async, create_access_token
 
 
 class UserService:
@@ -25,7 +29,7 @@ class UserService:
 
         user_data = user.model_dump()
         raw_password = user_data.pop('password')
-        user_data["hashed_password"] = hash_password(raw_password)
+        user_data["hashed_password"] = await hash_password_async(raw_password)
         try:
             created_user = await self.repository.create(user_data)
             logger.success(f'Created a new user: {user.email} with ID: {created_user.id}')
@@ -43,7 +47,7 @@ class UserService:
                 log_message=f'User {user_name} not found'
             )
 
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             raise UnauthorizedException(
                 message="Incorrect username or password",
                 log_message=f"Login failed: Wrong password for user {user_name}"
@@ -71,9 +75,13 @@ class UserService:
     async def update_profile(self, current_user: UserORM, payload: UserUpdate) -> UserResponse:
         updated_data = payload.model_dump(exclude_unset=True)
         logger.debug(f'Updating user profile: {current_user.id}. Fields to change: {updated_data.keys()}')
+        # current_user может быть снимком из principal_cache: merge записал бы его устаревшие поля (роль) в БД
+        user = await self.repository.get_by_id(current_user.id)
+        if user is None:
+            raise NotFoundException(f'User with ID {current_user.id} not found')
         try:
-            current_user = await self.repository.session.merge(current_user)
-            result = await self.repository.update_profile(obj=current_user, data=updated_data)
+            result = await self.repository.update_profile(obj=user, data=updated_data)
+            after_commit(self.repository.session, partial(principal_cache.invalidate_user, current_user.id))
             logger.success(f'Updated user profile successfully: ID: {current_user.id}')
             return UserResponse.model_validate(result)
         except Exception as e:
@@ -100,7 +108,7 @@ class UserService:
                 f'User with email {payload.email} already exists'
             )
 
-        hashed_password = hash_password(payload.password)
+        hashed_password = await hash_password_async(payload.password)
 
         new_admin_data = payload.model_dump(exclude={"admin_secret_key", "password"})
         new_admin_data['hashed_password'] = hashed_password
@@ -127,6 +135,7 @@ class UserService:
                 log_message=f"Admin tried to update non-existent user {user_id}"
             )
 
+        after_commit(self.repository.session, partial(principal_cache.invalidate_user, user_id))
         logger.success(f'Admin {current_user.id} updated role for user {user_id} to {payload.role}')
 
         return UserResponse.model_validate(updated_user)
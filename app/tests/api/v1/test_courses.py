@@ -1,6 +1,11 @@
+import json
+
 import pytest
 from decimal import Decimal
+from app.helpers.step_type import StepType
 from app.models.course import CourseORM
+from app.models.lesson import LessonORM
+from app.models.step import StepORM
 from sqlalchemy import update
 
 @pytest.mark.asyncio
@@ -70,6 +75,71 @@ async def test_get_courses_with_price_filters(client, db_session,test_author):
     assert 200.00 not in prices
 
 
+@pytest.mark.asyncio
+async def test_get_courses_keyset_pagination(client, db_session, test_author):
+    """Тест курсорной пагинации: проход по next_cursor отдаёт все курсы по цене без повторов"""
+    db_session.add_all([
+        CourseORM(
+            title=f"Курс для курсорной пагинации {i}",
+            description="Описание длиной более двадцати символов",
+            price=Decimal(price),
+            author_id=test_author.id,
+            is_published=True,
+        )
+        for i, price in enumerate(["300.00", "100.00", "200.00", "100.00", "500.00"])
+    ])
+    await db_session.commit()
+
+    seen = []
+    url = '/courses/?sort=price&per_page=2'
+    while url:
+        response = await client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend((float(c['price']), c['id']) for c in data['items'])
+        url = f"/courses/?sort=price&per_page=2&after={data['next_cursor']}" if data['next_cursor'] else None
+
+    assert seen == sorted(seen)
+    assert len(seen) == data['total'] == 5
+
+
+@pytest.mark.asyncio
+async def test_get_courses_invalid_cursor(client):
+    """Тест проверяет, что битый курсор отдаёт 400"""
+    response = await client.get('/courses/?after=not-a-cursor')
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_courses(client, db_session, test_author):
+    """Тест поиска по названию и описанию курса"""
+    db_session.add_all([
+        CourseORM(
+            title="Асинхронный FastAPI с нуля",
+            description="Описание длиной более двадцати символов",
+            price=Decimal("100.00"),
+            author_id=test_author.id,
+            is_published=True,
+        ),
+        CourseORM(
+            title="Основы языка Go для начинающих",
+            description="Описание длиной более двадцати символов",
+            price=Decimal("100.00"),
+            author_id=test_author.id,
+            is_published=True,
+        ),
+    ])
+    await db_session.commit()
+
+    response = await client.get('/courses/?q=FastAPI')
+    assert response.status_code == 200
+    data = response.json()
+
+    assert [c['title'] for c in data['items']] == ["Асинхронный FastAPI с нуля"]
+    assert data['total'] == 1
+    assert data['next_cursor'] is None
+
+
 @pytest.mark.asyncio
 async def test_get_courses_invalid_filters(client):
     """Тест валидации фильтров"""
@@ -239,6 +309,168 @@ async def test_get_course_by_id(client, test_course):
 #     assert r3.status_code == 429
 #     assert r3.json()['detail'] == "Too Many Requests"
 
+@pytest.mark.asyncio
+async def test_get_course_conditional(client, test_course):
+    """Тест условного GET: с совпадающим ETag или If-Modified-Since курс отдаётся как 304 без тела"""
+    response = await client.get(f'/courses/{test_course.id}')
+    assert response.status_code == 200
+    etag = response.headers['etag']
+    last_modified = response.headers['last-modified']
+
+    not_modified = await client.get(f'/courses/{test_course.id}', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b''
+    assert not_modified.headers['etag'] == etag
+
+    not_modified = await client.get(f'/courses/{test_course.id}', headers={'If-Modified-Since': last_modified})
+    assert not_modified.status_code == 304
+
+    changed = await client.get(f'/courses/{test_course.id}', headers={'If-None-Match': '"other"'})
+    assert changed.status_code == 200
+    assert changed.json()['id'] == test_course.id
+
+@pytest.mark.asyncio
+async def test_get_course_outline(client, db_session, test_course):
+    """Тест оглавления: уроки и шаги по порядку, навигация сквозная между уроками"""
+    first = LessonORM(title="Первый урок", order_number=1, course_id=test_course.id)
+    second = LessonORM(title="Второй урок", order_number=2, course_id=test_course.id)
+    db_session.add_all([first, second])
+    await db_session.flush()
+    db_session.add_all([
+        StepORM(lesson_id=first.id, title="Шаг 1", step_type=StepType.TEXT, content="Текст", order_number=1),
+        StepORM(lesson_id=second.id, title="Шаг 2", step_type=StepType.VIDEO, order_number=1),
+    ])
+    await db_session.commit()
+
+    response = await client.get(f'/courses/{test_course.id}/outline')
+    assert response.status_code == 200
+    lessons = response.json()['lessons']
+
+    assert [lesson['title'] for lesson in lessons] == ["Первый урок", "Второй урок"]
+    first_step, second_step = lessons[0]['steps'][0], lessons[1]['steps'][0]
+    assert 'content' not in first_step
+    assert first_step['prev_step_id'] is None
+    assert first_step['next_step_id'] == second_step['id']
+    assert second_step['prev_step_id'] == first_step['id']
+    assert second_step['next_step_id'] is None
+
+
+@pytest.mark.asyncio
+async def test_course_stats_follow_lessons(client, test_course):
+    """Тест статистики курса: создание и удаление урока сразу меняют счётчики в карточке курса"""
+    response = await client.post(
+        f'/courses/{test_course.id}/lessons/',
+        json={"title": "Первый урок", "order_number": 1, "duration_minutes": 30},
+    )
+    assert response.status_code == 200
+    lesson_id = response.json()['id']
+
+    response = await client.get(f'/courses/{test_course.id}', headers={'Cache-Control': 'no-cache'})
+    stats = response.json()['stats']
+    assert stats['lessons_count'] == 1
+    assert stats['total_minutes'] == 30
+
+    await client.delete(f'/courses/{test_course.id}/lessons/{lesson_id}')
+
+    response = await client.get(f'/courses/{test_course.id}', headers={'Cache-Control': 'no-cache'})
+    stats = response.json()['stats']
+    assert stats['lessons_count'] == 0
+    assert stats['total_minutes'] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_lessons_sparse_fields(client, db_session, test_course):
+    """Тест sparse fieldsets: в ответе только запрошенные поля урока и шагов, без контента"""
+    lesson = LessonORM(title="Первый урок", order_number=1, course_id=test_course.id)
+    db_session.add(lesson)
+    await db_session.flush()
+    step = StepORM(lesson_id=lesson.id, title="Шаг 1", step_type=StepType.TEXT, content="Текст" * 1000, order_number=1)
+    db_session.add(step)
+    await db_session.commit()
+
+    response = await client.get(f'/courses/{test_course.id}/lessons/?fields=title&fields[steps]=title,step_type')
+    assert response.status_code == 200
+    assert response.json() == [{
+        "title": "Первый урок",
+        "id": lesson.id,
+        "steps": [{"title": "Шаг 1", "step_type": "text", "id": step.id}],
+    }]
+
+    response = await client.get(f'/courses/{test_course.id}/lessons/?fields=content')
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_reorder_lessons(client, test_course):
+    """Тест порядка уроков: новые уроки встают в конец с зазором, PUT /order применяет порядок целиком"""
+    lesson_ids = []
+    for title in ("Первый урок", "Второй урок", "Третий урок"):
+        response = await client.post(f'/courses/{test_course.id}/lessons/', json={"title": title})
+        assert response.status_code == 200
+        lesson_ids.append(response.json()['id'])
+
+    new_order = lesson_ids[::-1]
+    response = await client.put(f'/courses/{test_course.id}/lessons/order', json={"ids": new_order})
+    assert response.status_code == 200
+    assert [item['id'] for item in response.json()] == new_order
+
+    response = await client.get(f'/courses/{test_course.id}/lessons/?fields=order_number')
+    assert [lesson['id'] for lesson in response.json()] == new_order
+
+    response = await client.put(f'/courses/{test_course.id}/lessons/order', json={"ids": new_order[:2]})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_clone_course(client, db_session, test_course):
+    """Тест копирования курса: уроки и шаги переносятся в новый неопубликованный курс"""
+    lesson = LessonORM(title="Первый урок", order_number=1, course_id=test_course.id)
+    db_session.add(lesson)
+    await db_session.flush()
+    db_session.add(StepORM(lesson_id=lesson.id, title="Шаг 1", step_type=StepType.TEXT, content="Текст", order_number=1))
+    await db_session.commit()
+
+    response = await client.post(f'/courses/{test_course.id}/clone')
+    assert response.status_code == 201
+    clone = response.json()
+    assert clone['id'] != test_course.id
+    assert clone['title'] == test_course.title
+    assert clone['is_published'] is False
+
+    response = await client.get(f'/courses/{clone["id"]}/outline')
+    lessons = response.json()['lessons']
+    assert [lesson['title'] for lesson in lessons] == ["Первый урок"]
+    assert [step['title'] for step in lessons[0]['steps']] == ["Шаг 1"]
+
+
+@pytest.mark.asyncio
+async def test_export_import_course(client, db_session, test_course):
+    """Тест переноса курса: выгрузка в NDJSON и загрузка дают курс с теми же уроками и шагами"""
+    lesson = LessonORM(title="Первый урок", order_number=1, course_id=test_course.id)
+    db_session.add(lesson)
+    await db_session.flush()
+    db_session.add(StepORM(lesson_id=lesson.id, title="Шаг 1", step_type=StepType.TEXT, content="Текст", order_number=1))
+    await db_session.commit()
+
+    response = await client.get(f'/courses/{test_course.id}/export')
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record['type'] for record in records] == ['course', 'lesson', 'step']
+
+    response = await client.post('/courses/import', content=response.content)
+    assert response.status_code == 201
+    imported = response.json()
+    assert imported['title'] == test_course.title
+    assert imported['stats']['steps_count'] == 1
+
+    response = await client.get(f'/courses/{imported["id"]}/outline')
+    lessons = response.json()['lessons']
+    assert [step['title'] for step in lessons[0]['steps']] == ["Шаг 1"]
+
+    response = await client.post('/courses/import', content=b'{"type": "lesson", "title": "L", "order_number": 1}\n')
+    assert response.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_check_cache_data(client, db_session, test_course, init_redis):
     """
@@ -265,3 +497,50 @@ async def test_check_cache_data(client, db_session, test_course, init_redis):
 
     assert second_res.json()['title'] == original_title
     assert second_res.json()['title'] != 'New Ghost Title'
+
+
+@pytest.mark.asyncio
+async def test_submit_quiz_attempt(client, test_course):
+    """Тест проверки ответа на квиз: ответ сравнивается как множество без учёта регистра и пробелов"""
+    response = await client.post(f'/courses/{test_course.id}/lessons/', json={"title": "Урок с квизом"})
+    lesson_id = response.json()['id']
+
+    response = await client.post(
+        f'/courses/{test_course.id}/lessons/{lesson_id}/steps',
+        json={"title": "Квиз", "step_type": "quiz", "quiz_data": {"type": "unknown"}},
+    )
+    assert response.status_code == 400
+
+    response = await client.post(
+        f'/courses/{test_course.id}/lessons/{lesson_id}/steps',
+        json={"title": "Квиз", "step_type": "quiz", "quiz_data": {"type": "choice", "correct": ["B", "c"]}},
+    )
+    step_id = response.json()['id']
+    url = f'/courses/{test_course.id}/lessons/{lesson_id}/steps/{step_id}/attempts'
+
+    response = await client.post(url, json={"answer": ["c ", "b"]})
+    assert response.status_code == 200
+    assert response.json()['is_correct'] is True
+
+    response = await client.post(url, json={"answer": ["b"]})
+    assert response.json()['is_correct'] is False
+
+
+async def test_quiz_answer_key_hidden(client, unauth_client, test_course):
+    """Тест: правильные ответы квиза видит автор курса, в публичном списке уроков их нет"""
+    response = await client.post(f'/courses/{test_course.id}/lessons/', json={"title": "Урок с квизом"})
+    lesson_id = response.json()['id']
+    quiz_data = {"type": "choice", "options": ["a", "b"], "correct": ["a"]}
+    await client.post(
+        f'/courses/{test_course.id}/lessons/{lesson_id}/steps',
+        json={"title": "Квиз", "step_type": "quiz", "quiz_data": quiz_data},
+    )
+
+    response = await client.get(f'/courses/{test_course.id}/lessons/{lesson_id}/steps')
+    assert response.json()[0]['quiz_data'] == quiz_data
+
+    response = await unauth_client.get(f'/courses/{test_course.id}/lessons/')
+    assert response.json()[0]['steps'][0]['quiz_data'] == {"type": "choice", "options": ["a", "b"]}
+
+    response = await unauth_client.get(f'/courses/{test_course.id}/lessons/?fields[steps]=quiz_data')
+    assert 'correct' not in response.json()[0]['steps'][0]['quiz_data']
@@ -0,0 +1,78 @@
+import pytest
+from loguru import logger
+
+from app.core.config import config
+from app.core.sql_instrumentation import QueryBudget
+from app.main import app as prod_app
+
+# Без кэша ответов: иначе попадание в кэш не делает запросов к БД
+NO_CACHE = {'Cache-Control': 'no-cache'}
+
+
+@pytest.fixture
+def log_messages():
+    """Сообщения loguru уровня WARNING и выше за время теста"""
+    messages = []
+    sink_id = logger.add(messages.append, level='WARNING', format='{message}')
+    yield messages
+    logger.remove(sink_id)
+
+
+@pytest.fixture
+def course_budget(monkeypatch):
+    """Бюджет роута GET /courses/{course_id}; тест может его уменьшить"""
+    for route in prod_app.routes:
+        if getattr(route, 'path', None) == '/courses/{course_id}' and 'GET' in route.methods:
+            for dependency in route.dependencies:
+                if isinstance(dependency.dependency, QueryBudget):
+                    budget = dependency.dependency
+                    monkeypatch.setattr(budget, 'max_queries', budget.max_queries)
+                    return budget
+    raise AssertionError('GET /courses/{course_id} has no QueryBudget')
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header(client, test_course):
+    """Тест: ответ бюджетированного роута несёт заголовок Server-Timing со временем и числом запросов к БД"""
+    response = await client.get(f'/courses/{test_course.id}', headers=NO_CACHE)
+
+    assert response.status_code == 200
+    timing = response.headers['server-timing']
+    assert timing.startswith('db;dur=')
+    assert 'queries' in timing
+    assert 'desc="0 queries"' not in timing
+
+
+@pytest.mark.asyncio
+async def test_budget_exceeded_logs_warning(client, test_course, course_budget, log_messages, monkeypatch):
+    """Тест: по умолчанию превышение бюджета только пишется в лог, ответ отдаётся"""
+    monkeypatch.setattr(config, 'SQL_QUERY_BUDGET_STRICT', False)
+    course_budget.max_queries = 0
+
+    response = await client.get(f'/courses/{test_course.id}', headers=NO_CACHE)
+
+    assert response.status_code == 200
+    assert any(
+        'Query budget exceeded' in message and f'/courses/{test_course.id}' in message
+        for message in log_messages
+    )
+
+
+@pytest.mark.asyncio
+async def test_budget_exceeded_strict_mode(client, test_course, course_budget, monkeypatch):
+    """Тест: с SQL_QUERY_BUDGET_STRICT превышение бюджета - ошибка 500"""
+    monkeypatch.setattr(config, 'SQL_QUERY_BUDGET_STRICT', True)
+    course_budget.max_queries = 0
+
+    response = await client.get(f'/courses/{test_course.id}', headers=NO_CACHE)
+
+    assert response.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_budget_not_exceeded(client, test_course, log_messages):
+    """Тест: в пределах бюджета предупреждений нет"""
+    response = await client.get(f'/courses/{test_course.id}', headers=NO_CACHE)
+
+    assert response.status_code == 200
+    assert not any('Query budget exceeded' in message for message in log_messages)
@@ -9,8 +9,8 @@ from redis.asyncio import from_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.core.database import Base
-from app.core.dependencies import get_current_user, get_db
+from app.core.database import Base, RoutingSession
+from app.core.dependencies import get_current_user, get_session_factory
 from app.main import app as prod_app
 
 
@@ -40,7 +40,7 @@ async def test_engine():
 
 @pytest_asyncio.fixture(scope="session")
 async def async_sessionmaker(test_engine):
-    return sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+    return sessionmaker(test_engine, class_=AsyncSession, sync_session_class=RoutingSession, expire_on_commit=False)
 
 @pytest_asyncio.fixture
 async def db_session(async_sessionmaker):
@@ -66,24 +66,17 @@ async def init_redis():
 @pytest_asyncio.fixture(autouse=True)
 async def clear_database(db_session):
     yield
-    from app.models.user import UserORM
-    from app.models.course import CourseORM
     from sqlalchemy import delete
 
-    await db_session.execute(delete(CourseORM))
-    await db_session.execute(delete(UserORM))
+    # SQLite без PRAGMA foreign_keys не каскадирует удаление, а id переиспользуются:
+    # чистим все таблицы, чтобы строки статистики, покупок и шагов не доставались следующему тесту
+    for table in reversed(Base.metadata.sorted_tables):
+        await db_session.execute(delete(table))
     await db_session.commit()
 
 @pytest_asyncio.fixture(scope="session")
 async def app_test(async_sessionmaker, init_redis):
-    async def _get_db():
-        async with async_sessionmaker() as session:
-            try:
-                yield session
-            finally:
-                await session.rollback()
-
-    prod_app.dependency_overrides[get_db] = _get_db
+    prod_app.dependency_overrides[get_session_factory] = lambda: async_sessionmaker
     yield prod_app
     prod_app.dependency_overrides.clear()
 
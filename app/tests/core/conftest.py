@@ -0,0 +1,15 @@
+import pytest
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+
+
+@pytest.fixture
+def in_memory_backend():
+    """
+        Бэкенд fastapi-cache в памяти процесса; прежний (Redis из init_redis) возвращается после теста.
+        Хранилище InMemoryBackend общее для всех экземпляров, поэтому у каждого теста свой ключ.
+    """
+    saved = FastAPICache._init, FastAPICache._backend
+    FastAPICache._init, FastAPICache._backend = True, InMemoryBackend()
+    yield
+    FastAPICache._init, FastAPICache._backend = saved
@@ -0,0 +1,73 @@
+import asyncio
+
+from fastapi_cache import FastAPICache
+
+from app.core.cache_bus import cache_bus
+from app.helpers.courses import cache_utils
+
+
+async def test_bus_eviction_drops_generation():
+    """Тест: инвалидация через cache_bus убирает закэшированное поколение"""
+    key = cache_utils._outline_generation_key(1)
+    cache_utils._generation_cache.set(key, 3)
+
+    await cache_bus.publish([key])
+
+    assert cache_utils._generation_cache.get(key) is None
+
+
+async def test_generation_read_racing_bump_is_not_cached(init_redis):
+    """Тест: поколение, прочитанное до пришедшей инвалидации, не кэшируется"""
+    key = cache_utils._outline_generation_key(2)
+    cache_utils._generation_cache.pop(key)
+
+    read = asyncio.create_task(cache_utils.get_generation(key))
+    await asyncio.sleep(0)
+    cache_utils._evict_generations([key])
+    await read
+
+    assert cache_utils._generation_cache.get(key) is None
+    await cache_utils.get_generation(key)
+    assert cache_utils._generation_cache.get(key) is not None
+
+
+async def test_local_generations_bump(in_memory_backend):
+    """Тест: без Redis поколения считаются в процессе, инвалидация сдвигает списки, карточку и оглавление"""
+    course_id = 3
+    before = [
+        await cache_utils.get_generation(key) for key in (
+            cache_utils.LIST_GENERATION_KEY,
+            cache_utils._item_generation_key(course_id),
+            cache_utils._outline_generation_key(course_id),
+        )
+    ]
+
+    await cache_utils.invalidate_cache(course_id)
+    await cache_utils.invalidate_outline(course_id)
+
+    assert await cache_utils.get_generation(cache_utils.LIST_GENERATION_KEY) == before[0] + 1
+    assert await cache_utils.get_generation(cache_utils._item_generation_key(course_id)) == before[1] + 1
+    assert await cache_utils.get_generation(cache_utils._outline_generation_key(course_id)) == before[2] + 2
+
+
+async def test_key_builders_follow_generation(in_memory_backend):
+    """Тест: после инвалидации ключ карточки курса меняется"""
+    before = await cache_utils.item_key_builder(None, {'course_id': 4})
+    await cache_utils.invalidate_cache(4)
+    after = await cache_utils.item_key_builder(None, {'course_id': 4})
+
+    assert before != after and after.startswith('courses:item:4:g')
+
+
+async def test_failed_generation_read_bypasses_cache(in_memory_backend):
+    """Тест: если Redis не ответил, поколение неизвестно и ключ кэша не строится"""
+    class UnreachableRedis:
+        async def get(self, key):
+            raise ConnectionError('Redis is down')
+
+    FastAPICache._backend.redis = UnreachableRedis()
+    cache_utils._generation_cache.pop(cache_utils.LIST_GENERATION_KEY)
+    cache_utils._generation_cache.pop(cache_utils._item_generation_key(5))
+
+    assert await cache_utils.get_generation(cache_utils.LIST_GENERATION_KEY) is None
+    assert await cache_utils.item_key_builder(None, {'course_id': 5}) is None
@@ -0,0 +1,144 @@
+from decimal import Decimal
+
+import pytest
+from starlette.requests import Request
+
+from app.core.dependencies import (
+    check_course_purchase,
+    get_course_with_access,
+    get_purchase_service,
+    resolve_course_path,
+    valid_lesson,
+    valid_step,
+)
+from app.core.entitlement_cache import entitlement_cache
+from app.core.exceptions import ForbiddenException, NotFoundException
+from app.helpers.purchase_status import PurchaseStatus
+from app.models.lesson import LessonORM
+from app.models.purchace import PurchaseORM
+from app.models.step import StepORM
+from app.utils.security import create_access_token
+
+
+@pytest.fixture(autouse=True)
+def clear_entitlements():
+    """Near cache оплат общий на процесс, а SQLite переиспользует id пользователей и курсов"""
+    yield
+    entitlement_cache._clear()
+
+
+def _request(user=None, **path_params) -> Request:
+    headers = []
+    if user is not None:
+        token = create_access_token({'sub': user.email, 'username': user.username, 'id': user.id})
+        headers.append((b'authorization', f'Bearer {token}'.encode()))
+    return Request({'type': 'http', 'headers': headers, 'path_params': path_params})
+
+
+async def _lesson_with_step(db_session, course, order_number=1) -> tuple[LessonORM, StepORM]:
+    lesson = LessonORM(title=f'Урок {order_number}', order_number=order_number, course_id=course.id)
+    db_session.add(lesson)
+    await db_session.flush()
+    step = StepORM(lesson_id=lesson.id, title='Шаг', content='Текст', order_number=1)
+    db_session.add(step)
+    await db_session.flush()
+    return lesson, step
+
+
+async def _purchase(db_session, course, user) -> None:
+    db_session.add(PurchaseORM(
+        user_id=user.id,
+        course_id=course.id,
+        price_paid=Decimal('2500.00'),
+        status=PurchaseStatus.SUCCEEDED,
+    ))
+    await db_session.flush()
+
+
+async def test_missing_course_is_not_found(db_session):
+    """Тест: несуществующий курс - 404"""
+    with pytest.raises(NotFoundException):
+        await resolve_course_path(999_999, _request(), db_session)
+
+
+async def test_lesson_and_step_resolved_in_one_path(db_session, test_course):
+    """Тест: урок и шаг из пути приходят вместе с курсом и связаны с ним"""
+    lesson, step = await _lesson_with_step(db_session, test_course)
+    request = _request(course_id=str(test_course.id), lesson_id=str(lesson.id), step_id=str(step.id))
+
+    path = await resolve_course_path(test_course.id, request, db_session)
+
+    assert await valid_lesson(lesson.id, path) is path.lesson
+    assert await valid_step(step.id, path.lesson, path) is path.step
+    assert path.step.lesson is path.lesson
+    assert path.lesson.course is path.course
+    assert path.is_paid is False
+    assert path.user_id is None
+
+
+async def test_lesson_from_another_course_is_not_found(db_session, test_course, test_course_published):
+    """Тест: урок чужого курса - 404, а не доступ к нему через другой course_id"""
+    lesson, _ = await _lesson_with_step(db_session, test_course_published)
+    request = _request(lesson_id=str(lesson.id))
+
+    path = await resolve_course_path(test_course.id, request, db_session)
+
+    assert path.course.id == test_course.id
+    with pytest.raises(NotFoundException):
+        await valid_lesson(lesson.id, path)
+
+
+async def test_step_from_another_lesson_is_not_found(db_session, test_course):
+    """Тест: шаг другого урока - 404"""
+    lesson, _ = await _lesson_with_step(db_session, test_course, order_number=1)
+    _, foreign_step = await _lesson_with_step(db_session, test_course, order_number=2)
+    request = _request(lesson_id=str(lesson.id), step_id=str(foreign_step.id))
+
+    path = await resolve_course_path(test_course.id, request, db_session)
+
+    assert await valid_lesson(lesson.id, path) is path.lesson
+    with pytest.raises(NotFoundException):
+        await valid_step(foreign_step.id, path.lesson, path)
+
+
+async def test_unpaid_course_is_forbidden(db_session, test_course, test_regular_user):
+    """Тест: курс без оплаты - 403"""
+    path = await resolve_course_path(test_course.id, _request(test_regular_user), db_session)
+    purchase_service = await get_purchase_service(db_session)
+
+    assert path.user_id == test_regular_user.id
+    assert path.is_paid is False
+    with pytest.raises(ForbiddenException):
+        await check_course_purchase(path, test_regular_user, purchase_service)
+
+
+async def test_paid_course_resolved_with_path(db_session, test_course, test_regular_user):
+    """Тест: оплата берётся из того же запроса, что и курс"""
+    await _purchase(db_session, test_course, test_regular_user)
+    path = await resolve_course_path(test_course.id, _request(test_regular_user), db_session)
+    purchase_service = await get_purchase_service(db_session)
+
+    assert path.is_paid is True
+    assert await check_course_purchase(path, test_regular_user, purchase_service) is path.course
+
+
+async def test_purchase_checked_for_authenticated_user(db_session, test_course, test_regular_user, test_author):
+    """Тест: если токен принадлежит другому пользователю, оплата проверяется для текущего"""
+    await _purchase(db_session, test_course, test_regular_user)
+    path = await resolve_course_path(test_course.id, _request(test_author), db_session)
+    purchase_service = await get_purchase_service(db_session)
+
+    assert path.is_paid is False
+    assert await check_course_purchase(path, test_regular_user, purchase_service) is path.course
+
+
+async def test_course_access_only_for_author_and_admin(
+        db_session, test_course, test_author, test_admin, test_regular_user,
+):
+    """Тест: управлять курсом может только автор или админ, остальным - 403"""
+    path = await resolve_course_path(test_course.id, _request(), db_session)
+
+    assert await get_course_with_access(path.course, test_author) is path.course
+    assert await get_course_with_access(path.course, test_admin) is path.course
+    with pytest.raises(ForbiddenException):
+        await get_course_with_access(path.course, test_regular_user)
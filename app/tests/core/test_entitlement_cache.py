@@ -0,0 +1,62 @@
+from app.core.entitlement_cache import EntitlementCache
+
+
+def _loader(course_ids: list[int], calls: list):
+    async def load():
+        calls.append(1)
+        return course_ids
+    return load
+
+
+async def test_has_course_uses_near_cache():
+    """Тест: положительный ответ отдаётся из near cache без повторной загрузки"""
+    cache = EntitlementCache(max_size=10, ttl=60, redis_ttl=60)
+    calls = []
+    assert await cache.has_course(1, 10, _loader([10], calls)) is True
+    assert await cache.has_course(1, 10, _loader([10], calls)) is True
+    assert len(calls) == 1
+
+
+async def test_revoke_evicts_near_cache():
+    """Тест: отзыв курса вытесняет near cache, следующая проверка загружает набор заново"""
+    cache = EntitlementCache(max_size=10, ttl=60, redis_ttl=60)
+    calls = []
+    assert await cache.has_course(1, 10, _loader([10], calls)) is True
+    await cache.revoke(1, 10)
+    assert await cache.has_course(1, 10, _loader([], calls)) is False
+    assert len(calls) == 2
+
+
+async def test_loader_result_dropped_after_concurrent_revoke():
+    """Тест: набор, загруженный до отзыва, не попадает в near cache"""
+    cache = EntitlementCache(max_size=10, ttl=60, redis_ttl=60)
+
+    async def load_then_revoke():
+        await cache.revoke(1, 10)
+        return [10]
+
+    await cache.get_course_ids(1, load_then_revoke)
+    assert cache._local.get(1) is None
+
+
+async def test_grant_survives_stale_fill(init_redis):
+    """Тест: загрузка из БД, начатая до grant, не затирает выданный курс в Redis"""
+    cache = EntitlementCache(max_size=10, ttl=60, redis_ttl=60, prefix='test-entitlements')
+    cache.init(init_redis)
+    await init_redis.delete(cache._user_key(1), cache._version_key(1))
+
+    async def load_then_grant():
+        await cache.grant(1, 20)
+        return [10]
+
+    await cache.get_course_ids(1, load_then_grant)
+    members = await init_redis.smembers(cache._user_key(1))
+    assert b'20' in members and b'0' not in members
+
+    calls = []
+    assert await cache.get_course_ids(1, _loader([10, 20], calls)) == frozenset({10, 20})
+    assert await cache._read_redis(1) == frozenset({10, 20})
+
+    await cache.revoke(1, 20)
+    assert await cache._read_redis(1) == frozenset({10})
+    await init_redis.delete(cache._user_key(1), cache._version_key(1))
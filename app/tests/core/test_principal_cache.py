@@ -0,0 +1,25 @@
+from app.core.principal_cache import PrincipalCache
+
+
+async def test_invalidate_user_evicts_local_cache(test_regular_user):
+    """Тест: инвалидация пользователя через cache_bus вытесняет все его токены из локального кэша"""
+    cache = PrincipalCache(max_size=10, ttl=60, redis_ttl=60)
+    await cache.set('token-1', test_regular_user)
+    await cache.set('token-2', test_regular_user)
+    assert (await cache.get('token-1')).id == test_regular_user.id
+
+    await cache.invalidate_user(test_regular_user.id)
+    assert await cache.get('token-1') is None
+    assert await cache.get('token-2') is None
+
+
+async def test_set_skips_snapshot_loaded_before_invalidation(test_regular_user):
+    """Тест: снимок, загруженный до инвалидации, не кэшируется"""
+    cache = PrincipalCache(max_size=10, ttl=60, redis_ttl=60)
+    epoch = cache.epoch
+    await cache.invalidate_user(test_regular_user.id)
+    await cache.set('token', test_regular_user, epoch=epoch)
+    assert await cache.get('token') is None
+
+    await cache.set('token', test_regular_user, epoch=cache.epoch)
+    assert (await cache.get('token')).role == test_regular_user.role
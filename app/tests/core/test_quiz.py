@@ -0,0 +1,62 @@
+from sqlalchemy import func, select
+
+from app.core.quiz_attempt_writer import QuizAttemptWriter
+from app.core.quiz_cache import CompiledQuiz, QuizCache
+from app.helpers.quiz import compile_quiz
+from app.helpers.step_type import StepType
+from app.models.lesson import LessonORM
+from app.models.quiz_attempt import QuizAttemptORM
+from app.models.step import StepORM
+
+
+def _compiled(step_id: int, lesson_id: int, course_id: int) -> CompiledQuiz:
+    return CompiledQuiz(
+        step_id=step_id,
+        lesson_id=lesson_id,
+        course_id=course_id,
+        author_id=1,
+        version=None,
+        checker=compile_quiz({'type': 'choice', 'correct': ['a']}),
+    )
+
+
+async def test_quiz_cache_evicts_lesson_and_course():
+    """Тест: удаление урока или курса вытесняет проверщики всех их шагов"""
+    cache = QuizCache(max_size=10, ttl=60)
+    for step_id, lesson_id, course_id in [(1, 10, 100), (2, 10, 100), (3, 11, 100), (4, 12, 101)]:
+        quiz = _compiled(step_id, lesson_id, course_id)
+
+        async def loader(quiz=quiz):
+            return quiz
+
+        await cache.get(step_id, loader)
+
+    await cache.invalidate_lesson(10)
+    assert cache._local.get(1) is None and cache._local.get(2) is None
+    assert cache._local.get(3) is not None
+
+    await cache.invalidate_course(100)
+    assert cache._local.get(3) is None
+    assert cache._local.get(4) is not None
+
+    await cache.invalidate(4)
+    assert cache._local.get(4) is None
+
+
+async def test_quiz_attempt_writer_flush(db_session, async_sessionmaker, test_course):
+    """Тест: flush записывает попытки пачками, попытки по удалённым шагам отбрасываются"""
+    lesson = LessonORM(title='Урок с квизом', order_number=1, course_id=test_course.id)
+    db_session.add(lesson)
+    await db_session.flush()
+    step = StepORM(title='Квиз', step_type=StepType.QUIZ, lesson_id=lesson.id, quiz_data={'type': 'choice'})
+    db_session.add(step)
+    await db_session.commit()
+
+    writer = QuizAttemptWriter(batch_size=2, flush_interval=60, max_buffer=100, session_factory=async_sessionmaker)
+    for step_id in [step.id, step.id, step.id + 1000, step.id]:
+        await writer.add({'user_id': test_course.author_id, 'step_id': step_id, 'answer': ['a'], 'is_correct': True})
+    await writer.flush()
+
+    assert writer._buffer == []
+    count = await db_session.scalar(select(func.count()).where(QuizAttemptORM.step_id == step.id))
+    assert count == 3
@@ -0,0 +1,27 @@
+from app.core.redis_pool import RedisPool
+
+
+async def test_client_is_shared_and_lazy():
+    """Тест: пул создаётся при первом обращении, дальше отдаётся один и тот же клиент"""
+    pool = RedisPool(url='redis://localhost:6379/10', max_connections=4, timeout=1)
+    assert pool.stats() == {"max_connections": 4, "created": 0, "idle": 0, "in_use": 0, "utilization": 0.0}
+
+    client = pool.client
+    assert pool.client is client
+    assert client.connection_pool.max_connections == 4
+    assert client.connection_pool.timeout == 1
+
+    await pool.close()
+    assert pool.client is not client
+    await pool.close()
+
+
+async def test_stats_before_any_connection():
+    """Тест: без открытых соединений пул не занят"""
+    pool = RedisPool(url='redis://localhost:6379/10', max_connections=4, timeout=1)
+    pool.client
+    stats = pool.stats()
+    assert stats['created'] == 0
+    assert stats['in_use'] == 0
+    assert stats['utilization'] == 0.0
+    await pool.close()
@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.database import replica_router
+from app.models.user import UserORM
+from app.repositories.base import read_only
+
+
+class _Probe:
+    def __init__(self, session):
+        self.session = session
+
+    @read_only
+    async def read_bind(self):
+        return self.session.sync_session.get_bind()
+
+
+@pytest.fixture
+async def replica():
+    engine = create_async_engine('sqlite+aiosqlite://')
+    engines, healthy = replica_router.engines, replica_router.healthy
+    replica_router.engines, replica_router.healthy = [engine], [True]
+    yield engine.sync_engine
+    replica_router.engines, replica_router.healthy = engines, healthy
+    await engine.dispose()
+
+
+async def test_read_only_goes_to_replica(db_session, replica):
+    """Тест: чтение из @read_only идёт на реплику, обычные запросы - в primary"""
+    assert await _Probe(db_session).read_bind() is replica
+    assert db_session.sync_session.get_bind() is not replica
+
+
+async def test_unhealthy_replica_falls_back_to_primary(db_session, replica):
+    """Тест: без живых реплик чтение идёт в primary"""
+    replica_router.healthy = [False]
+    assert await _Probe(db_session).read_bind() is not replica
+
+
+async def test_write_pins_session_to_primary_until_commit(db_session, replica, test_regular_user):
+    """Тест: после записи чтения идут в primary, после коммита снова на реплику"""
+    probe = _Probe(db_session)
+    await db_session.commit()
+    assert await probe.read_bind() is replica
+
+    user = await db_session.get(UserORM, test_regular_user.id)
+    user.full_name = 'Changed'
+    await db_session.flush()
+    assert await probe.read_bind() is not replica
+
+    await db_session.commit()
+    assert await probe.read_bind() is replica
+
+
+async def test_rollback_resets_write_mark(db_session, replica):
+    """Тест: откат транзакции снимает привязку к primary"""
+    probe = _Probe(db_session)
+    await db_session.execute(update(UserORM).values(is_active=True))
+    assert await probe.read_bind() is not replica
+
+    await db_session.rollback()
+    assert await probe.read_bind() is replica
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from decimal import Decimal
+
+from pydantic import BaseModel
+from starlette.requests import Request
+
+from app.core.response_cache import CacheEntry, ResponseCache
+from app.utils.ttl_cache import TTLCache
+
+
+def _cache() -> ResponseCache:
+    return ResponseCache(lock_ttl=1, lock_poll_interval=0.01, local=TTLCache(max_size=10, ttl=60))
+
+
+def _computer(calls: list, delay: float = 0.05):
+    async def compute() -> CacheEntry:
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return CacheEntry(fresh_until=0, payload=f'v{len(calls)}'.encode())
+    return compute
+
+
+async def test_single_flight(in_memory_backend):
+    """Тест: одновременные промахи по ключу считают ответ один раз"""
+    cache, calls = _cache(), []
+    results = await asyncio.gather(*(cache.get_or_compute('rc:single-flight', _computer(calls), expire=60) for _ in range(10)))
+
+    assert len(calls) == 1
+    assert {entry.payload for entry, _, _ in results} == {b'v1'}
+    assert sorted(status for _, status, _ in results) == ['HIT'] * 9 + ['MISS']
+
+
+async def test_stale_while_revalidate(in_memory_backend):
+    """Тест: пока лидер пересчитывает устаревшую запись, остальные получают прежнее значение"""
+    cache, calls = _cache(), []
+    await cache._write('rc:swr', CacheEntry(fresh_until=time.time() - 1, payload=b'old'), expire=60, stale=60)
+
+    leader = asyncio.create_task(cache.get_or_compute('rc:swr', _computer(calls), expire=60, stale=60))
+    await asyncio.sleep(0)
+    entry, status, _ = await cache.get_or_compute('rc:swr', _computer(calls), expire=60, stale=60)
+    assert (entry.payload, status) == (b'old', 'STALE')
+
+    entry, status, _ = await leader
+    assert (entry.payload, status) == (b'v1', 'MISS')
+    assert len(calls) == 1
+
+
+async def test_follower_computes_when_leader_cancelled(in_memory_backend):
+    """Тест: отмена лидера не отменяет ждущие его запросы - они считают ответ сами"""
+    cache, calls = _cache(), []
+    leader = asyncio.create_task(cache.get_or_compute('rc:cancel', _computer(calls, delay=1), expire=60))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(cache.get_or_compute('rc:cancel', _computer(calls), expire=60))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    entry, status, _ = await follower
+
+    assert leader.cancelled()
+    assert (entry.payload, status) == (b'v2', 'MISS')
+
+
+async def test_release_keeps_foreign_lock(init_redis):
+    """Тест: снимается только свой лок - лок, перехваченный после истечения TTL, остаётся"""
+    cache = _cache()
+    token = await cache._acquire_lock('lock-test')
+    assert token
+    assert await cache._acquire_lock('lock-test') is None
+
+    await init_redis.set('lock:lock-test', 'other-owner')
+    await cache._release_lock('lock-test', token)
+    assert await init_redis.get('lock:lock-test') == b'other-owner'
+    await init_redis.delete('lock:lock-test')
+
+
+async def test_cached_endpoint_serves_encoded_bytes(in_memory_backend):
+    """Тест: эндпоинт с cached отдаёт одинаковое JSON-тело на промахе и на попадании"""
+    class Item(BaseModel):
+        id: int
+        price: Decimal
+
+    calls = []
+
+    async def key_builder(request, kwargs):
+        return f'rc:coder:{kwargs["item_id"]}'
+
+    @_cache().cached(key_builder=key_builder, expire=60)
+    async def endpoint(item_id: int):
+        calls.append(item_id)
+        return Item(id=item_id, price=Decimal('10.50'))
+
+    request = Request({'type': 'http', 'headers': []})
+    miss = await endpoint(item_id=7, _cache_request=request)
+    hit = await endpoint(item_id=7, _cache_request=request)
+
+    assert calls == [7]
+    assert miss.headers['X-FastAPI-Cache'] == 'MISS'
+    assert hit.headers['X-FastAPI-Cache'] == 'HIT'
+    assert hit.body == miss.body
+    assert Item.model_validate_json(hit.body) == Item(id=7, price=Decimal('10.50'))
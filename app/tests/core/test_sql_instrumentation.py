@@ -0,0 +1,78 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from loguru import logger
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from app.core import sql_instrumentation
+from app.core.config import config
+from app.core.sql_instrumentation import RequestSQLStats, SQLInstrumentationMiddleware
+
+
+LISTENERS = (
+    ('before_cursor_execute', sql_instrumentation._before_cursor_execute),
+    ('after_cursor_execute', sql_instrumentation._after_cursor_execute),
+)
+
+
+@pytest.fixture
+def listeners():
+    """Слушатели могли подключиться при импорте приложения (setup_sql_instrumentation) - добавляем недостающие"""
+    added = [(name, listener) for name, listener in LISTENERS if not event.contains(Engine, name, listener)]
+    for name, listener in added:
+        event.listen(Engine, name, listener)
+    yield
+    for name, listener in added:
+        event.remove(Engine, name, listener)
+
+
+@pytest.fixture
+def instrumented(listeners):
+    stats = RequestSQLStats()
+    token = sql_instrumentation._request_stats.set(stats)
+    yield stats
+    sql_instrumentation._request_stats.reset(token)
+
+
+async def test_failed_statement_is_not_recorded(db_session, instrumented):
+    """Тест: упавший стейтмент не оставляет состояния на соединении, следующие считаются как обычно"""
+    await db_session.execute(text('SELECT 101'))
+    with pytest.raises(OperationalError):
+        await db_session.execute(text('SELECT * FROM missing_table'))
+    await db_session.rollback()
+    await db_session.execute(text('SELECT 102'))
+
+    assert instrumented.statements['SELECT 101'] == 1
+    assert instrumented.statements['SELECT 102'] == 1
+    assert 'SELECT * FROM missing_table' not in instrumented.statements
+    connection = await db_session.connection()
+    assert 'query_started_at' not in connection.info
+
+
+async def test_repeated_statement_reported_as_n_plus_one(async_sessionmaker, listeners, monkeypatch):
+    """Тест: стейтмент, выполненный больше SQL_N_PLUS_ONE_THRESHOLD раз за запрос, попадает в лог как N+1"""
+    monkeypatch.setattr(config, 'SQL_N_PLUS_ONE_THRESHOLD', 3)
+    app = FastAPI()
+    app.add_middleware(SQLInstrumentationMiddleware)
+
+    @app.get('/items')
+    async def items():
+        async with async_sessionmaker() as session:
+            for _ in range(4):
+                await session.execute(text('SELECT 201'))
+            for _ in range(3):
+                await session.execute(text('SELECT 202'))
+        return {}
+
+    messages = []
+    sink_id = logger.add(messages.append, level='WARNING', format='{message}')
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url='http://testserver') as client:
+            response = await client.get('/items')
+    finally:
+        logger.remove(sink_id)
+
+    assert response.headers['server-timing'].endswith('desc="7 queries"')
+    assert messages == ['Possible N+1 in GET /items: statement ran 4 times: SELECT 201\n']
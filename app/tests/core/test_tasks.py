@@ -0,0 +1,80 @@
+import asyncio
+import secrets
+
+from redis.asyncio import Redis
+
+from app.core.tasks import PeriodicTasks
+
+
+async def test_restart_does_not_duplicate_jobs():
+    """Тест: после stop повторный вход в lifespan регистрирует и запускает задачи один раз"""
+    tasks = PeriodicTasks()
+    runs = []
+
+    async def job():
+        runs.append(1)
+
+    for _ in range(2):
+        tasks.register('job', 60, job)
+        tasks.start()
+        await asyncio.sleep(0)
+        await tasks.stop()
+
+    assert len(runs) == 2
+    assert tasks._jobs == []
+    assert tasks._tasks == []
+
+
+async def test_initial_delay_postpones_first_run():
+    """Тест: задача с initial_delay не выполняется сразу при старте"""
+    tasks = PeriodicTasks()
+    runs = []
+
+    async def job():
+        runs.append(1)
+
+    tasks.register('delayed', 60, job, initial_delay=60)
+    tasks.start()
+    await asyncio.sleep(0.01)
+    await tasks.stop()
+
+    assert runs == []
+
+
+async def test_exclusive_job_runs_in_one_worker(init_redis):
+    """Тест: из нескольких воркеров эксклюзивную задачу в интервале выполняет один"""
+    prefix = f'periodic-test-{secrets.token_hex(4)}'
+    workers = [PeriodicTasks(prefix=prefix) for _ in range(3)]
+    runs = []
+
+    async def job():
+        runs.append(1)
+
+    for worker in workers:
+        worker.init(init_redis)
+        worker.register('reconcile', 60, job, exclusive=True)
+        worker.start()
+    await asyncio.sleep(0.1)
+    for worker in workers:
+        await worker.stop()
+
+    assert runs == [1]
+
+
+async def test_exclusive_job_runs_when_redis_is_down():
+    """Тест: если Redis недоступен, задача выполняется без лока"""
+    redis = Redis.from_url('redis://127.0.0.1:1', socket_connect_timeout=0.1)
+    tasks = PeriodicTasks()
+    runs = []
+
+    async def job():
+        runs.append(1)
+
+    tasks.init(redis)
+    tasks.register('reconcile', 60, job, exclusive=True)
+    tasks.start()
+    await asyncio.sleep(0.3)
+    await tasks.stop()
+    await redis.close()
+
+    assert runs == [1]
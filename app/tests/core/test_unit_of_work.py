@@ -0,0 +1,94 @@
+import pytest
+from sqlalchemy import select, update
+
+from app.core.database import after_commit, unit_of_work
+from app.models.user import UserORM
+
+
+def _new_user(username: str) -> UserORM:
+    return UserORM(
+        email=f'{username}@example.com',
+        username=username,
+        full_name='Unit Of Work',
+        hashed_password='hash',
+    )
+
+
+async def _usernames(async_sessionmaker) -> set[str]:
+    async with async_sessionmaker() as session:
+        return set((await session.scalars(select(UserORM.username))).all())
+
+
+async def test_write_is_committed_and_callbacks_run(async_sessionmaker):
+    """Тест: запись коммитится в конце, после коммита выполняются отложенные действия"""
+    calls = []
+
+    async def callback():
+        calls.append(await _usernames(async_sessionmaker))
+
+    async with unit_of_work(async_sessionmaker) as session:
+        session.add(_new_user('uow_commit'))
+        await session.flush()
+        after_commit(session, callback)
+        assert calls == []
+
+    assert calls == [{'uow_commit'}]
+
+
+async def test_bulk_dml_counts_as_write(async_sessionmaker, test_regular_user):
+    """Тест: UPDATE без объектов в сессии тоже приводит к коммиту"""
+    async with unit_of_work(async_sessionmaker) as session:
+        await session.execute(update(UserORM).values(full_name='Bulk Updated'))
+
+    async with async_sessionmaker() as session:
+        assert await session.scalar(select(UserORM.full_name)) == 'Bulk Updated'
+
+
+async def test_exception_rolls_back_and_skips_callbacks(async_sessionmaker):
+    """Тест: исключение откатывает транзакцию, отложенные действия не выполняются"""
+    calls = []
+
+    async def callback():
+        calls.append(True)
+
+    with pytest.raises(RuntimeError):
+        async with unit_of_work(async_sessionmaker) as session:
+            session.add(_new_user('uow_rollback'))
+            await session.flush()
+            after_commit(session, callback)
+            raise RuntimeError('boom')
+
+    assert calls == []
+    assert await _usernames(async_sessionmaker) == set()
+
+
+async def test_read_only_request_does_not_commit(async_sessionmaker):
+    """Тест: без записей коммита нет и отложенные действия не выполняются"""
+    calls = []
+
+    async def callback():
+        calls.append(True)
+
+    async with unit_of_work(async_sessionmaker) as session:
+        await session.scalars(select(UserORM))
+        after_commit(session, callback)
+
+    assert calls == []
+
+
+async def test_failing_callback_does_not_stop_others(async_sessionmaker):
+    """Тест: упавшее отложенное действие логируется, остальные выполняются"""
+    calls = []
+
+    async def failing():
+        raise RuntimeError('boom')
+
+    async def callback():
+        calls.append(True)
+
+    async with unit_of_work(async_sessionmaker) as session:
+        session.add(_new_user('uow_callbacks'))
+        after_commit(session, failing)
+        after_commit(session, callback)
+
+    assert calls == [True]
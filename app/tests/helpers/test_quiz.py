@@ -0,0 +1,40 @@
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import config
+from app.helpers.quiz import QuizDefinitionError, compile_quiz
+from app.schemas.quiz import QuizAttemptCreate
+
+
+def test_regex_quiz_checks_whole_answer():
+    """Тест: ответ должен целиком подходить под шаблон, регистр и лишние пробелы не важны"""
+    checker = compile_quiz({'type': 'regex', 'pattern': r'4([.,]0+)?'})
+
+    assert checker.check(' 4,00 ')
+    assert not checker.check('44')
+    assert not checker.check(['4'])
+
+
+@pytest.mark.parametrize('pattern', [r'(a+)+$', r'(a*)*b', r'(\w+\s?)+', r'((ab)*c)+', r'(?:x{2,})*'])
+def test_nested_quantifiers_rejected(pattern):
+    """Тест: шаблоны с вложенными квантификаторами (экспоненциальный перебор) не сохраняются"""
+    with pytest.raises(QuizDefinitionError, match='nested quantifiers'):
+        compile_quiz({'type': 'regex', 'pattern': pattern})
+
+
+def test_long_pattern_rejected():
+    """Тест: длина шаблона ограничена QUIZ_PATTERN_MAX_LENGTH"""
+    with pytest.raises(QuizDefinitionError, match='at most'):
+        compile_quiz({'type': 'regex', 'pattern': 'a' * (config.QUIZ_PATTERN_MAX_LENGTH + 1)})
+
+
+def test_answer_length_limited():
+    """Тест: длинный ответ и длинный список ответов отклоняются до проверки"""
+    QuizAttemptCreate(answer='a' * config.QUIZ_ANSWER_MAX_LENGTH)
+    with pytest.raises(ValidationError):
+        QuizAttemptCreate(answer='a' * (config.QUIZ_ANSWER_MAX_LENGTH + 1))
+    with pytest.raises(ValidationError):
+        QuizAttemptCreate(answer=['a' * (config.QUIZ_ANSWER_MAX_LENGTH + 1)])
+    with pytest.raises(ValidationError):
+        QuizAttemptCreate(answer=['a'] * (config.QUIZ_ANSWER_MAX_ITEMS + 1))
+    assert QuizAttemptCreate(answer=[1, 'b', True]).answer == [1, 'b', True]
@@ -0,0 +1,144 @@
+"""
+    EXPLAIN-регрессии для запросов репозиториев.
+    Запускаются только на Postgres: TEST_POSTGRES_URL=postgresql+asyncpg://... pytest app/tests/query_plans
+    База заполняется данными, каждый SELECT/UPDATE/DELETE, который выполняет метод репозитория,
+    прогоняется через EXPLAIN с enable_seqscan=off: Seq Scan в плане значит, что подходящего индекса нет.
+"""
+import os
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.helpers.course_sort import CourseSort
+from app.repositories.comment import CommentRepository
+from app.repositories.course import CourseRepository
+from app.repositories.lesson import LessonRepository
+from app.repositories.lesson_completion import LessonCompletionRepository
+from app.repositories.progress import ProgressRepository
+from app.repositories.purchase import PurchaseRepository
+from app.repositories.step import StepRepository
+from app.repositories.user import UserRepository
+
+TEST_POSTGRES_URL = os.getenv('TEST_POSTGRES_URL')
+
+pytestmark = pytest.mark.skipif(not TEST_POSTGRES_URL, reason='TEST_POSTGRES_URL is not set')
+
+LARGE_TABLES = {
+    'users', 'courses', 'lessons', 'steps', 'comments', 'reactions',
+    'purchases', 'user_lesson_completions', 'user_course_progress',
+}
+
+SEED = [
+    """INSERT INTO users (email, username, hashed_password, full_name, role, is_active)
+       SELECT 'user' || i || '@example.com', 'user' || i, 'hash', 'User ' || i, 'USER', true
+       FROM generate_series(1, 5000) AS i""",
+    """INSERT INTO courses (title, description, price, is_published, author_id)
+       SELECT 'Course ' || i, 'Description', (i % 100) * 10, i % 5 <> 0, i % 5000 + 1
+       FROM generate_series(1, 20000) AS i""",
+    """INSERT INTO lessons (title, order_number, course_id, is_free)
+       SELECT 'Lesson ' || i, i / 20000 + 1, i % 20000 + 1, false
+       FROM generate_series(0, 59999) AS i""",
+    """INSERT INTO steps (lesson_id, title, step_type, content, order_number)
+       SELECT i % 60000 + 1, 'Step ' || i, 'text', 'content', i / 60000 + 1
+       FROM generate_series(0, 179999) AS i""",
+    """INSERT INTO comments (step_id, user_id, course_id, content, is_deleted, is_edited)
+       SELECT i % 180000 + 1, i % 5000 + 1, (i % 180000) % 60000 % 20000 + 1, 'comment', false, false
+       FROM generate_series(0, 199999) AS i""",
+    """INSERT INTO reactions (comment_id, user_id, is_like)
+       SELECT i % 200000 + 1, i / 200000 + 1, i % 3 <> 0
+       FROM generate_series(0, 399999) AS i""",
+    """INSERT INTO purchases (payment_id, status, user_id, course_id, price_paid)
+       SELECT 'pay-' || i, CASE WHEN i % 4 = 0 THEN 'PENDING' ELSE 'SUCCEEDED' END, i % 5000 + 1, i / 5000 + 1, 100
+       FROM generate_series(0, 49999) AS i""",
+    """INSERT INTO user_lesson_completions (user_id, lesson_id, course_id)
+       SELECT i % 5000 + 1, i / 5000 * 20000 + i % 5000 + 1, i % 5000 + 1
+       FROM generate_series(0, 14999) AS i""",
+    """INSERT INTO user_course_progress (user_id, course_id, progress_percentage, is_completed)
+       SELECT i % 5000 + 1, i / 5000 + 1, 50, false
+       FROM generate_series(0, 49999) AS i""",
+]
+
+CASES = [
+    ('course.get_my_courses', CourseRepository, lambda r: r.get_my_courses(1)),
+    ('course.count_catalog_courses', CourseRepository, lambda r: r.count_catalog_courses(100, 500)),
+    ('course.catalog_by_id', CourseRepository, lambda r: r.get_catalog_page(21, after=(None, 10000))),
+    ('course.catalog_by_price', CourseRepository, lambda r: r.get_catalog_page(21, sort=CourseSort.PRICE, after=(Decimal('500'), 10000))),
+    ('lesson.get_all_lessons', LessonRepository, lambda r: r.get_all_lessons(1)),
+    ('lesson.get_lesson_with_course', LessonRepository, lambda r: r.get_lesson_with_course(1)),
+    ('step.get_step_with_details', StepRepository, lambda r: r.get_step_with_details(1)),
+    ('step.get_all_steps', StepRepository, lambda r: r.get_all_steps(1)),
+    ('step.get_count_by_lesson', StepRepository, lambda r: r.get_count_by_lesson(1)),
+    ('comment.get_comments_for_step', CommentRepository, lambda r: r.get_comments_for_step(1, 1)),
+    ('comment.get_all_course_comments', CommentRepository, lambda r: r.get_all_course_comments(1, 1)),
+    ('purchase.get_payment_by_id', PurchaseRepository, lambda r: r.get_payment_by_id('pay-1')),
+    ('purchase.get_purchased_courses', PurchaseRepository, lambda r: r.get_purchased_courses(1)),
+    ('purchase.check_purchased_confirmed', PurchaseRepository, lambda r: r.check_purchased_confirmed(1, 1)),
+    ('purchase.get_purchase_by_user_and_course', PurchaseRepository, lambda r: r.get_purchase_by_user_and_course(1, 1)),
+    ('completion.get_completed_lesson_ids', LessonCompletionRepository, lambda r: r.get_completed_lesson_ids(1, 1)),
+    ('completion.check_exists', LessonCompletionRepository, lambda r: r.check_exists(1, 1)),
+    ('progress.get_progress_for_course', ProgressRepository, lambda r: r.get_progress_for_course(1, 1)),
+    ('progress.get_all_progress_for_courses', ProgressRepository, lambda r: r.get_all_progress_for_courses(1)),
+    ('user.get_by_username', UserRepository, lambda r: r.get_by_username('user1')),
+    ('user.get_by_email', UserRepository, lambda r: r.get_by_email('user1@example.com')),
+]
+
+
+@pytest_asyncio.fixture(scope="module")
+async def pg_engine():
+    engine = create_async_engine(TEST_POSTGRES_URL, echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        for statement in SEED:
+            await conn.execute(text(statement))
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level='AUTOCOMMIT')
+        await conn.execute(text('ANALYZE'))
+    try:
+        yield engine
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get('Node Type') == 'Seq Scan' and plan.get('Relation Name') in LARGE_TABLES:
+        found.append(plan['Relation Name'])
+    for child in plan.get('Plans', []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('name,repository_class,call', CASES, ids=[case[0] for case in CASES])
+async def test_repository_query_uses_indexes(pg_engine, name, repository_class, call):
+    """Тест проверяет, что запросы метода репозитория не читают большие таблицы целиком"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(('INSERT', 'EXPLAIN', 'SET')):
+            statements.append((statement, parameters))
+
+    event.listen(pg_engine.sync_engine, 'before_cursor_execute', capture)
+    try:
+        async with async_sessionmaker(pg_engine, class_=AsyncSession, expire_on_commit=False)() as session:
+            await call(repository_class(session))
+            await session.rollback()
+    finally:
+        event.remove(pg_engine.sync_engine, 'before_cursor_execute', capture)
+
+    assert statements, f'{name} did not run any queries'
+
+    async with pg_engine.connect() as conn:
+        await conn.exec_driver_sql('SET enable_seqscan = off')
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters)
+            plan = result.scalar_one()[0]['Plan']
+            assert not _seq_scans(plan), f'{name}: Seq Scan on {_seq_scans(plan)}\n{statement}'
+        await conn.rollback()
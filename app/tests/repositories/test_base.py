@@ -0,0 +1,85 @@
+import pytest
+
+from app.repositories.lesson import LessonRepository
+
+
+def _lessons(course_id: int, count: int) -> list[dict]:
+    return [{'course_id': course_id, 'title': f'Урок номер {i}', 'order_number': i} for i in range(1, count + 1)]
+
+
+async def test_create_many_in_batches(db_session, test_course):
+    """Тест: create_many вставляет все строки пачками и возвращает созданные объекты"""
+    repo = LessonRepository(session=db_session)
+    lessons = await repo.create_many(_lessons(test_course.id, 5), batch_size=2)
+
+    assert [lesson.order_number for lesson in lessons] == [1, 2, 3, 4, 5]
+    assert all(lesson.id for lesson in lessons)
+
+
+async def test_update_many_by_primary_key(db_session, test_course):
+    """Тест: update_many обновляет строки по id"""
+    repo = LessonRepository(session=db_session)
+    lessons = await repo.create_many(_lessons(test_course.id, 3))
+
+    await repo.update_many([{'id': lesson.id, 'title': f'Новое имя {lesson.id}'} for lesson in lessons], batch_size=2)
+
+    for lesson in lessons:
+        await db_session.refresh(lesson)
+        assert lesson.title == f'Новое имя {lesson.id}'
+
+
+async def test_upsert_many_updates_conflicts(db_session, test_course):
+    """Тест: upsert_many обновляет конфликтующие строки и вставляет новые"""
+    repo = LessonRepository(session=db_session)
+    lessons = await repo.create_many(_lessons(test_course.id, 2))
+
+    rows = [
+        {**row, 'id': lesson.id, 'title': f'Обновлённый {lesson.id}'}
+        for row, lesson in zip(_lessons(test_course.id, 2), lessons)
+    ]
+    rows.append({'id': lessons[-1].id + 100, 'course_id': test_course.id, 'title': 'Новый', 'order_number': 3})
+    upserted = await repo.upsert_many(rows, update_columns=['title'])
+
+    assert sorted(lesson.title for lesson in upserted) == sorted(row['title'] for row in rows)
+    assert await repo.get_ordered_ids(test_course.id) == [row['id'] for row in rows]
+
+
+async def test_upsert_many_do_nothing_omits_conflicts(db_session, test_course):
+    """Тест: без update_columns конфликтующие строки не возвращаются"""
+    repo = LessonRepository(session=db_session)
+    lessons = await repo.create_many(_lessons(test_course.id, 2))
+
+    rows = [{**row, 'id': lesson.id} for row, lesson in zip(_lessons(test_course.id, 2), lessons)]
+    rows.append({'id': lessons[-1].id + 100, 'course_id': test_course.id, 'title': 'Новый урок', 'order_number': 3})
+    upserted = await repo.upsert_many(rows, update_columns=[])
+
+    assert [lesson.order_number for lesson in upserted] == [3]
+
+
+async def test_upsert_many_rejects_deferrable_arbiter(db_session, test_course):
+    """Тест: отложенная уникальность порядка не может быть арбитром ON CONFLICT"""
+    repo = LessonRepository(session=db_session)
+
+    with pytest.raises(ValueError, match='uq_course_lesson_order'):
+        await repo.upsert_many(_lessons(test_course.id, 2), index_elements=['order_number', 'course_id'])
+
+
+async def test_upsert_many_rejects_mixed_keys(db_session, test_course):
+    """Тест: строки с разным набором ключей не уходят в один VALUES"""
+    repo = LessonRepository(session=db_session)
+    rows = _lessons(test_course.id, 2)
+    rows[1]['duration_minutes'] = 10
+
+    with pytest.raises(ValueError):
+        await repo.upsert_many(rows)
+
+
+async def test_delete_many_returns_count(db_session, test_course):
+    """Тест: delete_many удаляет пачками и возвращает число удалённых строк"""
+    repo = LessonRepository(session=db_session)
+    lessons = await repo.create_many(_lessons(test_course.id, 5))
+
+    deleted = await repo.delete_many([lesson.id for lesson in lessons[:3]] + [10 ** 6], batch_size=2)
+
+    assert deleted == 3
+    assert await repo.get_ordered_ids(test_course.id) == [lesson.id for lesson in lessons[3:]]
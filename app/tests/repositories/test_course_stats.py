@@ -0,0 +1,56 @@
+from app.models.comment import CommentORM
+from app.models.lesson import LessonORM
+from app.models.step import StepORM
+from app.repositories.course_stats import CourseStatsRepository
+
+
+async def _lesson_with_comments(db_session, course, user) -> tuple[LessonORM, StepORM]:
+    lesson = LessonORM(title='Урок со статистикой', order_number=1, course_id=course.id)
+    db_session.add(lesson)
+    await db_session.flush()
+    step = StepORM(title='Шаг', lesson_id=lesson.id, order_number=1)
+    db_session.add(step)
+    await db_session.flush()
+    for is_deleted in (False, False, True):
+        db_session.add(CommentORM(
+            step_id=step.id, user_id=user.id, course_id=course.id, content='Комментарий', is_deleted=is_deleted,
+        ))
+    await db_session.flush()
+    return lesson, step
+
+
+async def test_remove_step_subtracts_comments(db_session, test_course, test_author):
+    """Тест: удаление шага вычитает шаг и его неудалённые комментарии"""
+    repo = CourseStatsRepository(session=db_session)
+    stats = await repo.create({'course_id': test_course.id, 'lessons_count': 1, 'steps_count': 1, 'comments_count': 2})
+    _, step = await _lesson_with_comments(db_session, test_course, test_author)
+
+    await repo.remove_step(test_course.id, step.id)
+
+    await db_session.refresh(stats)
+    assert (stats.steps_count, stats.comments_count) == (0, 0)
+
+
+async def test_remove_lesson_subtracts_comments(db_session, test_course, test_author):
+    """Тест: удаление урока вычитает урок, его шаги и их неудалённые комментарии"""
+    repo = CourseStatsRepository(session=db_session)
+    stats = await repo.create({'course_id': test_course.id, 'lessons_count': 1, 'steps_count': 1, 'comments_count': 2})
+    lesson, _ = await _lesson_with_comments(db_session, test_course, test_author)
+
+    await repo.remove_lesson(lesson)
+
+    await db_session.refresh(stats)
+    assert (stats.lessons_count, stats.steps_count, stats.comments_count) == (0, 0, 0)
+
+
+async def test_reconcile_limited_to_courses(db_session, test_course, test_course_published):
+    """Тест: reconcile с course_ids пересчитывает только эти курсы"""
+    repo = CourseStatsRepository(session=db_session)
+    drifted = await repo.create({'course_id': test_course.id, 'lessons_count': 7})
+    untouched = await repo.create({'course_id': test_course_published.id, 'lessons_count': 7})
+
+    await repo.reconcile([test_course.id])
+
+    await db_session.refresh(drifted)
+    await db_session.refresh(untouched)
+    assert (drifted.lessons_count, untouched.lessons_count) == (0, 7)
@@ -0,0 +1,42 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.schema import CreateTable
+
+from app.models.lesson import LessonORM
+from app.repositories.lesson import LessonRepository
+from app.repositories.step import StepRepository
+
+
+async def test_rebalance_crowded_returns_containers(db_session, test_course):
+    """Тест: перенумеровываются только контейнеры без зазоров, метод возвращает их id"""
+    lesson_repo = LessonRepository(session=db_session)
+    crowded, spaced = await lesson_repo.create_many([
+        {'course_id': test_course.id, 'title': 'Урок с тесными шагами', 'order_number': 1024},
+        {'course_id': test_course.id, 'title': 'Урок с зазорами', 'order_number': 2048},
+    ])
+    await StepRepository(session=db_session).insert_many([
+        {'lesson_id': crowded.id, 'title': 'Шаг', 'order_number': 1},
+        {'lesson_id': crowded.id, 'title': 'Шаг', 'order_number': 2},
+        {'lesson_id': spaced.id, 'title': 'Шаг', 'order_number': 1024},
+        {'lesson_id': spaced.id, 'title': 'Шаг', 'order_number': 2048},
+    ])
+
+    step_repo = StepRepository(session=db_session)
+    assert await lesson_repo.rebalance_crowded() == set()
+    assert await step_repo.rebalance_crowded() == {crowded.id}
+    assert await lesson_repo.get_course_ids([crowded.id]) == {test_course.id}
+
+    steps = await step_repo.get_all_steps(crowded.id)
+    assert [step.order_number for step in steps] == [1024, 2048]
+
+
+def test_order_constraint_deferrable_only_in_postgres():
+    """Тест: одно ограничение порядка, DEFERRABLE попадает в DDL только для Postgres"""
+    table = LessonORM.__table__
+    constraints = [constraint for constraint in table.constraints if constraint.name == 'uq_course_lesson_order']
+    assert len(constraints) == 1
+
+    postgres_ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+    sqlite_ddl = str(CreateTable(table).compile(dialect=sqlite.dialect()))
+    assert 'CONSTRAINT uq_course_lesson_order UNIQUE (course_id, order_number) DEFERRABLE INITIALLY IMMEDIATE' in postgres_ddl
+    assert 'CONSTRAINT uq_course_lesson_order UNIQUE (course_id, order_number)' in sqlite_ddl
+    assert 'DEFERRABLE' not in sqlite_ddl
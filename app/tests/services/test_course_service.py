@@ -0,0 +1,26 @@
+from app.repositories.course import CourseRepository
+from app.repositories.course_stats import CourseStatsRepository
+from app.repositories.lesson import LessonRepository
+from app.repositories.step import StepRepository
+from app.services.course import CourseService
+
+
+async def test_clone_course_counts_its_own_rows(db_session, test_course, test_author):
+    """Тест: статистика копии считается по её строкам, даже если у исходного курса статистики нет"""
+    lessons = await LessonRepository(session=db_session).create_many([
+        {'course_id': test_course.id, 'title': 'Первый урок', 'order_number': 1, 'duration_minutes': 10},
+        {'course_id': test_course.id, 'title': 'Второй урок', 'order_number': 2, 'duration_minutes': 15},
+    ])
+    await StepRepository(session=db_session).insert_many([
+        {'lesson_id': lessons[0].id, 'title': 'Шаг', 'order_number': order} for order in (1, 2, 3)
+    ])
+    service = CourseService(
+        course_repo=CourseRepository(session=db_session),
+        stats_repo=CourseStatsRepository(session=db_session),
+    )
+
+    cloned = await service.clone_course(test_author, test_course.id)
+
+    assert cloned.id != test_course.id
+    assert (cloned.stats.lessons_count, cloned.stats.steps_count, cloned.stats.total_minutes) == (2, 3, 25)
+    assert (cloned.stats.students_count, cloned.stats.comments_count) == (0, 0)
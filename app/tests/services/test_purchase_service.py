@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+from app.helpers.purchase_status import PurchaseStatus
+from app.models.purchace import PurchaseORM
+from app.repositories.course import CourseRepository
+from app.repositories.course_stats import CourseStatsRepository
+from app.repositories.purchase import PurchaseRepository
+from app.services.purchase import PurchaseService
+
+
+async def test_duplicate_webhooks_count_student_once(db_session, test_course, test_regular_user):
+    """Тест: повторные уведомления об оплате и отмене сдвигают students_count один раз"""
+    stats_repo = CourseStatsRepository(session=db_session)
+    stats = await stats_repo.create_for_course(test_course.id)
+    purchase = PurchaseORM(
+        user_id=test_regular_user.id,
+        course_id=test_course.id,
+        price_paid=Decimal('2500.00'),
+        payment_id='payment-1',
+        status=PurchaseStatus.PENDING,
+    )
+    db_session.add(purchase)
+    await db_session.flush()
+    service = PurchaseService(
+        purchase_repo=PurchaseRepository(session=db_session),
+        course_repo=CourseRepository(session=db_session),
+        stats_repo=stats_repo,
+        shop_id='', secret_key='',
+    )
+
+    await service.handle_webhook('payment-1', PurchaseStatus.SUCCEEDED)
+    await service.handle_webhook('payment-1', PurchaseStatus.SUCCEEDED)
+    await db_session.refresh(stats)
+    assert stats.students_count == 1
+
+    await service.handle_webhook('payment-1', PurchaseStatus.CANCELED)
+    await service.handle_webhook('payment-1', PurchaseStatus.CANCELED)
+    await db_session.refresh(stats)
+    await db_session.refresh(purchase)
+    assert stats.students_count == 0
+    assert purchase.status == PurchaseStatus.CANCELED
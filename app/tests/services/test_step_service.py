@@ -0,0 +1,45 @@
+import pytest
+
+from app.core.exceptions import ForbiddenException
+from app.models.lesson import LessonORM
+from app.repositories.course_stats import CourseStatsRepository
+from app.repositories.purchase import PurchaseRepository
+from app.repositories.step import StepRepository
+from app.services.step import StepService
+
+
+@pytest.fixture
+def step_service(db_session) -> StepService:
+    return StepService(
+        step_repo=StepRepository(session=db_session),
+        purchase_repo=PurchaseRepository(session=db_session),
+        stats_repo=CourseStatsRepository(session=db_session),
+    )
+
+
+async def _lesson(db_session, course) -> LessonORM:
+    lesson = LessonORM(title='Урок для доступа', order_number=1, course_id=course.id)
+    db_session.add(lesson)
+    await db_session.flush()
+    await db_session.refresh(lesson, ['course'])
+    return lesson
+
+
+async def test_authorize_read_for_author(db_session, step_service, test_course, test_author):
+    """Тест: автор курса читает шаги с ответами квизов"""
+    lesson = await _lesson(db_session, test_course)
+    assert await step_service.authorize_read(lesson, test_author) is None
+
+
+async def test_authorize_read_for_admin(db_session, step_service, test_course, test_admin):
+    """Тест: админ читает шаги любого курса с ответами квизов"""
+    lesson = await _lesson(db_session, test_course)
+    assert await step_service.authorize_read(lesson, test_admin) is None
+
+
+async def test_authorize_read_without_purchase(db_session, step_service, test_course, test_regular_user):
+    """Тест: без оплаты курса шаги закрыты"""
+    lesson = await _lesson(db_session, test_course)
+    with pytest.raises(ForbiddenException):
+        await step_service.authorize_read(lesson, test_regular_user)
+
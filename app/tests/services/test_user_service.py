@@ -0,0 +1,23 @@
+from app.helpers.user_role import UserRoleEnum
+from app.repositories.user import UserRepository
+from app.schemas.user import UserUpdate
+from app.services.user import UserService
+
+
+async def test_update_profile_keeps_current_role(db_session, test_regular_user):
+    """Тест: обновление профиля по устаревшему снимку пользователя не возвращает старую роль"""
+    service = UserService(repository=UserRepository(session=db_session))
+    snapshot = service.repository.model(
+        id=test_regular_user.id,
+        email=test_regular_user.email,
+        username=test_regular_user.username,
+        full_name=test_regular_user.full_name,
+        role=UserRoleEnum.USER,
+        is_active=True,
+    )
+    await service.repository.update(object_id=test_regular_user.id, data={'role': UserRoleEnum.AUTHOR})
+
+    result = await service.update_profile(snapshot, UserUpdate(full_name='Olzhas Updated Name'))
+
+    assert result.full_name == 'Olzhas Updated Name'
+    assert result.role == UserRoleEnum.AUTHOR
@@ -0,0 +1,38 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+from app.utils.cache_coder import ResponseBytesCoder
+
+
+class _Item(BaseModel):
+    id: int
+    title: str
+    price: Decimal
+    updated_at: datetime
+
+
+ITEM = _Item(id=1, title='Курс', price=Decimal('2500.00'), updated_at=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+
+
+def test_encode_matches_pydantic_json():
+    """Тест: в кэш кладётся то же тело, что отдала бы response_model"""
+    assert json.loads(ResponseBytesCoder.encode(ITEM)) == json.loads(ITEM.model_dump_json())
+    assert json.loads(ResponseBytesCoder.encode([ITEM, ITEM])) == [json.loads(ITEM.model_dump_json())] * 2
+    assert json.loads(ResponseBytesCoder.encode({'items': [ITEM], 'total': 1})) == {
+        'items': [json.loads(ITEM.model_dump_json())],
+        'total': 1,
+    }
+
+
+def test_round_trip():
+    """Тест: decode возвращает данные, decode_as_type - закодированные байты без изменений"""
+    payload = ResponseBytesCoder.encode(ITEM)
+
+    assert _Item.model_validate(ResponseBytesCoder.decode(payload)) == ITEM
+
+    response = ResponseBytesCoder.decode_as_type(payload, type_=_Item)
+    assert response.body == payload
+    assert response.media_type == 'application/json'
@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from app.utils.security import PasswordHashingExecutor, hash_password, verify_password
+
+
+@pytest.fixture
+def executor():
+    executor = PasswordHashingExecutor(max_workers=1, max_concurrency=1)
+    yield executor
+    executor.shutdown()
+
+
+async def test_hash_round_trip_in_process_pool(executor):
+    """Тест: хеш из пула процессов проверяется и в пуле, и синхронно"""
+    hashed = await executor.run(hash_password, 'secret-password')
+
+    assert await executor.run(verify_password, 'secret-password', hashed)
+    assert not await executor.run(verify_password, 'wrong-password', hashed)
+    assert verify_password('secret-password', hashed)
+
+
+async def test_concurrency_limit_queues_requests(executor):
+    """Тест: сверх max_concurrency задачи ждут в очереди, все выполняются"""
+    hashes = await asyncio.gather(*(executor.run(hash_password, f'password-{i}') for i in range(3)))
+
+    assert len(set(hashes)) == 3
+    stats = executor.stats()
+    assert stats['completed'] == 3
+    assert stats['in_flight'] == 0
+    assert stats['queue_depth'] == 0
+    assert stats['max_queue_depth'] >= 2
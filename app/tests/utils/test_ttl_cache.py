@@ -0,0 +1,36 @@
+from app.utils.ttl_cache import TTLCache
+
+
+def test_weigher_bounds_total_weight():
+    """Тест: при превышении max_weight вытесняются самые старые записи"""
+    cache = TTLCache(max_size=10, ttl=60, max_weight=10, weigher=len)
+    cache.set('a', b'1234')
+    cache.set('b', b'1234')
+    cache.get('a')
+    cache.set('c', b'1234')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1234' and cache.get('c') == b'1234'
+    assert cache.weight == 8
+
+
+def test_weigher_skips_oversized_value():
+    """Тест: значение тяжелее max_weight не кладётся и не вытесняет остальные"""
+    cache = TTLCache(max_size=10, ttl=60, max_weight=10, weigher=len)
+    cache.set('a', b'1234')
+    cache.set('big', b'x' * 11)
+
+    assert cache.get('big') is None
+    assert cache.get('a') == b'1234'
+    assert cache.weight == 4
+
+
+def test_weight_follows_replace_and_pop():
+    """Тест: перезапись и удаление ключа пересчитывают суммарный вес"""
+    cache = TTLCache(max_size=10, ttl=60, max_weight=10, weigher=len)
+    cache.set('a', b'1234')
+    cache.set('a', b'12')
+    assert cache.weight == 2
+
+    cache.pop('a')
+    assert cache.weight == 0 and len(cache) == 0
@@ -0,0 +1,25 @@
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi_cache import Coder
+from pydantic_core import from_json, to_json
+
+
+class ResponseBytesCoder(Coder):
+    """
+        Хранит в кэше готовое JSON-тело ответа, сериализованное один раз из pydantic-модели.
+        На попадании байты отдаются как есть: без pickle, ORM и повторной валидации response_model.
+        Эндпоинты с этим кодером должны возвращать pydantic-модели (или списки/словари из них), а не ORM-объекты.
+    """
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        return to_json(value)
+
+    @classmethod
+    def decode(cls, value: bytes) -> Any:
+        return from_json(value)
+
+    @classmethod
+    def decode_as_type(cls, value: bytes, *, type_: Optional[Any]) -> Response:
+        return Response(content=value, media_type='application/json')
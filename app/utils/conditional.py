@@ -0,0 +1,80 @@
+import functools
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from starlette import status
+
+
+@functools.cache
+def schema_version(model: type[BaseModel]) -> str:
+    """Версия схемы ответа: меняется вместе с JSON Schema модели, поэтому ETag не переживает смену формата"""
+    schema = json.dumps(model.model_json_schema(mode='serialization'), sort_keys=True)
+    return hashlib.md5(schema.encode()).hexdigest()[:8]
+
+
+@dataclass(frozen=True)
+class Validators:
+    """Валидаторы условного GET: строгий ETag и, для одиночных сущностей, Last-Modified"""
+    etag: str
+    last_modified: datetime | None = None
+
+    @classmethod
+    def build(
+            cls,
+            model: type[BaseModel],
+            rows: Iterable[tuple[Any, ...]],
+            last_modified: datetime | None = None,
+            variant: str = '',
+    ) -> 'Validators':
+        """
+            ETag из версии схемы и строк (id, updated_at, ...) всех сущностей, попавших в ответ.
+            variant различает представления одного ресурса, например разные наборы полей.
+        """
+        digest = hashlib.sha1(schema_version(model).encode())
+        digest.update(variant.encode())
+        for row in rows:
+            digest.update(repr(tuple(row)).encode())
+        return cls(etag=f'"{digest.hexdigest()}"', last_modified=last_modified)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {'ETag': self.etag}
+        if self.last_modified is not None:
+            headers['Last-Modified'] = format_datetime(_as_utc(self.last_modified), usegmt=True)
+        return headers
+
+    def is_not_modified(self, request: Request) -> bool:
+        """If-None-Match важнее If-Modified-Since (RFC 9110, 13.2.2)"""
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            if if_none_match.strip() == '*':
+                return True
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            return self.etag in tags
+
+        if_modified_since = request.headers.get('If-Modified-Since')
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # В заголовке секундная точность
+        return _as_utc(self.last_modified).replace(microsecond=0) <= since
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
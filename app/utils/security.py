@@ -1,4 +1,7 @@
+import asyncio
 import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import bcrypt
@@ -22,6 +25,81 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     pwd_hash = hashlib.sha256(plain_password.encode()).hexdigest()
     return bcrypt.checkpw(pwd_hash.encode(), hashed_password.encode())
 
+class PasswordHashingExecutor:
+    """
+        Пул процессов для bcrypt, чтобы хеширование не блокировало event loop.
+        Одновременно в пул отправляется не больше max_concurrency задач, остальные ждут в очереди.
+    """
+
+    def __init__(self, max_workers: int, max_concurrency: int):
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self._executor: ProcessPoolExecutor | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.max_queue_depth = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, func, *args):
+        self.start()
+        self.waiting += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.waiting)
+        queued_at = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        waited = time.perf_counter() - queued_at
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "avg_wait_ms": round(self.total_wait_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+        }
+
+
+hashing_executor = PasswordHashingExecutor(
+    max_workers=config.PASSWORD_HASH_WORKERS,
+    max_concurrency=config.PASSWORD_HASH_MAX_CONCURRENCY,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    return await hashing_executor.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_executor.run(verify_password, plain_password, hashed_password)
+
 def create_access_token(data: dict) -> str:
     """
     Создаёт JWT токен с payload (sub, username, id, exp).
@@ -0,0 +1,70 @@
+import functools
+from typing import Any, Iterable
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+from app.core.exceptions import BadRequestException
+
+
+def parse_fields(raw: str | None, model: type[BaseModel], exclude: Iterable[str] = ()) -> frozenset[str] | None:
+    """
+        Разбирает ?fields=a,b,c в набор полей model. None - параметр не передан, нужны все поля.
+        id добавляется всегда: без него клиент не сопоставит сущности между запросами.
+    """
+    if raw is None:
+        return None
+    allowed = set(model.model_fields) - set(exclude)
+    fields = {field.strip() for field in raw.split(',') if field.strip()}
+    unknown = fields - allowed
+    if unknown:
+        raise BadRequestException(
+            message=f'Unknown fields: {", ".join(sorted(unknown))}. Allowed: {", ".join(sorted(allowed))}'
+        )
+    return frozenset(fields | {'id'})
+
+
+def parse_include(raw: str | None, allowed: Iterable[str]) -> frozenset[str] | None:
+    """Разбирает ?include=a,b. None - параметр не передан; пустая строка - ничего не включать"""
+    if raw is None:
+        return None
+    include = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = include - set(allowed)
+    if unknown:
+        raise BadRequestException(message=f'Unknown include: {", ".join(sorted(unknown))}')
+    return frozenset(include)
+
+
+@functools.cache
+def sparse_model(
+        model: type[BaseModel],
+        fields: frozenset[str],
+        nested: tuple[tuple[str, Any], ...] = (),
+) -> type[BaseModel]:
+    """
+        Модель с подмножеством полей model, читающая атрибуты ORM-объекта.
+        nested - (имя поля, тип) для вложенных sparse-моделей. Модели кэшируются на набор полей.
+    """
+    definitions = {
+        name: (field.annotation, field)
+        for name, field in model.model_fields.items() if name in fields
+    }
+    definitions.update({name: (annotation, ...) for name, annotation in nested})
+    return create_model(
+        f'{model.__name__}Sparse',
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+def dump_sparse(model: type[BaseModel], items: Iterable[Any], context: dict | None = None) -> bytes:
+    """
+        JSON списка ORM-объектов по sparse-модели: читаются только её поля, незагруженные колонки не трогаются.
+        context передаётся валидаторам полей, как в model_validate.
+    """
+    adapter = _list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(list(items), from_attributes=True, context=context))
+
+
+@functools.cache
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
@@ -0,0 +1,73 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """
+        In-process LRU кэш с ограничением по количеству записей и TTL на запись.
+        С max_weight и weigher дополнительно ограничивает суммарный вес записей (например, размер в байтах).
+    """
+
+    def __init__(
+            self,
+            max_size: int,
+            ttl: float,
+            max_weight: int | None = None,
+            weigher: Callable[[Any], int] | None = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.weight = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _weigh(self, value: Any) -> int:
+        return self.weigher(value) if self.weigher else 0
+
+    def _remove(self, key: Hashable) -> tuple[float, Any] | None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.weight -= self._weigh(item[1])
+        return item
+
+    def get(self, key: Hashable) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        weight = self._weigh(value)
+        self._remove(key)
+        if self.max_weight is not None and weight > self.max_weight:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self.weight += weight
+        while len(self._data) > self.max_size or (self.max_weight is not None and self.weight > self.max_weight):
+            _, (_, evicted) = self._data.popitem(last=False)
+            self.weight -= self._weigh(evicted)
+
+    def pop(self, key: Hashable) -> Any | None:
+        item = self._remove(key)
+        return item[1] if item else None
+
+    def pop_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        keys = [key for key, (_, value) in self._data.items() if predicate(key, value)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.weight = 0
@@ -0,0 +1,79 @@
+"""
+Сравнение PickleCoder и ResponseBytesCoder на странице каталога курсов.
+
+    python -m benchmarks.course_cache_coder --items 20 --runs 2000
+
+Размер - сколько байт уходит в Redis. Hit - время от байтов из Redis до готового тела ответа:
+для PickleCoder это unpickle плюс сериализация ответа FastAPI, для ResponseBytesCoder - только обёртка в Response.
+"""
+import argparse
+import asyncio
+import timeit
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from fastapi_cache.coder import PickleCoder
+
+from app.schemas.course import CourseList, CourseResponse
+from app.utils.cache_coder import ResponseBytesCoder
+
+
+def build_page(items: int) -> CourseList:
+    now = datetime.now(timezone.utc)
+    return CourseList(
+        items=[
+            CourseResponse(
+                id=i,
+                title=f'Course number {i} about asynchronous Python',
+                description=f'Course {i}: a reasonably long description that is shown in the catalog. ' * 3,
+                price=Decimal('1990.00'),
+                author_id=i % 7 + 1,
+                is_published=True,
+                created_at=now,
+                updated_at=now,
+            )
+            for i in range(1, items + 1)
+        ],
+        page=1,
+        per_page=items,
+        total=10_000,
+    )
+
+
+async def pickle_hit(payload: bytes, field) -> bytes:
+    value = PickleCoder.decode_as_type(payload, type_=CourseList)
+    content = await serialize_response(field=field, response_content=value)
+    return JSONResponse(content).body
+
+
+async def bytes_hit(payload: bytes) -> bytes:
+    return ResponseBytesCoder.decode_as_type(payload, type_=CourseList).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=20)
+    parser.add_argument('--runs', type=int, default=2000)
+    args = parser.parse_args()
+
+    page = build_page(args.items)
+    field = create_model_field(name='response', type_=CourseList, mode='serialization')
+    loop = asyncio.new_event_loop()
+
+    for name, coder, hit in (
+        ('PickleCoder', PickleCoder, lambda payload: loop.run_until_complete(pickle_hit(payload, field))),
+        ('ResponseBytesCoder', ResponseBytesCoder, lambda payload: loop.run_until_complete(bytes_hit(payload))),
+    ):
+        payload = coder.encode(page)
+        encode_us = timeit.timeit(lambda: coder.encode(page), number=args.runs) / args.runs * 1e6
+        hit_us = timeit.timeit(lambda: hit(payload), number=args.runs) / args.runs * 1e6
+        print(f'{name:<20} size={len(payload):>7} B  encode={encode_us:>8.1f} us  hit={hit_us:>8.1f} us')
+
+    loop.close()
+
+
+if __name__ == '__main__':
+    main()